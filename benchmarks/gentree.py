@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import argparse
+import os
+import random
+
+# Local modules
+# None
+
+# Names used in the generated tree
+CorePackage   = 'SynCorePkg'          # Package (in Edk2) with the shared GUIDs, PCDs and libraries
+PlatformDir   = 'SynPkg'              # Platform directory (PLATFORM is characters [-6:-3] of it, so "Syn")
+TokenSpace    = 'gSynCoreTokenSpaceGuid'
+ModuleTypes   = ['PEIM', 'DXE_DRIVER', 'DXE_DRIVER', 'UEFI_DRIVER']
+ToolChains    = [('GCC48', 'GCC'), ('GCC49', 'GCC'), ('GCC5', 'GCC'), ('CLANG38', 'GCC'), ('CLANGDWARF', 'GCC'), ('CLANGPDB', 'CLANGPDB'),
+                 ('VS2017', 'MSFT'), ('VS2019', 'MSFT'), ('VS2022', 'MSFT'), ('XCODE5', 'XCODE')]
+Architectures = ['IA32', 'X64', 'ARM', 'AARCH64', 'RISCV64', 'LOONGARCH64']
+Commands      = ['CC', 'DLINK', 'DLINK2', 'SLINK', 'ASM', 'NASM', 'PP', 'VFRPP', 'APP', 'ASLPP', 'ASLCC', 'ASLDLINK', 'OBJCOPY', 'RC']
+
+# Get a random GUID in registry format
+# rng: Random number generator
+# returns GUID string
+def RegistryGuid(rng):
+    value = '%032x' % rng.getrandbits(128)
+    return f'{value[0:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:32]}'
+
+# Get a random GUID in C structure format (as used in DEC files)
+# rng: Random number generator
+# returns GUID string
+def StructGuid(rng):
+    value = '%032x' % rng.getrandbits(128)
+    tail  = ', '.join([f'0x{value[i:i + 2]}' for i in range(16, 32, 2)])
+    return f'{{ 0x{value[0:8]}, 0x{value[8:12]}, 0x{value[12:16]}, {{ {tail} }}}}'
+
+# Write a file (creating its directory if needed)
+# fileName: File to be written
+# lines:    List of lines to write
+# returns nothing
+def WriteFile(fileName, lines):
+    os.makedirs(os.path.dirname(fileName), exist_ok = True)
+    with open(fileName, 'w') as out:
+        out.write('\n'.join(lines) + '\n')
+
+# Class for generating a synthetic EDK2 worktree
+class SyntheticTree:
+
+    # Class constructor
+    # worktree:   Directory in which the tree is generated
+    # modules:    Number of modules (INF files) in the platform
+    # guids:      Number of GUIDs (and of PPIs and protocols) in the core DEC file (default is None for modules / 4)
+    # pcds:       Number of PCDs in the core DEC file (default is None for modules / 4)
+    # libraries:  Number of library classes (default is 20)
+    # perPackage: Number of modules in each module package (default is 500)
+    # seed:       Seed for the random number generator (default is 0)
+    # returns nothing
+    def __init__(self, worktree, modules, guids = None, pcds = None, libraries = 20, perPackage = 500, seed = 0):
+        self.worktree   = os.path.abspath(worktree)
+        self.modules    = modules
+        self.guids      = max(8, guids if guids != None else modules // 4)
+        self.pcds       = max(8, pcds  if pcds  != None else modules // 4)
+        self.libraries  = max(1, libraries)
+        self.perPackage = max(1, perPackage)
+        self.packages   = (modules + self.perPackage - 1) // self.perPackage
+        self.features   = max(2, self.packages * 4)
+        self.rng        = random.Random(seed)
+        self.files      = 0
+        self.lines      = 0
+
+    ###################
+    # Private methods #
+    ###################
+
+    # Write a file in the worktree and keep count of what was written
+    # path:  Path of the file relative to the worktree
+    # lines: List of lines to write
+    # returns nothing
+    def __write__(self, path, lines):
+        WriteFile(os.path.join(self.worktree, path), lines)
+        self.files += 1
+        self.lines += len(lines)
+
+    # Get the name and directory of a module
+    # index: Index of the module
+    # returns tuple of (package, module name, INF path relative to the packages path)
+    def __module__(self, index):
+        package = f'SynModPkg{index // self.perPackage}'
+        name    = f'SynMod{index}'
+        return (package, name, f'{package}/Drivers/{name}/{name}.inf')
+
+    # Generate the core package (DEC file and library INF files)
+    # returns nothing
+    def __generateCore__(self):
+        lines = ['## @file', f'#  Synthetic core package', '##', '', '[Defines]',
+                 '  DEC_SPECIFICATION = 0x00010005', f'  PACKAGE_NAME      = {CorePackage}',
+                 f'  PACKAGE_GUID      = {RegistryGuid(self.rng)}', '  PACKAGE_VERSION   = 1.0', '',
+                 '[Includes]', '  Include', '', '[Guids]', f'  {TokenSpace} = {StructGuid(self.rng)}']
+        lines += [f'  gSynGuid{i} = {StructGuid(self.rng)}' for i in range(self.guids)]
+        lines += ['', '[Ppis]']
+        lines += [f'  gSynPpi{i}Guid = {StructGuid(self.rng)}' for i in range(self.guids)]
+        lines += ['', '[Protocols]']
+        lines += [f'  gSynProtocol{i}Guid = {StructGuid(self.rng)}' for i in range(self.guids)]
+        lines += ['', '[LibraryClasses]']
+        lines += [f'  SynLib{i}|Include/Library/SynLib{i}.h' for i in range(self.libraries)]
+        lines += ['', '[PcdsFixedAtBuild, PcdsPatchableInModule]']
+        token  = 1
+        for i in range(self.pcds):
+            kind   = i % 4
+            if kind == 0:
+                lines.append(f'  {TokenSpace}.PcdSyn{i}|0x{i:X}|UINT32|0x{token:08X}')
+            elif kind == 1:
+                lines.append(f'  {TokenSpace}.PcdSyn{i}|TRUE|BOOLEAN|0x{token:08X}')
+            elif kind == 2:
+                lines.append(f'  {TokenSpace}.PcdSyn{i}|L"Synthetic{i}"|VOID*|0x{token:08X}')
+            else:
+                lines.append(f'  {TokenSpace}.PcdSyn{i}|{{0x{i & 0xFF:02X}, 0x01, 0x02, 0x03}}|VOID*|0x{token:08X}')
+            token += 1
+        lines += ['', '[PcdsDynamic, PcdsDynamicEx]']
+        for i in range(max(1, self.pcds // 8)):
+            lines.append(f'  {TokenSpace}.PcdSynDyn{i}|0x{i:X}|UINT64|0x{token:08X}')
+            token += 1
+        self.__write__(f'Edk2/{CorePackage}/{CorePackage}.dec', lines)
+        for i in range(self.libraries):
+            self.__write__(f'Edk2/{CorePackage}/Library/SynLib{i}/SynLib{i}.inf', [
+                '[Defines]', '  INF_VERSION    = 0x00010005', f'  BASE_NAME      = SynLib{i}',
+                f'  FILE_GUID      = {RegistryGuid(self.rng)}', '  MODULE_TYPE    = BASE', f'  LIBRARY_CLASS  = SynLib{i}', '',
+                '[Sources]', f'  SynLib{i}.c', '', '[Packages]', f'  {CorePackage}/{CorePackage}.dec', '',
+                '[LibraryClasses]', f'  SynLib{(i + 1) % self.libraries}', '',
+                '[BuildOptions]', f'  GCC:*_*_*_CC_FLAGS = -DSYNLIB{i}'])
+            self.__write__(f'Edk2/{CorePackage}/Library/SynLib{i}/SynLib{i}.c', [f'// SynLib{i}'])
+
+    # Generate the module packages (DEC and module INF files)
+    # returns nothing
+    def __generateModules__(self):
+        for package in range(self.packages):
+            name = f'SynModPkg{package}'
+            self.__write__(f'{name}/{name}.dec', [
+                '[Defines]', '  DEC_SPECIFICATION = 0x00010005', f'  PACKAGE_NAME      = {name}',
+                f'  PACKAGE_GUID      = {RegistryGuid(self.rng)}', '', '[Guids]',
+                f'  g{name}Guid = {StructGuid(self.rng)}'])
+        for index in range(self.modules):
+            package, name, inf = self.__module__(index)
+            moduleType = ModuleTypes[index % len(ModuleTypes)]
+            lines  = ['## @file', f'#  Synthetic module {index}', '##', '', '[Defines]',
+                      '  INF_VERSION    = 0x00010005', f'  BASE_NAME      = {name}',
+                      f'  FILE_GUID      = {RegistryGuid(self.rng)}', f'  MODULE_TYPE    = {moduleType}',
+                      f'  ENTRY_POINT    = {name}Entry', '', '[Sources]', f'  {name}.c', f'  {name}.h', '',
+                      '[Sources.X64]', f'  X64/{name}Arch.c', '',
+                      '[Packages]', f'  {CorePackage}/{CorePackage}.dec', f'  {package}/{package}.dec', '', '[LibraryClasses]']
+            lines += [f'  SynLib{self.rng.randrange(self.libraries)}' for i in range(3)]
+            lines += ['', '[Guids]', f'  g{package}Guid']
+            lines += [f'  gSynGuid{self.rng.randrange(self.guids)}  ## CONSUMES' for i in range(2)]
+            lines += ['', '[Ppis]' if moduleType == 'PEIM' else '[Protocols]']
+            lines += [f'  gSyn{"Ppi" if moduleType == "PEIM" else "Protocol"}{self.rng.randrange(self.guids)}Guid' for i in range(2)]
+            lines += ['', '[Pcd]']
+            lines += [f'  {TokenSpace}.PcdSyn{self.rng.randrange(self.pcds)}' for i in range(3)]
+            lines += ['', '[Depex]', '  TRUE']
+            if index % 7 == 0:
+                lines += ['', '[BuildOptions]', f'  GCC:*_*_*_CC_FLAGS = -DSYNMOD{index} \\', f'                       -DSYNTYPE_{moduleType}']
+            self.__write__(inf, lines)
+            self.__write__(f'{package}/Drivers/{name}/{name}.c', [f'// {name}'])
+
+    # Generate the platform DSC file and the files it includes
+    # returns nothing
+    def __generateDsc__(self):
+        lines  = ['## @file', '#  Synthetic platform', '##', '', '[Defines]',
+                  '  PLATFORM_NAME           = Synthetic', f'  PLATFORM_GUID           = {RegistryGuid(self.rng)}',
+                  '  PLATFORM_VERSION        = 0.1', '  DSC_SPECIFICATION       = 0x00010005',
+                  '  OUTPUT_DIRECTORY        = Build/Synthetic', '  SUPPORTED_ARCHITECTURES = IA32|X64',
+                  '  BUILD_TARGETS           = DEBUG|RELEASE', '  FLASH_DEFINITION        = $(PLAT_PKG_PATH)/PlatformPkg.fdf']
+        lines += [f'  DEFINE FEATURE_{i} = {"TRUE" if i % 3 else "FALSE"}' for i in range(self.features)]
+        lines += ['', f'!include {PlatformDir}/Include/Libraries.dsc.inc', f'!include {PlatformDir}/Include/Pcds.dsc.inc', '',
+                  '[SkuIds]', '  0|DEFAULT', '  1|SKU1|DEFAULT', '', '[Components.IA32]',
+                  f'  {CorePackage}/Library/SynLib0/SynLib0.inf', '', '[Components.X64]',
+                  f'!include {PlatformDir}/Include/Components.dsc.inc', '',
+                  '[BuildOptions]', '  GCC:*_*_*_CC_FLAGS = -DSYNTHETIC', '  MSFT:*_*_*_CC_FLAGS = /DSYNTHETIC']
+        self.__write__(f'{PlatformDir}/PlatformPkg.dsc', lines)
+        # Library classes
+        lines  = ['[LibraryClasses]']
+        lines += [f'  SynLib{i}|{CorePackage}/Library/SynLib{i}/SynLib{i}.inf' for i in range(self.libraries)]
+        lines += ['', '[LibraryClasses.common.PEIM]']
+        lines += [f'  SynLib{i}|{CorePackage}/Library/SynLib{i}/SynLib{i}.inf' for i in range(0, self.libraries, 4)]
+        self.__write__(f'{PlatformDir}/Include/Libraries.dsc.inc', lines)
+        # PCD settings (some depend on features)
+        lines  = ['[PcdsFixedAtBuild]']
+        for i in range(0, self.pcds, 4):
+            if i % 16 == 0:
+                lines += [f'!if $(FEATURE_{(i // 16) % self.features}) == TRUE', f'  {TokenSpace}.PcdSyn{i}|0x{i + 1:X}', '!else',
+                          f'  {TokenSpace}.PcdSyn{i}|0x{i + 2:X}', '!endif']
+            else:
+                lines.append(f'  {TokenSpace}.PcdSyn{i}|0x{i + 3:X}')
+        lines += ['', '[PcdsDynamicDefault.common.DEFAULT]']
+        lines += [f'  {TokenSpace}.PcdSynDyn{i}|0x{i * 2:X}' for i in range(max(1, self.pcds // 8))]
+        lines += ['', '[PcdsDynamicDefault.common.SKU1]']
+        lines += [f'  {TokenSpace}.PcdSynDyn{i}|0x{i * 3:X}' for i in range(0, max(1, self.pcds // 8), 2)]
+        self.__write__(f'{PlatformDir}/Include/Pcds.dsc.inc', lines)
+        # Components (one include per module package, grouped by feature)
+        lines  = ['# Components for each module package']
+        lines += [f'!include {PlatformDir}/Include/Components{package}.dsc.inc' for package in range(self.packages)]
+        self.__write__(f'{PlatformDir}/Include/Components.dsc.inc', lines)
+        for package in range(self.packages):
+            lines = []
+            first = package * self.perPackage
+            for index in range(first, min(first + self.perPackage, self.modules)):
+                group = index * 4 // self.perPackage
+                if index == first or group != (index - 1) * 4 // self.perPackage:
+                    if index != first:
+                        lines.append('!endif')
+                    lines.append(f'!if $(FEATURE_{group % self.features}) == TRUE' if group % 2 else f'!ifdef FEATURE_{group % self.features}')
+                inf = self.__module__(index)[2]
+                if index % 10 == 0:
+                    lines += [f'  {inf} {{', '    <PcdsFixedAtBuild>', f'      {TokenSpace}.PcdSyn{index % self.pcds}|0x{index:X}',
+                              '    <BuildOptions>', f'      GCC:*_*_*_CC_FLAGS = -DMOD{index}', '  }']
+                else:
+                    lines.append(f'  {inf}')
+            lines.append('!endif')
+            self.__write__(f'{PlatformDir}/Include/Components{package}.dsc.inc', lines)
+
+    # Generate the build configuration (Conf/target.txt and a tools_def.txt with a definition for every tool chain, architecture,
+    # and command type like the EDK2 template)
+    # returns nothing
+    def __generateConf__(self):
+        self.__write__('Conf/target.txt', ['ACTIVE_PLATFORM       = ' + f'{PlatformDir}/PlatformPkg.dsc', 'TARGET                = DEBUG',
+                                           'TARGET_ARCH           = IA32 X64', 'TOOL_CHAIN_CONF       = Conf/tools_def.txt',
+                                           'TOOL_CHAIN_TAG        = GCC5', 'BUILD_RULE_CONF       = Conf/build_rule.txt'])
+        lines = ['# Synthetic tool definitions', '']
+        for toolchain, family in ToolChains:
+            lines += [f'DEFINE {toolchain}_{arch}_CC_FLAGS = -c -g -D{toolchain}_{arch}' for arch in Architectures]
+            lines += ['', f'*_{toolchain}_*_*_FAMILY          = {family}', f'*_{toolchain}_*_*_BUILDRULEFAMILY = {family}', '']
+            for arch in Architectures:
+                for command in Commands:
+                    lines += [f'*_{toolchain}_{arch}_{command}_PATH  = /opt/{toolchain.lower()}/bin/{command.lower()}',
+                              f'*_{toolchain}_{arch}_{command}_FLAGS = ' + (f'DEF({toolchain}_{arch}_CC_FLAGS)' if command == 'CC' else f'-{command.lower()}')]
+                for target in ('DEBUG', 'RELEASE', 'NOOPT'):
+                    lines += [f'{target}_{toolchain}_{arch}_CC_FLAGS    = DEF({toolchain}_{arch}_CC_FLAGS) -O{"0" if target == "NOOPT" else "s"}',
+                              f'{target}_{toolchain}_{arch}_DLINK_FLAGS = -{target.lower()}']
+                lines.append('')
+        self.__write__('Conf/tools_def.txt', lines)
+
+    # Generate the platform FDF file and the files it includes
+    # returns nothing
+    def __generateFdf__(self):
+        lines  = ['## @file', '#  Synthetic flash description', '##', '', '[FD.SYN]', 'BaseAddress   = 0xFF000000',
+                  'Size          = 0x01000000', 'ErasePolarity = 1', 'BlockSize     = 0x10000', 'NumBlocks     = 0x100', '']
+        offset = 0
+        for package in range(self.packages):
+            lines += [f'0x{offset:08X}|0x00100000', f'FV = FVSYN{package}']
+            offset += 0x100000
+        for package in range(self.packages):
+            first  = package * self.perPackage
+            last   = min(first + self.perPackage, self.modules)
+            lines += ['', f'[FV.FVSYN{package}]', 'BlockSize     = 0x10000', 'FvAlignment   = 16', 'ERASE_POLARITY = 1', '',
+                      'APRIORI PEI {' if package == 0 else 'APRIORI DXE {']
+            lines += [f'  INF {self.__module__(index)[2]}' for index in range(first, min(first + 4, last))]
+            lines += ['}', f'!include {PlatformDir}/Include/Fv{package}.fdf.inc',
+                      f'FILE FREEFORM = {RegistryGuid(self.rng)} {{', f'  SECTION RAW = {PlatformDir}/Include/Fv{package}.fdf.inc', '}']
+            inc    = []
+            for index in range(first, last):
+                group = index * 4 // self.perPackage
+                if index == first or group != (index - 1) * 4 // self.perPackage:
+                    if index != first:
+                        inc.append('!endif')
+                    inc.append(f'!if $(FEATURE_{group % self.features}) == TRUE' if group % 2 else f'!ifdef FEATURE_{group % self.features}')
+                inc.append(f'INF {self.__module__(index)[2]}')
+            inc.append('!endif')
+            self.__write__(f'{PlatformDir}/Include/Fv{package}.fdf.inc', inc)
+        lines += ['', '[Rule.Common.PEIM]', '  FILE PEIM = $(NAMED_GUID) {', '    PEI_DEPEX PEI_DEPEX Optional $(INF_OUTPUT)/$(MODULE_NAME).depex',
+                  '    PE32      PE32                       |.efi', '    UI        STRING="$(MODULE_NAME)" Optional', '  }',
+                  '', '[Rule.Common.DXE_DRIVER]', '  FILE DRIVER = $(NAMED_GUID) {', '    DXE_DEPEX DXE_DEPEX Optional $(INF_OUTPUT)/$(MODULE_NAME).depex',
+                  '    PE32      PE32                       |.efi', '    UI        STRING="$(MODULE_NAME)" Optional', '  }',
+                  '', '[Rule.Common.UEFI_DRIVER]', '  FILE DRIVER = $(NAMED_GUID) {', '    PE32      PE32                       |.efi', '  }']
+        self.__write__(f'{PlatformDir}/PlatformPkg.fdf', lines)
+
+    ##################
+    # Public methods #
+    ##################
+
+    # Generate the tree
+    # returns platform directory
+    def Generate(self):
+        os.makedirs(os.path.join(self.worktree, 'Edk2'), exist_ok = True)
+        self.__generateCore__()
+        self.__generateModules__()
+        self.__generateDsc__()
+        self.__generateFdf__()
+        self.__generateConf__()
+        return os.path.join(self.worktree, PlatformDir)
+
+################
+# Main Program #
+################
+if __name__ == '__main__':
+    CommandLine = argparse.ArgumentParser(description = 'Generate a synthetic EDK2 worktree for benchmarking UEFITool')
+    CommandLine.add_argument('worktree', help = 'directory in which the tree is generated')
+    CommandLine.add_argument('-m', '--modules',   type = int, default = 1000, help = 'number of modules (default is 1000)')
+    CommandLine.add_argument('-g', '--guids',     type = int, default = None, help = 'number of GUIDs, PPIs and protocols in the core DEC (default is modules/4)')
+    CommandLine.add_argument('-p', '--pcds',      type = int, default = None, help = 'number of PCDs in the core DEC (default is modules/4)')
+    CommandLine.add_argument('-l', '--libraries', type = int, default = 20,   help = 'number of library classes (default is 20)')
+    CommandLine.add_argument('--per-package',     type = int, default = 500,  dest = 'perPackage', help = 'modules in each module package (default is 500)')
+    CommandLine.add_argument('--seed',            type = int, default = 0,    help = 'random number generator seed (default is 0)')
+    args     = CommandLine.parse_args()
+    tree     = SyntheticTree(args.worktree, args.modules, args.guids, args.pcds, args.libraries, args.perPackage, args.seed)
+    platform = tree.Generate()
+    print(f'Generated {tree.files} files ({tree.lines} lines), platform directory is {platform}')
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import globals      as gbl
+import modulescope
+from   commandline  import ProcessCommandLine
+from   gentree      import SyntheticTree, TokenSpace
+from   runbench     import StubbedPlatformInfo
+
+# Default location of the golden outputs
+GoldenFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'microbench.json')
+
+#################
+# Line corpuses #
+#################
+
+# PCD lines as found in DSC PCD sections
+PcdLines        = [line for i in range(64) for line in (
+                      f'{TokenSpace}.PcdSyn{i}|0x{i:X}',
+                      f'{TokenSpace}.PcdSyn{i}|TRUE',
+                      f'{TokenSpace}.PcdSyn{i}|L"Synthetic{i}"|VOID*|{2 * (i + 10)}',
+                      f'{TokenSpace}.PcdSyn{i}|{{0x{i:02X}, 0x01, 0x02, 0x03}}|VOID*|4',
+                      f'{TokenSpace}.PcdSynDyn{i}|0x{i * 3:X}|UINT64|8')]
+
+# Component lines as found in DSC component sections
+ComponentLines  = [f'SynModPkg{i // 50}/Drivers/SynMod{i}/SynMod{i}.inf' for i in range(256)]
+
+# FV INF lines as found in FDF FV sections
+FvInfLines      = [line for i in range(128) for line in (
+                      f'INF SynModPkg{i // 50}/Drivers/SynMod{i}/SynMod{i}.inf',
+                      f'INF RuleOverride = UEFI_DRIVER SynModPkg{i // 50}/Drivers/SynMod{i}/SynMod{i}.inf')]
+
+# Conditional directive lines (balanced, some nested) after macro expansion
+DirectiveLines  = [line for i in range(48) for line in (
+                      f'!if {"TRUE" if i % 3 else "FALSE"} == TRUE',
+                      f'!ifdef FEATURE_{i % 8}',
+                      f'!ifndef __UNKNOWN{i}__UNDEFINED__',
+                      '!endif',
+                      '!else',
+                      '!endif',
+                      f'!elseif "DEBUG" == "RELEASE"',
+                      '!else',
+                      '!endif')]
+
+# Conditions (kind, condition) after macro expansion
+ConditionLines  = [item for i in range(48) for item in (
+                      ('If',     f'{"TRUE" if i % 3 else "FALSE"} == TRUE'),
+                      ('If',     f'"DEBUG" == "RELEASE" || {i} > 10'),
+                      ('If',     f'__FEATURE_{i}__UNDEFINED__ == TRUE'),
+                      ('If',     f'(0x{i:X} & 0x3) != 0 && TRUE'),
+                      ('Ifdef',  f'FEATURE_{i % 8}'),
+                      ('Ifndef', f'__UNKNOWN{i}__UNDEFINED__'))]
+
+# Lines with macro references (before macro expansion)
+MacroLines      = [line for i in range(64) for line in (
+                      f'!if $(FEATURE_{i % 8}) == TRUE',
+                      f'$(PLAT_PKG_PATH)/Include/Components{i % 4}.dsc.inc',
+                      f'{TokenSpace}.PcdSyn{i}|$(FEATURE_{i % 8})',
+                      f'INF $(PLAT_PKG_PATH)/../SynModPkg0/Drivers/SynMod{i}/SynMod{i}.inf',
+                      f'!ifdef $(UNKNOWN_{i})')]
+
+# Raw lines as read from files (before comment removal)
+RawLines        = [line for i in range(64) for line in (
+                      f'  {TokenSpace}.PcdSyn{i}|0x{i:X}       # Trailing comment',
+                      f'  {TokenSpace}.PcdSyn{i}|L"Has # in string"|VOID*|40',
+                      '## @file',
+                      '',
+                      '/* Start of comment block',
+                      'Inside comment block',
+                      '*/',
+                      f'  SynModPkg0/Drivers/SynMod{i}/SynMod{i}.inf  ; Semicolon comment',
+                      f'  GCC:*_*_*_CC_FLAGS = -DMOD{i}  // Slash comment',
+                      f'[Components.X64]')]
+
+# Section header lines (and lines that are not section headers)
+SectionLines    = [line for i in range(32) for line in (
+                      '[PcdsFixedAtBuild]',
+                      '[Components.X64]',
+                      '[Components.IA32, Components.X64]',
+                      '[LibraryClasses.common.PEIM, LibraryClasses.common.DXE_DRIVER]',
+                      '[BuildOptions.common.EDKII]',
+                      '[PcdsDynamicDefault.common.SKU1]',
+                      f'{TokenSpace}.PcdSyn{i}|0x{i:X}',
+                      f'SynModPkg0/Drivers/SynMod{i}/SynMod{i}.inf')]
+
+# Partial paths given to FindPath
+PathLines       = [path for i in range(64) for path in (
+                      f'SynModPkg0/Drivers/SynMod{i % 20}/SynMod{i % 20}.inf',
+                      f'SynCorePkg/Library/SynLib{i % 4}/SynLib{i % 4}.inf',
+                      'SynCorePkg/SynCorePkg.dec',
+                      f'SynPkg/Include/Missing{i}.dsc.inc')]
+
+##############
+# Benchmarks #
+##############
+
+# Class for the parser state used by the benchmarks
+class Context:
+
+    # Class constructor (parses a small synthetic platform so the parsers and gbl databases are realistic)
+    # work: Directory in which the synthetic tree is generated
+    # returns nothing
+    def __init__(self, work):
+        platform = SyntheticTree(work, 20, libraries = 4, perPackage = 50).Generate()
+        sys.argv = ['uefitool.py', platform]
+        with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+            ProcessCommandLine()
+            StubbedPlatformInfo(platform, None, False)
+        os.chdir(gbl.Worktree)
+        self.dsc = gbl.DSCs['SynPkg/PlatformPkg.dsc']
+        self.fdf = gbl.FDFs['SynPkg/PlatformPkg.fdf']
+
+    # Reset the parser state before a pass through a corpus
+    # parser:  Parser to be reset
+    # section: Section that is to be current (default is None for none)
+    # returns nothing
+    def Reset(self, parser, section = None):
+        parser.lineNumber          = 1
+        parser.commentBlock        = False
+        parser.process             = True
+        parser.conditionHandled    = False
+        parser.conditionalStack    = []
+        parser.allowedConditionals = []
+        parser.subElementState     = -1
+        parser.subElements         = []
+        parser.sections            = [section.split('.')] if section else []
+        if section:
+            parser.section    = parser.sections[0]
+            parser.sectionStr = gbl.GetSection(parser.section)
+        for attribute in ('COMPONENTS', 'PCDS', 'INFS'):
+            if hasattr(parser, attribute):
+                setattr(parser, attribute, [])
+        gbl.INFs = []
+
+    # Dispatch a line to a section handler
+    # parser:    Parser handling the line
+    # section:   Section name
+    # attribute: Name of the attribute to which the section handler adds entries
+    # line:      Line to be handled
+    # returns entry added (without the section, which is the same for every line) or None if no entry was added
+    def Dispatch(self, parser, section, attribute, line):
+        count = len(getattr(parser, attribute))
+        parser.__dispatchSectionHandler__(section, line)
+        items = getattr(parser, attribute)
+        if len(items) == count:
+            return None
+        entry = items[-1]
+        return {name: entry[name] for name in entry if name != 'section'} if type(entry) is dict else list(entry)
+
+# Get the benchmarks
+# context: Parser state used by the benchmarks
+# returns list of (name, corpus, reset function, function returning the output for one corpus item)
+def Benchmarks(context):
+    dsc, fdf = (context.dsc, context.fdf)
+    def RemoveComments(line):
+        return [dsc.__removeComments__(line), dsc.commentBlock]
+    def ExpandMacros(line):
+        return dsc.__expandMacros__(line)
+    def HandleDirective(line):
+        return [dsc.__handleDirective__(line), dsc.process, len(dsc.conditionalStack)]
+    def HandleNewSection(line):
+        return [dsc.__handleNewSection__(line), [list(section) for section in dsc.sections]]
+    def DispatchPcd(line):
+        return context.Dispatch(dsc, 'pcdsfixedatbuild', 'PCDS', line)
+    def DispatchComponent(line):
+        return context.Dispatch(dsc, 'components', 'COMPONENTS', line)
+    def DispatchFvInf(line):
+        return context.Dispatch(fdf, 'fv', 'INFS', line)
+    def ConvertExpression(item):
+        return dsc.__convertExpression__(item[1])
+    def EvaluateCondition(item):
+        return dsc.__evaluateCondition__(item[0], item[1])
+    def FindPath(partial):
+        return gbl.FindPath(partial)
+    return [
+        ('__removeComments__',                      RawLines,       lambda: context.Reset(dsc),                      RemoveComments),
+        ('__expandMacros__',                        MacroLines,     lambda: context.Reset(dsc),                      ExpandMacros),
+        ('__handleDirective__',                     DirectiveLines, lambda: context.Reset(dsc),                      HandleDirective),
+        ('__handleNewSection__',                    SectionLines,   lambda: context.Reset(dsc),                      HandleNewSection),
+        ('__dispatchSectionHandler__ [pcds]',       PcdLines,       lambda: context.Reset(dsc, 'pcdsfixedatbuild'),  DispatchPcd),
+        ('__dispatchSectionHandler__ [components]', ComponentLines, lambda: context.Reset(dsc, 'components.x64'),    DispatchComponent),
+        ('__dispatchSectionHandler__ [fv]',         FvInfLines,     lambda: context.Reset(fdf, 'fv.fvsyn0'),         DispatchFvInf),
+        ('__convertExpression__',                   ConditionLines, lambda: context.Reset(dsc),                      ConvertExpression),
+        ('__evaluateCondition__',                   ConditionLines, lambda: context.Reset(dsc),                      EvaluateCondition),
+        ('gbl.FindPath',                            PathLines,      lambda: None,                                    FindPath),
+    ]
+
+# Check that the platform [BuildOptions] are layered exactly once (for modules with and without a [Components] sub-element)
+# returns list of messages for the layers that are not as expected
+def CheckLayers():
+    saved            = gbl.BuildOptions
+    gbl.BuildOptions = {}
+    try:
+        gbl.AddBuildOption(None, 'MSFT', '*_*_*_CC_FLAGS', '/DPLATFORM', 'SynPkg/SynPkg.dsc', 10)
+        gbl.AddBuildOption('SynModPkg0/Drivers/SynMod0/SynMod0.inf', 'MSFT', '*_*_*_CC_FLAGS', '/DMODULE', 'SynPkg/SynPkg.dsc', 20)
+        platform = (('MSFT', '*_*_*_CC_FLAGS', '/DPLATFORM'),)
+        expected = {None: ((), platform, ()),
+                    'SynModPkg0/Drivers/SynMod0/SynMod0.inf': ((), platform, (('MSFT', '*_*_*_CC_FLAGS', '/DMODULE'),))}
+        failed   = []
+        for scope in expected:
+            layers = modulescope.Layers(None, scope)
+            if layers != expected[scope]:
+                failed.append(f'modulescope.Layers for scope {scope} gave {layers} instead of {expected[scope]}')
+        return failed
+    finally:
+        gbl.BuildOptions = saved
+
+# Get the outputs for a corpus
+# corpus:   Lines to be processed
+# reset:    Function resetting the parser state
+# function: Function returning the output for a line
+# returns list of outputs (JSON compatible)
+def Outputs(corpus, reset, function):
+    reset()
+    return json.loads(json.dumps([function(line) for line in corpus], default = str))
+
+# Time a function on a corpus
+# corpus:   Lines to be processed
+# reset:    Function resetting the parser state
+# function: Function returning the output for a line
+# repeat:   Number of timing samples
+# minimum:  Minimum seconds for each sample (passes through the corpus are added until this is reached)
+# returns list of nanoseconds per line for each sample
+def Time(corpus, reset, function, repeat, minimum):
+    # Find the number of passes needed for a sample
+    passes = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(passes):
+            reset()
+            for line in corpus:
+                function(line)
+        if time.perf_counter() - start >= minimum or passes >= 1 << 16:
+            break
+        passes *= 2
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        for j in range(passes):
+            reset()
+            for line in corpus:
+                function(line)
+        samples.append((time.perf_counter_ns() - start) / (passes * len(corpus)))
+    return samples
+
+################
+# Main Program #
+################
+if __name__ == '__main__':
+    CommandLine = argparse.ArgumentParser(description = 'Micro-benchmarks of the UEFITool parser hot functions')
+    CommandLine.add_argument('-f', '--filter',  default = None, help = 'only run benchmarks with names containing this string')
+    CommandLine.add_argument('-r', '--repeat',  type = int, default = 7, help = 'timing samples for each benchmark (default is 7)')
+    CommandLine.add_argument('-m', '--minimum', type = float, default = 0.05, help = 'minimum seconds for each sample (default is 0.05)')
+    CommandLine.add_argument('-g', '--golden',  default = GoldenFile, help = 'golden outputs file (default is golden/microbench.json next to this script)')
+    CommandLine.add_argument('--update-golden', action = 'store_true', dest = 'update', help = 'save the outputs as the golden outputs instead of checking them')
+    args     = CommandLine.parse_args()
+    golden   = {}
+    if not args.update and os.path.isfile(args.golden):
+        with open(args.golden, 'r') as dat:
+            golden = json.load(dat)
+    work     = tempfile.mkdtemp(prefix = 'uefitool_microbench_')
+    savedDir = os.getcwd()
+    try:
+        context  = Context(work)
+        outputs  = {}
+        failed   = []
+        problems = CheckLayers()
+        print(f'{"ns/line min":>12} {"median":>9} {"stdev":>8} {"lines":>6}  golden  benchmark')
+        for name, corpus, reset, function in Benchmarks(context):
+            if args.filter and not args.filter in name:
+                continue
+            outputs[name] = Outputs(corpus, reset, function)
+            samples       = Time(corpus, reset, function, max(1, args.repeat), args.minimum)
+            check         = 'new' if not name in golden else 'same' if golden[name] == outputs[name] else 'DIFF'
+            if check == 'DIFF':
+                failed.append(name)
+            stdev         = statistics.stdev(samples) if len(samples) > 1 else 0.0
+            print(f'{min(samples):12.0f} {statistics.median(samples):9.0f} {stdev:8.0f} {len(corpus):6}  {check:6}  {name}')
+    finally:
+        os.chdir(savedDir)
+        shutil.rmtree(work, ignore_errors = True)
+    if args.update:
+        if args.filter and os.path.isfile(args.golden):
+            with open(args.golden, 'r') as dat:
+                outputs = dict(json.load(dat), **outputs)
+        os.makedirs(os.path.dirname(args.golden), exist_ok = True)
+        # One output per line so changes to the golden outputs are easy to review
+        with open(args.golden, 'w') as out:
+            out.write('{\n' + ',\n'.join([f' {json.dumps(name)}: [\n' + ',\n'.join(['  ' + json.dumps(item) for item in outputs[name]]) + '\n ]' for name in outputs]) + '\n}\n')
+        print(f'Golden outputs saved to {args.golden}')
+    for message in problems:
+        gbl.Error(message)
+    for name in failed:
+        gbl.Error(f'Outputs of {name} differ from the golden outputs')
+    if failed or problems:
+        sys.exit(1)
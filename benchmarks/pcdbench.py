@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import argparse
+import os
+import re
+import sys
+import time
+
+# Local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import globals      as gbl
+import pcdtokens
+from   gentree      import TokenSpace
+
+# Get the PCD lines with a VOID* byte array value of a particular size
+# size: Size of the value in bytes (the text of the value is about 6 characters per byte)
+# returns list of (regEx name, description, line)
+def Lines(size):
+    flat   = '{' + ', '.join([f'0x{i % 256:02X}' for i in range(size)]) + '}'
+    nested = '{' + ', '.join([f'0x{i % 256:02X}' for i in range(size // 2)]) + ', {0x00}, ' + ', '.join([f'0x{i % 256:02X}' for i in range(size // 2)]) + '}'
+    lines  = []
+    for kind, value in (('array', flat), ('bad array', nested)):
+        lines.append(('rePcdReDef', f'DSC {kind}',     f'{TokenSpace}.PcdSynBlob|{value}|VOID*|{size}'))
+        lines.append(('rePcdHii',   f'DSC HII {kind}', f'{TokenSpace}.PcdSynBlob|L"SynVar"|gSynVariableGuid|0x0|{size}|{value}'))
+        lines.append(('rePcdVpd',   f'DSC VPD {kind}', f'{TokenSpace}.PcdSynBlob|0x1000|{size}|{value}'))
+        lines.append(('rePcdDef',   f'DEC {kind}',     f'{TokenSpace}.PcdSynBlob|{value}|VOID*|0x00010001'))
+    return lines
+
+# Time a function on a line
+# function: Function to be timed
+# line:     Line to be given to the function
+# minimum:  Minimum seconds for the timing (calls are added until this is reached)
+# returns microseconds per call
+def Time(function, line, minimum):
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(calls):
+            function(line)
+        elapsed = time.perf_counter() - start
+        if elapsed >= minimum or calls >= 1 << 16:
+            return elapsed * 1e6 / calls
+        calls *= 2
+
+################
+# Main Program #
+################
+if __name__ == '__main__':
+    CommandLine = argparse.ArgumentParser(description = 'Benchmark of the PCD line tokenizer against the PCD regular expressions')
+    CommandLine.add_argument('-s', '--sizes',   default = '256,1024,4096,16384', help = 'comma separated value sizes in bytes (default is 256,1024,4096,16384)')
+    CommandLine.add_argument('-m', '--minimum', type = float, default = 0.05, help = 'minimum seconds for each timing (default is 0.05)')
+    args    = CommandLine.parse_args()
+    sizes   = [int(size) for size in args.sizes.split(',')]
+    results = {}
+    failed  = False
+    print(f'{"bytes":>6} {"chars":>7} {"regex us":>9} {"token us":>9} {"token ns/char":>13}  match  line')
+    for size in sizes:
+        for regEx, description, line in Lines(size):
+            regex   = re.compile(getattr(gbl, regEx), re.IGNORECASE)
+            pattern = pcdtokens.Patterns[regEx]
+            match   = regex.match(line)
+            tokens  = pattern.Tokenize(line)
+            same    = (match == None) == (tokens == None) and (match == None or match.groups() == tokens.groups())
+            failed  = failed or not same
+            old     = Time(regex.match, line, args.minimum)
+            new     = Time(pattern.Tokenize, line, args.minimum)
+            results[(description, size)] = new
+            print(f'{size:6} {len(line):7} {old:9.1f} {new:9.1f} {new * 1000 / len(line):13.2f}  {"same" if same else "DIFF":5}  {description}')
+    # Time per character stays about the same as the value grows when parsing is linear
+    if len(sizes) > 1:
+        print()
+        for description in sorted(set([description for description, size in results])):
+            growth = results[(description, sizes[-1])] / results[(description, sizes[0])]
+            print(f'{description:<18} {sizes[-1] // sizes[0]:4}x bytes -> {growth:6.1f}x time')
+    if failed:
+        gbl.Error('Tokenizer and regular expression results differ')
+        sys.exit(1)
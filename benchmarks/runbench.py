@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Local modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import globals      as gbl
+import memprofile
+from   commandline  import ProcessCommandLine
+from   gentree      import SyntheticTree
+from   platforminfo import PlatformInfo
+
+# Default locations
+BaselineFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+WorkDir      = os.path.join(tempfile.gettempdir(), 'uefitool_bench')
+
+# Class for processing a platform without running a build (the spoofed build.py output is made up)
+class StubbedPlatformInfo(PlatformInfo):
+
+    # Get what the spoofed build.py would have shown
+    # returns output lines
+    def __spoofBuild__(self):
+        paths = (';' if gbl.isWindows else ':').join([gbl.JoinPath(gbl.Worktree, 'Edk2'), gbl.Worktree])
+        return ['UEFITool DumpInfo Start\n', 'build.py\n', '-D\n', 'SYNTHETIC=TRUE\n', 'UEFITool DumpInfo Middle\n',
+                f'PACKAGES_PATH={paths}\n', 'UEFITool DumpInfo End\n']
+
+# Parse a platform once (done in a process of its own so peak memory is for this platform only)
+# platform: Platform directory
+# returns dictionary of measurements
+def Measure(platform):
+    sys.argv = ['uefitool.py', platform]
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+        ProcessCommandLine()
+        start   = time.perf_counter()
+        StubbedPlatformInfo(platform, None, False)
+        seconds = time.perf_counter() - start
+    files = len(gbl.DSCs) + len(gbl.INFs) + len(gbl.DECs) + len(gbl.FDFs)
+    return {'seconds': seconds, 'lines': gbl.Lines, 'files': files, 'peakRSS': memprofile.PeakRSS()}
+
+# Get the platform for a scale point (generating its tree if needed)
+# modules: Number of modules at the scale point
+# work:    Directory in which trees are kept
+# returns platform directory
+def Platform(modules, work):
+    worktree = os.path.join(work, f'modules_{modules}')
+    tree     = SyntheticTree(worktree, modules)
+    platform = os.path.join(worktree, 'SynPkg')
+    if not os.path.isfile(os.path.join(platform, 'PlatformPkg.fdf')):
+        print(f'Generating {modules} module tree in {worktree} ...')
+        platform = tree.Generate()
+    return platform
+
+# Run a scale point
+# modules: Number of modules at the scale point
+# work:    Directory in which trees are kept
+# repeat:  Number of times the platform is parsed (the fastest time and smallest peak memory are used)
+# returns dictionary of results
+def Run(modules, work, repeat):
+    platform = Platform(modules, work)
+    runs     = []
+    for i in range(repeat):
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', platform], capture_output = True, text = True)
+        lines = child.stdout.strip().splitlines()
+        if child.returncode != 0 or not lines or not lines[-1].startswith('RESULT '):
+            print(child.stdout + child.stderr)
+            gbl.Error(f'Benchmark of {platform} failed ... exiting!')
+            sys.exit(1)
+        runs.append(json.loads(lines[-1][len('RESULT '):]))
+    seconds = min([run['seconds'] for run in runs])
+    peaks   = [run['peakRSS'] for run in runs if run['peakRSS'] != None]
+    return {'modules': modules, 'lines': runs[0]['lines'], 'files': runs[0]['files'], 'seconds': seconds,
+            'linesPerSecond': runs[0]['lines'] / seconds, 'filesPerSecond': runs[0]['files'] / seconds,
+            'peakRSS': min(peaks) if peaks else None}
+
+# Compare results to a baseline
+# results:   Dictionary of modules -> results
+# baseline:  Dictionary of modules -> results from the baseline
+# tolerance: Fraction by which a result may be worse than the baseline before it is a regression
+# returns list of regression strings
+def Compare(results, baseline, tolerance):
+    regressions = []
+    for modules in results:
+        if not modules in baseline:
+            continue
+        new, old = (results[modules], baseline[modules])
+        if new['linesPerSecond'] < old['linesPerSecond'] * (1 - tolerance):
+            regressions.append(f'{modules} modules: {new["linesPerSecond"]:.0f} lines/s is {100 * (1 - new["linesPerSecond"] / old["linesPerSecond"]):.1f}% slower than {old["linesPerSecond"]:.0f} lines/s')
+        if new['peakRSS'] and old['peakRSS'] and new['peakRSS'] > old['peakRSS'] * (1 + tolerance):
+            regressions.append(f'{modules} modules: {new["peakRSS"] // (1024 * 1024)} MB peak is {100 * (new["peakRSS"] / old["peakRSS"] - 1):.1f}% larger than {old["peakRSS"] // (1024 * 1024)} MB')
+    return regressions
+
+################
+# Main Program #
+################
+if __name__ == '__main__':
+    CommandLine = argparse.ArgumentParser(description = 'End-to-end UEFITool parsing benchmark on synthetic trees')
+    CommandLine.add_argument('-s', '--scales',    default = '100,1000,10000', help = 'comma separated module counts (default is 100,1000,10000)')
+    CommandLine.add_argument('-r', '--repeat',    type = int, default = 3, help = 'times each scale point is parsed (default is 3)')
+    CommandLine.add_argument('-w', '--work',      default = WorkDir, help = f'directory in which trees are kept (default is {WorkDir})')
+    CommandLine.add_argument('-b', '--baseline',  default = BaselineFile, help = 'baseline results file (default is baseline.json next to this script)')
+    CommandLine.add_argument('-t', '--tolerance', type = float, default = 0.15, help = 'fraction worse than baseline that is a regression (default is 0.15)')
+    CommandLine.add_argument('--save-baseline',   action = 'store_true', dest = 'save', help = 'save the results as the baseline')
+    CommandLine.add_argument('--measure',         default = None, help = argparse.SUPPRESS)
+    args = CommandLine.parse_args()
+    if args.measure:
+        print('RESULT ' + json.dumps(Measure(args.measure)))
+        sys.exit(0)
+    results = {}
+    print(f'{"modules":>8} {"files":>8} {"lines":>9} {"seconds":>8} {"lines/s":>9} {"files/s":>8} {"peak MB":>8}')
+    for modules in [int(scale) for scale in args.scales.split(',')]:
+        result = Run(modules, os.path.abspath(args.work), max(1, args.repeat))
+        results[str(modules)] = result
+        peak   = 'n/a' if result['peakRSS'] == None else result['peakRSS'] // (1024 * 1024)
+        print(f'{modules:8} {result["files"]:8} {result["lines"]:9} {result["seconds"]:8.3f} {result["linesPerSecond"]:9.0f} {result["filesPerSecond"]:8.0f} {peak:>8}')
+    if args.save:
+        with open(args.baseline, 'w') as out:
+            json.dump({'version': gbl.ProgramVersion, 'python': sys.version.split()[0], 'scales': results}, out, indent = 2)
+        print(f'Baseline saved to {args.baseline}')
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as dat:
+            baseline = json.load(dat)
+        regressions = Compare(results, baseline['scales'], args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}')
@@ -17,7 +17,7 @@ class CommandLineParser(argparse.ArgumentParser):
 
   def error(self, msg):
       message = self.format_usage() + self.prog + ': error: ' + msg
-      gbl.Error(message)
+      gbl.Error(message, code = 'command-line')
       sys.exit(1)
 
 # This will allow user to input debug level
@@ -75,11 +75,94 @@ def ProcessCommandLine():
                     action = 'store_true',
                     dest='libraries',
                     help='do not generate libraries list (libraries.lst)')
+    # Add ability to control GUID collision listing
+    CommandLine.add_argument('-c', '--collisions',
+                    action = 'store_true',
+                    dest='collisions',
+                    help='do not generate guid collision list (collisions.lst)')
+    # Add ability to control module configuration listing
+    CommandLine.add_argument('-o', '--modules',
+                    action = 'store_true',
+                    dest='modules',
+                    help='do not generate module configuration list (modules.lst)')
     # Add ability to control dump listing
     CommandLine.add_argument('--dump',
                     action = 'store_true',
                     dest='dump',
                     help='dump all file results to screen')
+    # Add ability to record the contents of the files used
+    CommandLine.add_argument('--fingerprint',
+                    action = 'store_true',
+                    dest='fingerprint',
+                    help='hash every file used by the platform on a thread pool and save a manifest (fingerprint.json), reusing the hashes of unchanged files')
+    # Add ability to see what is affected by changed files
+    CommandLine.add_argument('--impact',
+                    dest='impact',
+                    metavar='file',
+                    action='append',
+                    default=None,
+                    help='show the modules, FVs, and FD regions affected by a changed file, relative to the current directory or the worktree (may be repeated, - reads file names from stdin, e.g. git diff --name-only)')
+    # Add ability to see what changes when macro values are changed
+    CommandLine.add_argument('--what-if',
+                    dest='whatif',
+                    metavar='macro=value',
+                    action='append',
+                    default=None,
+                    help='show the components, FV contents, PCDs, and sources that change when a macro is given a new value (may be repeated)')
+    # Add ability to process all configurations at once
+    CommandLine.add_argument('--symbolic',
+                    action = 'store_true',
+                    dest='symbolic',
+                    help='process every branch of conditional directives noting when each item is present (presence.lst)')
+    # Add ability to see where the time goes
+    CommandLine.add_argument('--profile',
+                    action = 'store_true',
+                    dest='profile',
+                    help='show where processing time is spent and save it (profile.json)')
+    # Add ability to see where the memory goes
+    CommandLine.add_argument('--memprofile',
+                    action = 'store_true',
+                    dest='memprofile',
+                    help='show what holds memory after each phase and save it (memprofile.json)')
+    # Add ability to see a timeline of processing
+    CommandLine.add_argument('--trace',
+                    dest='trace',
+                    metavar='file',
+                    type=str,
+                    default=None,
+                    help='save a timeline of processing (Chrome trace event format for Perfetto or chrome://tracing)')
+    # Add ability to see progress of long runs
+    CommandLine.add_argument('--progress',
+                    action = 'store_true',
+                    dest='progress',
+                    help='show a progress bar with files/sec and an ETA for each parsing phase (on stderr)')
+    CommandLine.add_argument('--progress-json',
+                    dest='progressjson',
+                    metavar='file',
+                    type=str,
+                    default=None,
+                    help='save progress events as JSON lines (- for stdout)')
+    # Add ability to save diagnostics for CI annotation
+    CommandLine.add_argument('--diagnostics',
+                    dest='diagnostics',
+                    metavar='file',
+                    type=str,
+                    default=None,
+                    help='save errors and warnings as SARIF (file ending in .sarif) or JSON')
+    # Add ability to stop early on broken trees
+    CommandLine.add_argument('--max-errors',
+                    dest='maxerrors',
+                    metavar='count',
+                    type=int,
+                    default=0,
+                    help='stop processing after count errors (default is 0 for no limit)')
+    # Add ability to feed the results to a log pipeline
+    CommandLine.add_argument('--jsonl',
+                    dest='jsonl',
+                    metavar='file',
+                    type=str,
+                    default=None,
+                    help='stream one JSON record per macro, source, reference, library, GUID, PPI, protocol, PCD, apriori entry, FV member, and module as the lists are generated (gzip compressed if file ends with .gz, - for stdout)')
     # Add ability to control debug output
     group = CommandLine.add_mutually_exclusive_group()
     group.add_argument('-n', '--nominal',
@@ -105,10 +188,26 @@ def ProcessCommandLine():
                     nargs='*',
                     default=0,
                     help='turn on debug to a specific level (64-bit integer, use 0x prefix to specify in hex)')
+    # Add ability to process all platforms in a worktree
+    CommandLine.add_argument('--batch',
+                    dest='batch',
+                    metavar='worktree',
+                    type=str,
+                    default=None,
+                    help='process every platform (*Pkg/PlatformPkg.dsc) found in worktree sharing DEC/INF parse results')
+    # Add ability to evaluate a platform under several configurations
+    CommandLine.add_argument('--matrix',
+                    dest='matrix',
+                    metavar='macro=values',
+                    action='append',
+                    default=None,
+                    help='evaluate each platform for every value in a comma separated list (e.g. TARGET=DEBUG,RELEASE), may be repeated for all combinations')
     # Add path to platform directory
     CommandLine.add_argument('path',
                     metavar='path',
                     type=str,
+                    nargs='?',
+                    default=None,
                     help='path to platform directory (default is current directory')
     # Parse the command line
     gbl.CommandLineResults = CommandLine.parse_args()
@@ -143,7 +143,7 @@ class DECParser(UEFIParser):
     def match_rePackages(self, match):
         # Only allow this section handler if in a sub-element
         if not self.subElementState == 1:
-            self.ReportError('section packages cannot be used outside of braces')
+            self.ReportError('section packages cannot be used outside of braces', 'outside-braces')
             return
         DSCParser.match_rePackages(self, match)
 
@@ -153,7 +153,7 @@ class DECParser(UEFIParser):
     def match_reHeaderFiles(self, match):
         # Only allow this section handler if in a sub-element
         if not self.subElementState == 1:
-            self.ReportError('section headerfiles cannot be used outside of braces')
+            self.ReportError('section headerfiles cannot be used outside of braces', 'outside-braces')
 
     #################
     # Dump handlers #
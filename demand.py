@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+# None
+
+# Local modules
+# None
+
+# Sections that are always processed (parser class name -> section names)
+# These decide which files are parsed (and define macros) so every output depends on them
+Always  = {
+    'DSCParser': ['defines', 'components', 'libraryclasses', 'packages'],
+    'INFParser': ['defines', 'packages'],
+    'DECParser': ['defines'],
+    'FDFParser': ['defines'],
+}
+
+# Sections each output needs in addition to those always processed (output -> parser class name -> section names)
+DscPcds = ['pcdsdynamic', 'pcdsdynamicdefault', 'pcdsdynamicex', 'pcdsdynamicexdefault', 'pcdsdynamicexhii', 'pcdsdynamicexvpd',
+           'pcdsdynamichii', 'pcdsdynamicvpd', 'pcdsfeatureflag', 'pcdsfixedatbuild', 'pcdspatchableinmodule']
+DecPcds = ['pcdsdynamic', 'pcdsdynamicex', 'pcdsfeatureflag', 'pcdsfixedatbuild', 'pcdspatchableinmodule']
+InfPcds = ['featurepcd', 'fixedpcd', 'patchpcd', 'pcd', 'pcdex']
+Needs   = {
+    'macros':     {},
+    'apriori':    {'FDFParser': ['fv']},
+    'sources':    {'INFParser': ['sources'], 'FDFParser': ['fv']},
+    'libraries':  {'INFParser': ['libraryclasses', 'depex']},
+    'ppis':       {'INFParser': ['ppis'], 'DECParser': ['ppis']},
+    'protocols':  {'INFParser': ['protocols'], 'DECParser': ['protocols']},
+    'guids':      {'INFParser': ['guids'], 'DECParser': ['guids']},
+    'collisions': {'DECParser': ['guids', 'ppis', 'protocols'], 'FDFParser': ['fv']},
+    'presence':   {'DSCParser': DscPcds, 'FDFParser': ['fv']},
+    'pcds':       {'DSCParser': DscPcds + ['defaultstores', 'skuids'], 'INFParser': InfPcds, 'DECParser': DecPcds},
+    'fv':         {'FDFParser': ['fv']},
+    'fingerprint': {'INFParser': ['sources'], 'FDFParser': ['fv']},
+    'impact':     {'INFParser': ['sources', 'libraryclasses'], 'DECParser': ['includes'], 'FDFParser': ['fd', 'fv']},
+    'modules':    {'DSCParser': DscPcds + ['buildoptions', 'defaultstores', 'skuids'], 'INFParser': InfPcds + ['buildoptions'], 'DECParser': DecPcds, 'FDFParser': ['fv']},
+}
+
+# Sections needed by the requested outputs (parser class name -> set of section names)
+# Empty when every section is to be processed (the default)
+Processed = {}
+
+# Sections each parser can skip (parser class name -> set of section names, filled in as parsers ask)
+_skipped  = {}
+
+# Get the outputs requested on the command line
+# args: Results of command line parsing
+# returns set of output names (see Needs) or None if everything is needed
+def Requested(args):
+    # Dumps look at everything
+    if args.dump:
+        return None
+    # What-if comparisons only look at the components, FV contents, PCD values, and sources
+    if args.whatif:
+        return set(['pcds', 'sources', 'fv'])
+    outputs = set([output for output in ['macros', 'apriori', 'sources', 'libraries', 'ppis', 'protocols', 'guids', 'collisions', 'pcds', 'modules']
+                   if not getattr(args, output)])
+    if args.symbolic:
+        outputs.add('presence')
+    if args.jsonl:
+        outputs.add('fv')
+    if args.fingerprint:
+        outputs.add('fingerprint')
+    if args.impact:
+        outputs.add('impact')
+    return outputs
+
+# Decide which sections are to be processed
+# outputs: Set of requested output names (None to process every section)
+# returns nothing
+def Configure(outputs):
+    Processed.clear()
+    _skipped.clear()
+    if outputs == None:
+        return
+    for parser in Always:
+        Processed[parser] = set(Always[parser])
+        for output in outputs:
+            if parser in Needs[output]:
+                Processed[parser].update(Needs[output][parser])
+
+# Get the sections a parser can skip
+# parser:       Parser class name
+# sectionsInfo: Dictionary of sections the parser handles
+# returns set of section names that can be skipped (empty if none)
+def SkippedSections(parser, sectionsInfo):
+    if not parser in Processed:
+        return set()
+    if not parser in _skipped:
+        _skipped[parser] = set([section for section in sectionsInfo if not section in Processed[parser]])
+    return _skipped[parser]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import json
+import sys
+
+# Local modules
+# None
+
+# Indicates if diagnostics are to be collected (when False they are shown as soon as they are reported)
+Enabled   = False
+
+# Number of errors after which processing stops (0 for no limit)
+MaxErrors = 0
+
+# Indicates if processing was stopped because MaxErrors was reached
+Stopped   = False
+
+# Collected diagnostics (key is (severity, code, fileName, lineNumber, message), value is [order first seen, count])
+Items     = {}
+
+# Number of errors reported (including repeats)
+Errors    = 0
+
+# SARIF levels for each severity
+Levels    = {'error': 'error', 'warning': 'warning', 'note': 'note'}
+
+# Format a diagnostic for display
+# severity:   Severity of the diagnostic ("error", "warning", or "note")
+# fileName:   File to which the diagnostic applies (None if not file specific)
+# lineNumber: Line to which the diagnostic applies (None if not line specific)
+# message:    Message
+# count:      Number of times the diagnostic was reported (default is 1)
+# returns formatted string
+def Format(severity, fileName, lineNumber, message, count = 1):
+    where  = f"{fileName}, line: {lineNumber}\n              " if fileName and lineNumber != None else f"{fileName}: " if fileName else ''
+    repeat = f' (reported {count} times)' if count > 1 else ''
+    return f"\n*** {severity.upper()} *** {where}{message}{repeat}\n"
+
+# Remove all collected diagnostics
+# returns nothing
+def Reset():
+    global Errors, Stopped
+    Items.clear()
+    Errors  = 0
+    Stopped = False
+
+# Collect a diagnostic (repeats of the same diagnostic are only counted)
+# severity:   Severity of the diagnostic ("error", "warning", or "note")
+# code:       Short code identifying the kind of diagnostic (e.g. "unknown-section")
+# fileName:   File to which the diagnostic applies (None if not file specific)
+# lineNumber: Line to which the diagnostic applies (None if not line specific)
+# message:    Message
+# returns nothing
+# Note: Exits (SystemExit) when MaxErrors is reached
+def Add(severity, code, fileName, lineNumber, message):
+    global Errors, Stopped
+    key = (severity, code, fileName, lineNumber, message)
+    if key in Items:
+        Items[key][1] += 1
+    else:
+        Items[key] = [len(Items), 1]
+    if severity == 'error':
+        Errors += 1
+        if MaxErrors and Errors >= MaxErrors and not Stopped:
+            Stopped = True
+            sys.exit(4)
+
+# Get the collected diagnostics
+# returns list of (severity, code, fileName, lineNumber, message, count) in the order first seen
+def Collected():
+    keys = sorted(Items, key = lambda key: Items[key][0])
+    return [key + (Items[key][1],) for key in keys]
+
+# Show the collected diagnostics (each once, with a count if it was repeated)
+# out: Stream to write to (default is None for stderr)
+# returns nothing
+def Show(out = None):
+    out   = out if out else sys.stderr
+    items = Collected()
+    if not items:
+        return
+    for severity, code, fileName, lineNumber, message, count in items:
+        out.write(Format(severity, fileName, lineNumber, message, count))
+    counts = {}
+    for severity, code, fileName, lineNumber, message, count in items:
+        counts[severity] = counts[severity] + count if severity in counts else count
+    total  = sum(counts.values())
+    out.write(f"\nDiagnostics:             {', '.join([f'{counts[severity]} {severity}(s)' for severity in sorted(counts)])} ({total - len(items)} repeats not shown)\n")
+    if Stopped:
+        out.write(f"Stopped after {MaxErrors} error(s) (--max-errors)\n")
+    out.flush()
+
+# Save the collected diagnostics as JSON or SARIF (for CI annotation)
+# fileName: File to be written (SARIF if it ends with .sarif, otherwise JSON)
+# version:  Version of the tool
+# worktree: Worktree that file names are relative to (None if not known)
+# returns nothing
+def Write(fileName, version, worktree):
+    items = Collected()
+    if fileName.lower().endswith('.sarif'):
+        results = []
+        for severity, code, file, lineNumber, message, count in items:
+            result = {'ruleId': code, 'level': Levels[severity] if severity in Levels else 'none', 'message': {'text': message}, 'occurrenceCount': count}
+            if file:
+                location = {'artifactLocation': {'uri': file, 'uriBaseId': 'WORKTREE'}}
+                if lineNumber != None:
+                    location['region'] = {'startLine': lineNumber}
+                result['locations'] = [{'physicalLocation': location}]
+            results.append(result)
+        run  = {'tool': {'driver': {'name': 'uefitool', 'version': str(version), 'rules': [{'id': code} for code in sorted(set([item[1] for item in items]))]}},
+                'results': results}
+        if worktree:
+            run['originalUriBaseIds'] = {'WORKTREE': {'uri': 'file://' + ('' if worktree.startswith('/') else '/') + worktree.replace('\\', '/').rstrip('/') + '/'}}
+        data = {'version': '2.1.0', '$schema': 'https://json.schemastore.org/sarif-2.1.0.json', 'runs': [run]}
+    else:
+        data = {'version': version, 'worktree': worktree, 'stopped': Stopped,
+                'diagnostics': [{'severity': severity, 'code': code, 'file': file, 'line': lineNumber, 'message': message, 'count': count}
+                                for severity, code, file, lineNumber, message, count in items]}
+    with open(fileName, 'w') as out:
+        json.dump(data, out, indent = 2)
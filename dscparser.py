@@ -6,6 +6,7 @@
 # Local modules
 from   debug      import *
 import globals    as     gbl
+import presence
 from   uefiparser import UEFIParser
 
 # PcdsDynamicExHii can have three possible option name sets
@@ -101,25 +102,61 @@ class DSCParser(UEFIParser):
         self.PCDS           = []
         self.SKUIDS         = []
         self.USEREXTENSIONS = []
+        self.component      = None      # Last component (the one whose sub-element is being processed)
         # Call constructor for parent class
         super().__init__(fileName, self.DSCSections, True, True, ['error'], sections, process, outside)
 
     ###################
     # Private methods #
     ###################
-    # None
+
+    # Get the SKU and default store of the current section (only dynamic PCD sections have them, e.g. [PcdsDynamicDefault.common.SKU1.STANDARD])
+    # returns tuple of SKU and default store (None for those not given, COMMON, or DEFAULT)
+    def __skuStore__(self):
+        if not self.section[0].startswith('pcdsdynamic'):
+            return (None, None)
+        sku, store = (self.section + [None, None, None])[2:4]
+        sku        = sku.upper() if sku and not sku.upper() in ('COMMON', 'DEFAULT') else None
+        store      = store.upper() if store else None
+        return (sku, store)
+
+    # Get the module the current line applies to
+    # returns INF of the component whose sub-element is being processed (None if not in a sub-element)
+    def __scope__(self):
+        return self.component if self.subElementState > 0 else None
+
+    # Override a PCD for the platform or the module whose sub-element is being processed
+    # space: Namespace of PCD
+    # name:  Name of PCD
+    # value: New default value for PCD
+    # datum: New data type for PCD
+    # size:  Size of the PCD
+    # returns nothing
+    def __overridePCD__(self, space, name, value, datum, size):
+        module = self.__scope__()
+        if module:
+            gbl.OverrideModulePCD(module, space, name, value, datum, size, self.fileName, self.lineNumber)
+        else:
+            gbl.OverridePCD(space, name, value, datum, size, self.fileName, self.lineNumber, *self.__skuStore__())
 
     ##################
     # Public methods #
     ##################
-    # None
+
+    # Handles a line that continues a [BuildOptions] line
+    # value: Line without the line continuation character and surrounding white space
+    # returns nothing
+    def ContinueLine(self, value):
+        entry          = self.BUILDOPTIONS[-1]
+        entry['value'] = f"{entry['value'].strip() if entry['value'] else ''} {value}".strip()
+        gbl.ContinueBuildOption(self.__scope__(), value)
 
     ####################
     # Special handlers #
     ####################
 
     def macro_SUPPORTED_ARCHITECTURES(self, value):
-        gbl.SupportedArchitectures = value.upper().replace('"', '').split("|")
+        gbl.SetArchitectures(value.upper().replace('"', '').split("|"))
         if Debug(SHOW_SPECIAL_HANDLERS):
             print(f"{self.lineNumber}: Limiting architectires to {','.join(gbl.SupportedArchitectures)}")
 
@@ -135,7 +172,10 @@ class DSCParser(UEFIParser):
         if Debug(SHOW_ERROR_DIRECT1VE):
             print(f"{self.lineNumber}:error {message}")
         if self.process:
-            self.ReportError(f"error({message})")
+            # When processing symbolically, note when the error would occur
+            if gbl.Presence != None and gbl.Presence != presence.TRUE:
+                message = f'{message} (when {presence.ToString(gbl.Presence)})'
+            self.ReportError(f"error({message})", 'error-directive')
 
     # Handle the Include directive
     # includeFile: File to be included
@@ -147,7 +187,9 @@ class DSCParser(UEFIParser):
                     if Debug(SHOW_SKIPPED_DSCS):
                         print(f"{self.lineNumber}:Previously loaded:{file}")
             else:
-                gbl.DSCs[file] = DSCParser(file, self.sections, self.process)
+                parser = DSCParser(file, self.sections, self.process)
+                self.IncludeMacros(parser)
+                gbl.AddDSC(file, parser)
         self.IncludeFile(includeFile, includeDSCFile)
 
     ####################
@@ -163,6 +205,7 @@ class DSCParser(UEFIParser):
     # match: Results of regex match
     # returns nothing
     def match_reBuildOptions(self, match):
+        gbl.AddBuildOption(self.__scope__(), match.group(2), match.group(3), match.group(4).strip() if match.group(4) else '', self.fileName, self.lineNumber)
         # Look for line continuation character
         if match.group(5):
             self.lineContinuation = True
@@ -176,8 +219,10 @@ class DSCParser(UEFIParser):
             self.EnterSubElement()  # Defaults are fine
         # Handle indicated file
         file = match.group(1)
+        self.component = file
         gbl.ReferenceSource(file, self.fileName, self.lineNumber)
-        gbl.INFs.append(file)
+        gbl.AddINF(file)
+        gbl.Emit('on_component', file, self.fileName, self.lineNumber)
 
     # Handle a match in the [Defines] section for reDefines
     # match: Results of regex match
@@ -199,7 +244,8 @@ class DSCParser(UEFIParser):
     def match_reLibraryClasses(self, match):
         file = match.group(3).replace('"', '')
         gbl.ReferenceSource(file, self.fileName, self.lineNumber)      # Indicate reference to INF file
-        gbl.INFs.append(file)
+        gbl.AddINF(file)
+        gbl.Emit('on_library', match.group(1), file, self.fileName, self.lineNumber)
 
     # Handle a match in the [Packages] section for rePackages
     # match: Results of regex match
@@ -207,7 +253,7 @@ class DSCParser(UEFIParser):
     def match_rePackages(self, match):
         file = match.group(1)
         gbl.ReferenceSource(file, self.fileName, self.lineNumber)      # Indicate reference to DEC file
-        gbl.DECs.append(file)
+        gbl.AddDEC(file)
 
     # Handle a match in one of the PCD sections
     # match: Results of regex match
@@ -217,7 +263,7 @@ class DSCParser(UEFIParser):
         # Don't go on unless at lease group4 is defined
         if match.group(4) == None or match.group(4) == '':
             return
-        gbl.OverridePCD(match.group(1), match.group(2), match.group(4), match.group(6), match.group(8), self.fileName, self.lineNumber)
+        self.__overridePCD__(match.group(1), match.group(2), match.group(4), match.group(6), match.group(8))
 
     # Handle a match in one of the PCD sections
     # match: Results of regex match
@@ -238,7 +284,7 @@ class DSCParser(UEFIParser):
     # returns nothing
     def match_rePcdVal(self, match):
         # Can only get here if group1, group2, and group3 are defined
-        gbl.OverridePCD(match.group(1), match.group(2), match.group(3), None, None, self.fileName, self.lineNumber)
+        self.__overridePCD__(match.group(1), match.group(2), match.group(3), None, None)
 
     # Handle a match in one of the PCD sections
     # match: Results of regex match
@@ -252,7 +298,23 @@ class DSCParser(UEFIParser):
         for i in range(5, 9, 2):
             if match.group(i) and match.group(i) != '':
                 return
-        gbl.OverridePCD(match.group(1), match.group(2), match.group(3), None, None, self.fileName, self.lineNumber)
+        self.__overridePCD__(match.group(1), match.group(2), match.group(3), None, None)
+
+    # Handle a match in the [SkuIds] section
+    # match: Results of regex match
+    # returns nothing
+    def match_reSkuIds(self, match):
+        # Can only get here if group1 and group2 are defined (group4 starts with the | before the parent)
+        parent = match.group(4).lstrip('|').strip() if match.group(4) else None
+        gbl.DefineSku(match.group(1), match.group(2), parent if parent else None, self.fileName, self.lineNumber)
+
+    # Handle a match in the [DefaultStores] section
+    # match: Results of regex match
+    # returns nothing
+    def match_reDefaultStores(self, match):
+        # Can only get here if group1 is defined
+        if match.group(3):
+            gbl.DefineDefaultStore(match.group(1), match.group(3), self.fileName, self.lineNumber)
 
     #################
     # Dump handlers #
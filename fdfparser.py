@@ -114,6 +114,11 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     # Private methods #
     ###################
 
+    # Get the name of the FV being described
+    # returns FV name (upper case, empty if not in a named [FV] section)
+    def __fv__(self):
+        return self.section[1].upper() if self.section and self.section[0].lower() == 'fv' and len(self.section) > 1 else ''
+
     # Parse an option string into a set of options
     # optionStr:    String to be parsed
     # allowSingles: Allow options without = following them
@@ -143,7 +148,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                             # Note this must now be the name of the next option
                             option = token
                         else:
-                            self.ReportError(f'Invalid option combination encountered: {optionStr}')
+                            self.ReportError(f'Invalid option combination encountered: {optionStr}', 'invalid-option')
                             return []
                     else:
                         expect = 'value'
@@ -156,7 +161,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                 if expect == '=' and allowSingles:
                     options.append({'option': option, 'value': True})
                 else:
-                    self.ReportError(f'Masing value for option: {option}')
+                    self.ReportError(f'Masing value for option: {option}', 'missing-value')
                     return []
         return options
 
@@ -195,7 +200,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                 [self.match_reFile, self.match_reSection, self.match_reEndDesc, self.match_rePath][i](match)
                 break
         else:
-            self.ReportError('Unsupported line outside of section')
+            self.ReportError('Unsupported line outside of section', 'outside-section')
         # Restore lineNumber and filName
         self.lineNumber, self.fileName = saved
 
@@ -214,13 +219,17 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                     if Debug(SHOW_SKIPPED_DSCS):
                         print(f"{self.lineNumber}:Previously loaded:{file}")
                 else:
-                    gbl.DSCs[file] = DSCParser(file, [], True, self.OutsideLineHandler)
+                    parser = DSCParser(file, [], True, self.OutsideLineHandler)
+                    self.IncludeMacros(parser)
+                    gbl.AddDSC(file, parser)
             else:
                 if file in gbl.FDFs:
                     if Debug(SHOW_SKIPPED_FDFS):
                         print(f"{self.lineNumber}:Previously loaded:{file}")
                 else:
-                    gbl.FDFs[file] = FDFParser(file, self.sections, self.process)
+                    parser = FDFParser(file, self.sections, self.process)
+                    self.IncludeMacros(parser)
+                    gbl.AddFDF(file, parser)
         self.IncludeFile(line, includeHandler)
 
     ####################
@@ -238,7 +247,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reDataStart(self, match):
         # Previous data list must have been completed
         if not self.data == None:
-            self.ReportError('Previous data list not terminated')
+            self.ReportError('Previous data list not terminated', 'data-list')
             return
         self.data = []
         if Debug(SHOW_FD):
@@ -250,7 +259,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reDataAdd(self, match):
         # reDataStart must have been already encountered
         if self.data == None:
-            self.ReportError('Data list not allowed here')
+            self.ReportError('Data list not allowed here', 'data-list')
             return
         data = match.group(0).replace(',', '').split()
         for datum in data:
@@ -271,7 +280,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reApriori(self, match):
         # Previous apriori list must have been completed
         if not self.apriori == None:
-            self.ReportError('Previous apriori list not terminated')
+            self.ReportError('Previous apriori list not terminated', 'apriori')
             return
         # Get APRIORI type
         self.apriori = match.group(1)
@@ -286,7 +295,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reCompress(self, match):
         # Previous compressed descriptor list must have been completed
         if not self.compress == None:
-            self.ReportError('Previous compressed descriptor not terminated')
+            self.ReportError('Previous compressed descriptor not terminated', 'compressed')
             return
         self.compress = { 'type': match.group(1)}
         if Debug(SHOW_FV):
@@ -300,7 +309,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
         # End apriori list (if applicable)
         if self.apriori != None:
             # Save in global variable
-            gbl.Apriori[self.apriori] = self.APRIORI[self.apriori]
+            gbl.SetApriori(self.apriori, self.APRIORI[self.apriori])
             # Clear Apriori list
             if Debug(SHOW_SUBELEMENT_EXIT):
                 print(f'{self.lineNumber}:Exiting {self.apriori} apriori list')
@@ -327,7 +336,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                 if Debug(SHOW_SUBELEMENT_EXIT):
                     print(f'{self.lineNumber}:Exiting guided descriptor')
             else:
-                self.ReportError('Unmatched ending brace characrter encountered: }')
+                self.ReportError('Unmatched ending brace characrter encountered: }', 'unmatched-brace')
             # Clear guided descriptor
             self.guided = None
         # End file descriptor (if applicable)
@@ -356,7 +365,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
             if Debug(SHOW_SUBELEMENT_EXIT):
                 print(f'{self.lineNumber}:Exiting rule descriptor')
         else:
-            self.ReportError('End brace found without matching start brace')
+            self.ReportError('End brace found without matching start brace', 'unmatched-brace')
 
     # Handle a match in the [rules] section that matches reExt
     # match: Results of regex match
@@ -364,7 +373,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reExt(self, match):
         # reRule must have been previously encountered
         if self.rule == None:
-            self.ReportError('RULE must start with FILE description')
+            self.ReportError('RULE must start with FILE description', 'rule')
             return
         path, ext = (match.group(3), match.group(4))
         info      = match.group(0)[0:match.span(3)[0]].split()
@@ -398,12 +407,14 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reFile(self, match):
         # Previous file descriptor must have been completes
         if not self.file == None:
-            self.ReportError('Previous file descriptor not terminated')
+            self.ReportError('Previous file descriptor not terminated', 'file-descriptor')
             return
         msg = ''
         kind = match.group(1)
         guid = match.group(2)
-        self.file = {'type': kind, 'guid': guid, 'options': self.__getOptions__(match.group(3), True), 'sections': []}
+        self.file = {'type': kind, 'guid': guid, 'options': self.__getOptions__(match.group(3), True), 'sections': [], 'fv': self.__fv__(), 'fileName': self.fileName, 'lineNumber': self.lineNumber}
+        if gbl.Presence != None:
+            self.file['presence'] = gbl.Presence
         if Debug(SHOW_FV):
             print(f'{self.lineNumber}:FILE {kind} {guid}{msg}')
         if Debug(SHOW_SUBELEMENT_ENTER):
@@ -415,7 +426,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reGuided(self, match):
         # Previous guided descriptor list must have been completed
         if not self.guided == None:
-            self.ReportError('Previous guided descriptor not terminated')
+            self.ReportError('Previous guided descriptor not terminated', 'guided')
             return
         guid = options = None
         if match.group(1):
@@ -435,8 +446,10 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     # returns nothing
     def match_reInf(self, match):
         # Check for Apriori
-        inf = match.group(4)
+        inf  = match.group(4)
+        opts = self.__getOptions__(match.group(1))
         gbl.ReferenceSource(inf, self.fileName, self.lineNumber)       # Add reference to INF file
+        gbl.Emit('on_fv_inf', inf, opts, self.apriori, self.fileName, self.lineNumber)
         if self.apriori:
             self.APRIORI[self.apriori].Append(inf)
             if Debug(SHOW_FV):
@@ -444,8 +457,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
         # Normal INF entry
         else:
             # Add any detected options
-            opts = self.__getOptions__(match.group(1))
-            self.INFS.append((inf, opts))
+            self.INFS.append((inf, opts, gbl.Presence, self.__fv__()))
             if Debug(SHOW_FV):
                 print(f'{self.lineNumber}:INF {inf}{self.__optionStr__(opts)}')
 
@@ -455,11 +467,11 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_rePath(self, match):
         # Can only have this when a file is being described and when one of the other descriptors is active
         if self.file == None or (self.compress != None or self.guided != None or self.sect != None):
-            self.ReportError('FV path not allowed outstide of file description')
+            self.ReportError('FV path not allowed outstide of file description', 'fv-path')
             return
         # File type must be RAW
         if not self.file['type'] == 'RAW':
-            self.ReportError('FV path only allowed with RAW file types')
+            self.ReportError('FV path only allowed with RAW file types', 'fv-path')
             return
         path = match.group(1)
         self.file['path'] = path
@@ -488,7 +500,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reSection(self, match):
         if Debug(SHOW_FV): msg = ''
         if self.file == None:
-            self.ReportError('SECTION not allowed outstide of file description')
+            self.ReportError('SECTION not allowed outstide of file description', 'section')
             return
         # Tokenize secion info
         items = match.group(1).split()
@@ -499,7 +511,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
         # Handle GUIDED type (format GUIDED <guid> [options])
         if kind == 'GUIDED':
             if len(items) < 2:
-                self.ReportError('SECTION GUIDED uncountered with no GUID')
+                self.ReportError('SECTION GUIDED uncountered with no GUID', 'section')
                 return
             value = items[1]
             sect['type'] = {'GUIDED': value}
@@ -508,14 +520,14 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
         # Handle other types (format <type> = <value> [options])
         else:
             if len(items) < 3 or items[1] != '=':
-                self.ReportError(f'Invalid SECTION {kind} uncountered')
+                self.ReportError(f'Invalid SECTION {kind} uncountered', 'section')
             value = items[2]
             sect['type'] = {'type': kind, 'value': value}
             i = 3   # Look for options starting here!
         # Handle options
         while i < len(items):
             if len(items) < i + 2 or items[i+1] != '=':
-                self.ReportError(f'Invalid {opt} option uncountered')
+                self.ReportError(f'Invalid {opt} option uncountered', 'section')
             opt = items[i]
             val = items[i+2]
             sect['options'].append({'option': opt, 'value': val})
@@ -541,7 +553,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
     def match_reVer(self, match):
         # Can only have this when a rule is being described
         if self.rule == None:
-            self.ReportError('RULE must start with FILE description')
+            self.ReportError('RULE must start with FILE description', 'rule')
             return
         kind, opts = (match.group(1), self.__getOptions__(match.group(2).strip(), True))
         if self.guided:
@@ -597,7 +609,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                 else:                  result += handler(attr, item[attr])
             return result
         def ShouldNeverGetHere(attr, item):
-            self.ReportError('Error dumping rules')
+            self.ReportError('Error dumping rules', 'dump')
             return
         def DumpLevel2(attr, item):
             first  = item['type'] if attr == 'compress' else item['guid']
@@ -633,7 +645,7 @@ class FDFParser(UEFIParser):   #debug,        regularExpression(s),
                 msg = item[0]
                 for opt in item[1]:
                     msg += f" {opt['option']}={opt['value']}"
-                print(f'        {i}:{msg}')
+                print(f'        {i}:{item[3]}:{msg}')
 
     def DumpFILES(self):
         def GetOptions(opts):
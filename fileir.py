@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import os
+import re
+
+# Local modules
+# None
+
+##############
+# Line kinds #
+##############
+DIRECTIVE = 0           # Line starts with !
+SECTION   = 1           # Line starts with [
+DEFINE    = 2           # Line starts with DEFINE
+BODY      = 3           # Any other line
+CLOSE     = 4           # Line starts with } (end of a sub-element)
+
+# Names of the line kinds (for messaging)
+KindNames = ['directive', 'section', 'define', 'body', 'close']
+
+# Regular expression for locating macro references (format "$(<macroName>)")
+# Groups 1=>macroName
+reMacro   = re.compile(r'\$\(([^\)]+)\)')
+
+# Indicates if file IRs are to be kept for reuse (only useful when files are evaluated more than once)
+Enabled   = False
+
+# File IRs indexed by absolute file name
+Cache     = {}
+
+# Looks for and removes any comments
+# line:         line on which to look for potential comments
+# commentBlock: True if currently in a comment block
+# returns tuple of line with comments removed (None if entire line was a comment) and new comment block state
+def RemoveComments(line, commentBlock):
+    placeholders = []
+    def replaceString(match):
+        # Replace string literal with a placeholder
+        placeholders.append(match.group(0))
+        return f'__STRING_LITERAL_{len(placeholders)-1}__'
+    line = line.strip()
+    # Handle case where currently in a comment block
+    if commentBlock:
+        # Look for exit from comment block
+        return (None, not line.endswith("*/"))
+    # Look for comment lines
+    if not line or (line.startswith('#') or line.startswith(';') or line.startswith("/*")):
+        # Look for entry into comment block
+        return (None, line.startswith("/*"))
+    # Replace strings with placeholders
+    if '"' in line:
+        line = re.sub(r'".*?"', replaceString, line)
+    if "'" in line:
+        line = re.sub(r"'.*?'", replaceString, line)
+    # Remove any trailing comments
+    line    = line.split('#')[0]
+    if ';' in line:
+        line = re.sub(r'[ \t]+;.+$', '', line)
+    if '//' in line:
+        line = re.sub(r'//[a-zA-Z0-9_\*: \t]+$', '', line)
+    # Restore strings from placeholders
+    for i, placeholder in enumerate(placeholders):
+        line = line.replace(f'__STRING_LITERAL_{i}__', placeholder)
+    return (line.strip(), False)
+
+# Determine the kind of a line (before macro expansion)
+# line: Line with comments removed
+# returns DIRECTIVE, SECTION, DEFINE, CLOSE, or BODY
+def Classify(line):
+    first = line[0]
+    if first == '!':
+        return DIRECTIVE
+    if first == '[':
+        return SECTION
+    if (first == 'D' or first == 'd') and line[:6].upper() == 'DEFINE' and line[6:7].isspace():
+        return DEFINE
+    if first == '}':
+        return CLOSE
+    return BODY
+
+# Class for the configuration independent representation of a file
+class FileIR:
+
+    # Constructor
+    # fileName: File to be represented
+    # returns nothing
+    def __init__(self, fileName):
+        self._fileName = fileName
+        self._lines    = []         # Tuples of (lineNumber, kind, line, macros) for each non-comment line
+        with open(fileName, 'r') as file:
+            content = file.readlines()
+        self._count    = len(content)
+        commentBlock   = False
+        for lineNumber, line in enumerate(content, 1):
+            line, commentBlock = RemoveComments(line, commentBlock)
+            if not line:
+                continue
+            self._lines.append((lineNumber, Classify(line), line, reMacro.findall(line)))
+
+    # Getter for fileName property
+    def _get_fileName(self):
+        return self._fileName
+
+    # Getter for lines property
+    def _get_lines(self):
+        return self._lines
+
+    # Getter for count property
+    def _get_count(self):
+        return self._count
+
+    # Properties
+    fileName = property(fget = _get_fileName)
+    lines    = property(fget = _get_lines)
+    count    = property(fget = _get_count)
+
+# Get the IR for a file (reusing a previous one if possible)
+# fileName: File for which the IR is needed
+# returns FileIR for the file
+def Load(fileName):
+    if not Enabled:
+        return FileIR(fileName)
+    key = os.path.abspath(fileName)
+    if not key in Cache:
+        Cache[key] = FileIR(fileName)
+    return Cache[key]
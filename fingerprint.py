@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import concurrent.futures
+import hashlib
+import json
+import os
+
+# Local modules
+# None
+
+# Version of the manifest format (manifests of other versions are not reused)
+Version    = 1
+
+# Size of the reads when hashing (hashlib releases the GIL for large updates so the threads hash in parallel)
+BufferSize = 1 << 20
+
+# Number of files given to a thread at a time
+BatchSize  = 256
+
+# Get the hash of a file
+# fileName: File to be hashed
+# returns SHA-256 hash of the file contents (hexadecimal)
+def Hash(fileName):
+    digest = hashlib.sha256()
+    buffer = bytearray(BufferSize)
+    view   = memoryview(buffer)
+    with open(fileName, 'rb', buffering = 0) as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+# Load a manifest
+# fileName: Manifest file
+# returns dictionary of file -> [size, mtime (ns), inode, hash] (empty if there is no manifest or it can't be used)
+def Load(fileName):
+    try:
+        with open(fileName, 'r') as file:
+            manifest = json.load(file)
+        return manifest['files'] if manifest.get('version') == Version else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+
+# Save a manifest
+# fileName: Manifest file
+# entries:  Dictionary of file -> [size, mtime (ns), inode, hash]
+# missing:  List of files that do not exist
+# returns nothing
+def Save(fileName, entries, missing):
+    # One file per line so manifests can be compared with diff
+    with open(fileName, 'w') as file:
+        file.write(f'{{"version": {Version},\n "files": {{')
+        file.write(','.join([f'\n  {json.dumps(name)}: {json.dumps(entries[name])}' for name in sorted(entries)]))
+        file.write('\n },\n "missing": [')
+        file.write(','.join([f'\n  {json.dumps(name)}' for name in sorted(missing)]))
+        file.write('\n ]\n}\n')
+
+# Fingerprint a batch of files
+# The stat of each file is both the existence check and the change check (the previous hash is reused when the size, mtime and
+# inode are unchanged)
+# files:    List of files
+# previous: Dictionary of file -> [size, mtime (ns), inode, hash] from the previous manifest
+# returns list of (file, entry or None if the file does not exist, True if the file was hashed)
+def __fingerprintBatch__(files, previous):
+    results = []
+    for name in files:
+        try:
+            info  = os.stat(name)
+        except OSError:
+            results.append((name, None, False))
+            continue
+        entry = [info.st_size, info.st_mtime_ns, info.st_ino]
+        old   = previous.get(name)
+        if old and old[:3] == entry:
+            results.append((name, old, False))
+        else:
+            try:
+                results.append((name, entry + [Hash(name)], True))
+            except OSError:
+                results.append((name, None, False))
+    return results
+
+# Fingerprint files on a thread pool
+# files:    List of files (relative to the current directory or absolute)
+# previous: Dictionary of file -> [size, mtime (ns), inode, hash] from the previous manifest (default is {} for none)
+# threads:  Number of threads (default is None for the thread pool default)
+# returns tuple of dictionary of file -> [size, mtime (ns), inode, hash], list of missing files, and number of files hashed
+def Fingerprint(files, previous = {}, threads = None):
+    files   = sorted(set(files))
+    entries = {}
+    missing = []
+    hashed  = 0
+    batches = [files[i:i + BatchSize] for i in range(0, len(files), BatchSize)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers = threads) as executor:
+        for results in executor.map(__fingerprintBatch__, batches, [previous] * len(batches)):
+            for name, entry, new in results:
+                if entry == None:
+                    missing.append(name)
+                else:
+                    entries[name] = entry
+                    hashed       += 1 if new else 0
+    return (entries, missing, hashed)
@@ -5,9 +5,15 @@ import platform
 import os
 import re
 import sys
+import time
 
 # Local modules
 from debug import DebugLevel
+import diagnostics
+import pcdvalue
+import profiler
+import tracer
+import visitor
 
 ###################
 # Program version #
@@ -312,6 +318,18 @@ reSet                 = r'^(set)\s+' + reFirmEquate
 # Groups 1=>VERSION or UI, 2=>optional options
 reVer                 = r'(VERSION|UI)\s+(.+)$'
 
+### Regular expressions for GUID values
+#######################################
+
+# Regular expression for matching GUIDs with format "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx"
+# Groups 1=>data1, 2=>data2, 3=>data3, 4=>first two bytes of data4, 5=>last six bytes of data4
+reGuidRegistry        = r'^([0-9A-F]{8})-([0-9A-F]{4})-([0-9A-F]{4})-([0-9A-F]{4})-([0-9A-F]{12})$'
+
+# Regular expression for matching GUIDs with format "{ 0x?, 0x?, 0x?, { 0x?, 0x?, 0x?, 0x?, 0x?, 0x?, 0x?, 0x? }}"
+# Groups 1=>data1, 2=>data2, 3=>data3, 4=>data4 (Must process group(4).split(',') to get individual bytes)
+reHexField            = r'\s*(0x[0-9A-F]+)\s*'
+reGuidStruct          = r'^\{' + reHexField + ',' + reHexField + ',' + reHexField + r',\s*\{(' + (reHexField + ',') * 7 + reHexField + r')\}\s*\}$'
+
 # Global Variables
 CommandLineResults      = None
 Paths                   = []
@@ -323,9 +341,30 @@ Protocols               = {}
 Guids                   = {}
 Worktree                = None
 
+# SKUs and default stores ([SkuIds] and [DefaultStores] of the DSC files, keys are upper case names)
+Skus                    = {}    # SKU -> {'value', 'name', 'parent' (upper case, None for DEFAULT)}
+DefaultStores           = {}    # default store -> {'value', 'name'}
+
+# Files found by FindPath (tuple of the worktree and Paths the files were looked for in and dictionary of partial path -> full path or None)
+FoundPaths              = (None, {})
+
+# Incremented whenever Skus or DefaultStores changes (so resolved PCD values can be worked out again)
+SkuGeneration           = 0
+
+# Settings for a single module ([Components] sub-elements) and the platform build options (keys are INFs as given in the DSC)
+ModulePcds              = {}    # INF -> {PCD -> {'value', 'datum', 'size', 'fileName', 'lineNumber'}}
+BuildOptions            = {}    # INF (None for the platform [BuildOptions]) -> list of {'family', 'option', 'value', 'fileName', 'lineNumber'}
+
 # Macro definitions used in expansion
 Macros                  = {}
 
+# Macro values that cannot be changed by the DSC/FDF files (like -D on the build command line)
+Overrides               = {}
+
+# Macro dependency graph
+MacroReaders            = {}    # macro -> set of (fileName, lineNumber, usage) where the macro was read
+MacroDefiners           = {}    # macro -> set of (fileName, lineNumber) where the macro was defined
+
 # For keeping track of the files and lines
 Lines                   = 0
 DSCs                    = {}
@@ -336,6 +375,15 @@ FDFs                    = {}
 # For limiting the architectures
 SupportedArchitectures  = []
 
+# Incremented whenever SupportedArchitectures changes (so work that depends on it can be redone)
+ArchitectureGeneration  = 0
+
+# For recording updates made while parsing a file (None when not recording)
+Journal                 = None
+
+# Presence condition (see presence.py) of what is currently being parsed (None when not processing symbolically)
+Presence                = None
+
 # Determine if this is Windows OS
 isWindows  = 'WINDOWS' in platform.platform().upper()
 
@@ -375,6 +423,9 @@ class INF:
         self._version_string = None
         self._depex          = None
         self._parser         = None
+        self._dependencies   = []
+        self._pcds           = []
+        self._buildoptions   = []
 
     def SetItem(self, item, value):
         attr = '_' + item.lower()
@@ -409,6 +460,18 @@ class INF:
     def _get_parser(self):
         return self._parser
 
+    # Getter for dependencies property
+    def _get_dependencies(self):
+        return self._dependencies
+
+    # Getter for pcds property (PCDs listed in the INF's PCD sections)
+    def _get_pcds(self):
+        return self._pcds
+
+    # Getter for buildoptions property (list of (family, option, value) from the INF's [BuildOptions])
+    def _get_buildoptions(self):
+        return self._buildoptions
+
     # Properties
     fileName       = property(fget = _get_fileName) 
     file_guid      = property(fget = _get_file_guid) 
@@ -417,6 +480,9 @@ class INF:
     version_string = property(fget = _get_version_string) 
     depex          = property(fget = _get_depex) 
     parser         = property(fget = _get_parser) 
+    dependencies   = property(fget = _get_dependencies) 
+    pcds           = property(fget = _get_pcds)
+    buildoptions   = property(fget = _get_buildoptions)
 
 # Add a new source file reference
 # reference: File being referenced
@@ -426,6 +492,10 @@ class INF:
 # returns nothing
 def ReferenceSource(reference, referer, line):
     global Sources
+    if Journal != None:
+        Journal.append((ReferenceSource, (reference, referer, line)))
+    if visitor.Enabled:
+        visitor.Emit('on_source', reference, referer, line)
     if reference in Sources:
         Sources[reference].Reference(referer, line)
     else:
@@ -486,6 +556,10 @@ class GUID:
 # lineNumber: Line number containing the definition
 # returns nothing
 def DefineGuid(guid, value, db, fileName, lineNumber):
+    if Journal != None:
+        Journal.append((DefineGuid, (guid, value, db, fileName, lineNumber)))
+    if visitor.Enabled:
+        visitor.Emit('on_guid_ref', 'define', GuidKind(db), guid, value, fileName, lineNumber)
     if not guid in db:
         db[guid] = GUID()
     db[guid].Define(value, fileName, lineNumber)
@@ -497,10 +571,56 @@ def DefineGuid(guid, value, db, fileName, lineNumber):
 # lineNumber: Line number containing the reference
 # returns nothing
 def ReferenceGuid(guid, db, fileName, lineNumber):
+    if Journal != None:
+        Journal.append((ReferenceGuid, (guid, db, fileName, lineNumber)))
+    if visitor.Enabled:
+        visitor.Emit('on_guid_ref', 'reference', GuidKind(db), guid, None, fileName, lineNumber)
     if not guid in db:
         db[guid] = GUID()
     db[guid].Reference(fileName, lineNumber)
 
+# Get the kind of GUID held by a GUID dictionary
+# db: Dictionary of GUIDs (Guids, Ppis, or Protocols)
+# returns "guid", "ppi", or "protocol"
+def GuidKind(db):
+    return 'ppi' if db is Ppis else 'protocol' if db is Protocols else 'guid'
+
+# Convert a GUID value into its canonical 128-bit integer value
+# value: GUID value in registry format (xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx) or C structure format
+#        ({ 0x?, 0x?, 0x?, { 0x?, ... }}) optionally surrounded by quotes or GUID(...)
+# returns 128-bit integer value or None if value is not a recognizable GUID
+def CanonicalGuid(value):
+    if value == None:
+        return None
+    value = value.strip()
+    # Remove GUID(...) wrapper and quotes (if any)
+    if value.upper().startswith('GUID(') and value.endswith(')'):
+        value = value[5:-1].strip()
+    value = value.strip('"').strip()
+    # Look for registry format
+    match = re.match(reGuidRegistry, value, re.IGNORECASE)
+    if match:
+        return int(''.join(match.groups()), 16)
+    # Look for C structure format
+    match = re.match(reGuidStruct, value, re.IGNORECASE)
+    if not match:
+        return None
+    data1, data2, data3 = (int(match.group(i), 16) for i in range(1, 4))
+    data4 = [int(byte, 16) for byte in match.group(4).split(',')]
+    if data1 > 0xFFFFFFFF or data2 > 0xFFFF or data3 > 0xFFFF or max(data4) > 0xFF:
+        return None
+    result = (data1 << 96) | (data2 << 80) | (data3 << 64)
+    for i, byte in enumerate(data4):
+        result |= byte << (8 * (7 - i))
+    return result
+
+# Convert a canonical GUID value into registry format
+# value: 128-bit integer value of the GUID
+# returns GUID string in the format XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX
+def FormatGuid(value):
+    text = f'{value:032X}'
+    return f'{text[0:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:32]}'
+
 class PCD:
 
     # Constructor
@@ -513,6 +633,8 @@ class PCD:
         self._size       = None
         self._overrider  = None
         self._references = []
+        self._overrides  = {}           # (SKU, default store) -> override (the last one given)
+        self._resolved   = (None, {})   # (SkuGeneration, (SKU, default store) -> override) for resolved values
 
     # Define a PCD
     # default:    Default value of the PCD
@@ -532,11 +654,36 @@ class PCD:
     # size:       Size of the PCD          (only valid is the defined type is VOID*)
     # fileName:   File containing the override
     # lineNumber: Line number containing the override
-    def Override(self, value, datum, size, fileName, lineNumber):
+    # sku:        SKU the override is for (default is None for DEFAULT)
+    # store:      Default store the override is for (default is None for the default store)
+    def Override(self, value, datum, size, fileName, lineNumber, sku = None, store = None):
         self._value      = value
         self._datum      = datum
         self._size       = size
         self._overrider  = {'fileName': fileName, 'lineNumber': lineNumber}
+        self._overrides[(sku.upper() if sku else 'DEFAULT', store.upper() if store else None)] = \
+            {'value': value, 'datum': datum, 'size': size, 'sku': sku, 'store': store, 'fileName': fileName, 'lineNumber': lineNumber}
+        self._resolved   = (None, {})
+
+    # Get the override in effect for a SKU and default store (results are kept until an override, SKU, or store is added)
+    # The SKU and then its parents are searched (ending with DEFAULT), trying the store and then the default store for each
+    # sku:   SKU (default is None for DEFAULT)
+    # store: Default store (default is None for the default store, the one with the lowest value)
+    # returns override dictionary (value, datum, size, sku, store, fileName, lineNumber) or None if the DEC default is in effect
+    def Resolve(self, sku = None, store = None):
+        key = (sku.upper() if sku else 'DEFAULT', store.upper() if store else None)
+        if self._resolved[0] != SkuGeneration:
+            self._resolved = (SkuGeneration, {})
+        resolved = self._resolved[1]
+        if not key in resolved:
+            resolved[key] = None
+            default = LowestStore()
+            stores  = [None, default] if key[1] in (None, default) else [key[1], None, default]
+            for parent, store in [(parent, store) for parent in SkuChain(key[0]) for store in stores]:
+                if (parent, store) in self._overrides:
+                    resolved[key] = self._overrides[(parent, store)]
+                    break
+        return resolved[key]
 
     # Add a refernce to the PCD
     # fileName:   File containing the reference
@@ -572,10 +719,49 @@ class PCD:
     def _get_overrider(self):
         return self._overrider
 
+    # Getter for overrides property (list of every SKU and default store override)
+    def _get_overrides(self):
+        return list(self._overrides.values())
+
     # Getter for references property
     def _get_references(self):
         return self._references
 
+    # Getter for typedDefault property (default converted to the datum type, see pcdvalue.Parse)
+    def _get_typedDefault(self):
+        return pcdvalue.Parse(self._default, self._datum)[0]
+
+    # Getter for typedValue property (value converted to the datum type, see pcdvalue.Parse)
+    def _get_typedValue(self):
+        return pcdvalue.Parse(self._value, self._datum)[0]
+
+    # Getter for dataSize property (bytes the PCD takes up in the PCD database, None if not known)
+    # VOID* PCDs take up their maximum size if one is given, otherwise the size of their value
+    def _get_dataSize(self):
+        maximum = pcdvalue.Number(self._size)
+        if maximum != None and (self._datum or '').strip().upper() == 'VOID*':
+            return maximum
+        return pcdvalue.Size(self.typedValue if self._overrider else self.typedDefault, self._datum)
+
+    # Check the default value and the override against the datum type and maximum size
+    # name: Name of the PCD (for messages)
+    # returns list of (message, definer or overrider) for each problem found
+    def Check(self, name):
+        problems = []
+        for value, location in ((self._default, self._definer), (self._value, self._overrider)):
+            if location == None:
+                continue
+            error = pcdvalue.Parse(value, self._datum)[1]
+            if error:
+                problems.append((f'Value of {name} is not valid: {error}', location))
+        maximum = pcdvalue.Number(self._size)
+        value   = self.typedValue if self._overrider else None
+        if self._size and maximum == None:
+            problems.append((f'Maximum size of {name} is not a number: {self._size}', self._overrider))
+        elif maximum != None and type(value) is bytes and len(value) > maximum:
+            problems.append((f'Value of {name} is {len(value)} bytes, more than its maximum size of {maximum}', self._overrider))
+        return problems
+
     # Properties
     default     = property(fget = _get_default)
     datum       = property(fget = _get_datum)
@@ -584,7 +770,11 @@ class PCD:
     value       = property(fget = _get_value)
     size        = property(fget = _get_size)
     overrider   = property(fget = _get_overrider)
+    overrides   = property(fget = _get_overrides)
     references  = property(fget = _get_references)
+    typedDefault = property(fget = _get_typedDefault)
+    typedValue  = property(fget = _get_typedValue)
+    dataSize    = property(fget = _get_dataSize)
 
 # Define a PCD
 # space:      Namespace of PCD
@@ -597,7 +787,11 @@ class PCD:
 # returns nothing
 def DefinePCD(space, name, default, datum, token, fileName, lineNumber):
     global Pcds
+    if Journal != None:
+        Journal.append((DefinePCD, (space, name, default, datum, token, fileName, lineNumber)))
     pcd = space + '.' + name
+    if visitor.Enabled:
+        visitor.Emit('on_pcd', 'define', pcd, default, fileName, lineNumber)
     if not pcd in Pcds:
         Pcds[pcd] = PCD()
     Pcds[pcd].Define(default, datum, token, fileName, lineNumber)
@@ -610,13 +804,66 @@ def DefinePCD(space, name, default, datum, token, fileName, lineNumber):
 # size:       Size of the PCD
 # fileName:   File containing the override
 # lineNumber: Line number containing the override
+# sku:        SKU the override is for (default is None for DEFAULT)
+# store:      Default store the override is for (default is None for the default store)
 # returns nothing
-def OverridePCD(space, name, default, datum, size, fileName, lineNumber):
+def OverridePCD(space, name, default, datum, size, fileName, lineNumber, sku = None, store = None):
     global Pcds
+    if Journal != None:
+        Journal.append((OverridePCD, (space, name, default, datum, size, fileName, lineNumber, sku, store)))
     pcd = space + '.' + name
+    if visitor.Enabled:
+        visitor.Emit('on_pcd', 'override', pcd, default, fileName, lineNumber)
     if not pcd in Pcds:
         Pcds[pcd] = PCD()
-    Pcds[pcd].Override(default, datum, size, fileName, lineNumber)
+    Pcds[pcd].Override(default, datum, size, fileName, lineNumber, sku, store)
+
+# Define a SKU
+# value:      SKU value
+# name:       SKU name
+# parent:     Parent SKU name (None for DEFAULT)
+# fileName:   File containing the SKU
+# lineNumber: Line number containing the SKU
+# returns nothing
+def DefineSku(value, name, parent, fileName, lineNumber):
+    global SkuGeneration
+    if Journal != None:
+        Journal.append((DefineSku, (value, name, parent, fileName, lineNumber)))
+    Skus[name.upper()] = {'value': value, 'name': name, 'parent': parent.upper() if parent and name.upper() != 'DEFAULT' else None,
+                          'fileName': fileName, 'lineNumber': lineNumber}
+    SkuGeneration += 1
+
+# Define a default store
+# value:      Default store value
+# name:       Default store name
+# fileName:   File containing the default store
+# lineNumber: Line number containing the default store
+# returns nothing
+def DefineDefaultStore(value, name, fileName, lineNumber):
+    global SkuGeneration
+    if Journal != None:
+        Journal.append((DefineDefaultStore, (value, name, fileName, lineNumber)))
+    DefaultStores[name.upper()] = {'value': value, 'name': name, 'fileName': fileName, 'lineNumber': lineNumber}
+    SkuGeneration += 1
+
+# Get a SKU and its parents
+# sku: SKU name (upper case)
+# returns list of SKU names (upper case) starting with the SKU and ending with DEFAULT
+def SkuChain(sku):
+    chain = [sku]
+    while sku in Skus and Skus[sku]['parent'] and not Skus[sku]['parent'] in chain:
+        sku = Skus[sku]['parent']
+        chain.append(sku)
+    if chain[-1] != 'DEFAULT':
+        chain.append('DEFAULT')
+    return chain
+
+# Get the default store with the lowest value (the one in effect when no store is given)
+# returns default store name (upper case) or None if there are no default stores
+def LowestStore():
+    stores = [(pcdvalue.Number(DefaultStores[store]['value']), store) for store in DefaultStores]
+    stores = [item for item in stores if item[0] != None]
+    return min(stores)[1] if stores else None
 
 # Reference a PCD
 # space:      Namespace of PCD
@@ -626,24 +873,177 @@ def OverridePCD(space, name, default, datum, size, fileName, lineNumber):
 # returns nothing
 def ReferencePCD(space, name, fileName, lineNumber):
     global Pcds
+    if Journal != None:
+        Journal.append((ReferencePCD, (space, name, fileName, lineNumber)))
     pcd = space + '.' + name
+    if visitor.Enabled:
+        visitor.Emit('on_pcd', 'reference', pcd, None, fileName, lineNumber)
     if not pcd in Pcds:
         Pcds[pcd] = PCD()
     Pcds[pcd].Reference(fileName, lineNumber)
 
-# Output an error message to STDERR
-# message: Message to display
+# Override a PCD for a single module (in a [Components] sub-element)
+# inf:        INF of the module (as given in the DSC)
+# space:      Namespace of PCD
+# name:       Name of PCD
+# default:    New default value for PCD
+# datum:      New data type for PCD
+# size:       Size of the PCD
+# fileName:   File containing the override
+# lineNumber: Line number containing the override
+# returns nothing
+def OverrideModulePCD(inf, space, name, default, datum, size, fileName, lineNumber):
+    if Journal != None:
+        Journal.append((OverrideModulePCD, (inf, space, name, default, datum, size, fileName, lineNumber)))
+    if not inf in ModulePcds:
+        ModulePcds[inf] = {}
+    ModulePcds[inf][space + '.' + name] = {'value': default, 'datum': datum, 'size': size, 'fileName': fileName, 'lineNumber': lineNumber}
+
+# Add a build option for the platform or a single module (in a [Components] sub-element)
+# inf:        INF of the module (as given in the DSC, None for the platform)
+# family:     Tool chain family (None if not given)
+# option:     Option (TARGET_TOOLCHAIN_ARCH_COMMANDTYPE_ATTRIBUTE)
+# value:      Value of the option (starts with = when it replaces the platform value)
+# fileName:   File containing the option
+# lineNumber: Line number containing the option
+# returns nothing
+def AddBuildOption(inf, family, option, value, fileName, lineNumber):
+    if Journal != None:
+        Journal.append((AddBuildOption, (inf, family, option, value, fileName, lineNumber)))
+    if not inf in BuildOptions:
+        BuildOptions[inf] = []
+    BuildOptions[inf].append({'family': family, 'option': option, 'value': value, 'fileName': fileName, 'lineNumber': lineNumber})
+
+# Add a continuation line to the last build option for the platform or a single module
+# inf:   INF of the module (as given in the DSC, None for the platform)
+# value: Continuation line (without the line continuation character)
+# returns nothing
+def ContinueBuildOption(inf, value):
+    if Journal != None:
+        Journal.append((ContinueBuildOption, (inf, value)))
+    option          = BuildOptions[inf][-1]
+    option['value'] = f"{option['value']} {value}".strip()
+
+# Add a DEC file to the list of DEC files to be processed
+# file: DEC file to be added
+# returns nothing
+def AddDEC(file):
+    global DECs
+    if Journal != None:
+        Journal.append((AddDEC, (file,)))
+    DECs.append(file)
+
+# Add an INF file to the list of INF files to be processed
+# file: INF file to be added
+# returns nothing
+def AddINF(file):
+    global INFs
+    if Journal != None:
+        Journal.append((AddINF, (file,)))
+    INFs.append(file)
+
+# Add an included DSC file
+# file:   DSC file
+# parser: DSCParser object of the file
+# returns nothing
+def AddDSC(file, parser):
+    global DSCs
+    if Journal != None:
+        Journal.append((AddDSC, (file, parser)))
+    DSCs[file] = parser
+
+# Add an included FDF file
+# file:   FDF file
+# parser: FDFParser object of the file
+# returns nothing
+def AddFDF(file, parser):
+    global FDFs
+    if Journal != None:
+        Journal.append((AddFDF, (file, parser)))
+    FDFs[file] = parser
+
+# Add a completed apriori list
+# kind:    Kind of apriori list ("PEI" or "DXE")
+# apriori: Apriori object of the list
+# returns nothing
+def SetApriori(kind, apriori):
+    if Journal != None:
+        Journal.append((SetApriori, (kind, apriori)))
+    Apriori[kind] = apriori
+
+# Limit the architectures
+# architectures: List of supported architectures
+# returns nothing
+def SetArchitectures(architectures):
+    global SupportedArchitectures, ArchitectureGeneration
+    if Journal != None:
+        Journal.append((SetArchitectures, (architectures,)))
+    SupportedArchitectures  = architectures
+    ArchitectureGeneration += 1
+
+# Send a visitor event from a parser (events sent from the database functions above are sent again when they are replayed)
+# event: Name of the event method (e.g. "on_component")
+# args:  Arguments for the event method
 # returns nothing
-def Error(message):
+def Emit(event, *args):
+    if Journal != None:
+        Journal.append((Emit, (event,) + args))
+    if visitor.Enabled:
+        visitor.Emit(event, *args)
+
+# Report an error (or other diagnostic)
+# Diagnostics are collected and shown once at the end when the diagnostics collector is enabled, otherwise they are output immediately
+# Diagnostics reported while parsing a file are recorded so they are reported again when the parse results are reused
+# message:    Message to display
+# fileName:   File to which the message applies (default is None if not file specific)
+# lineNumber: Line to which the message applies (default is None if not line specific)
+# code:       Short code identifying the kind of diagnostic (default is "general")
+# severity:   Severity of the diagnostic ("error", "warning", or "note", default is "error")
+# returns nothing
+def Error(message, fileName = None, lineNumber = None, code = 'general', severity = 'error'):
     global DebugLevel
+    if Journal != None:
+        Journal.append((Error, (message, fileName, lineNumber, code, severity)))
+    message = message.strip()
+    if diagnostics.Enabled:
+        diagnostics.Add(severity, code, fileName, lineNumber, message)
+        return
     out = sys.stdout if DebugLevel > 0 else sys.stderr
-    out.write(f"\n*** ERROR *** {message}\n")
+    out.write(diagnostics.Format(severity, fileName, lineNumber, message))
     out.flush()
 
 # Determine full path from partial path
 # partial: partial path for whcihc to search
 # returns full path or None if full path could not be found
 def FindPath(partial):
+    if not profiler.Enabled and not tracer.Enabled:
+        return __findPath__(partial)
+    start  = time.perf_counter()
+    result = __findPath__(partial)
+    if profiler.Enabled:
+        profiler.Count('FindPath', time.perf_counter() - start)
+    if tracer.Enabled:
+        tracer.FindPath(start, partial, result != None)
+    return result
+
+# Find the full path of a file (without profiling)
+# Results are kept for as long as the worktree and Paths do not change so each file is only looked for once
+# partial: partial path of file being searched for
+# returns full path to file or None if file could not be found
+def __findPath__(partial):
+    global FoundPaths
+    key = (Worktree, tuple(Paths))
+    if FoundPaths[0] != key:
+        FoundPaths = (key, {})
+    found = FoundPaths[1]
+    if not partial in found:
+        found[partial] = __searchPath__(partial)
+    return found[partial]
+
+# Look for a file in the current directory and each of the Paths
+# partial: partial path of file being searched for
+# returns full path to file or None if file could not be found
+def __searchPath__(partial):
     global Paths, Worktree
     # First try path as-is
     if os.path.exists(partial.replace('/', "\\")):
@@ -709,6 +1109,55 @@ def JoinPath(path1, path2):
 # returns nothing
 def SetMacro(macro, value):
     global Macros
+    if Journal != None:
+        Journal.append((SetMacro, (macro, value)))
+    if macro in Overrides:
+        value = Overrides[macro]
     if not macro in Macros or str(Macros[macro]) != str(value):
         Macros[macro] = value
     return f'{macro} = {value}'
+
+# Note that a macro was read from a file
+# macro:      Name of macro
+# fileName:   File  in which the macro was read
+# lineNumber: Line on which the macro was read
+# usage:      Kind of line on which the macro was read (see fileir.KindNames)
+# returns nothing
+def ReadMacro(macro, fileName, lineNumber, usage):
+    if Journal != None:
+        Journal.append((ReadMacro, (macro, fileName, lineNumber, usage)))
+    if not macro in MacroReaders:
+        MacroReaders[macro] = set()
+    MacroReaders[macro].add((fileName, lineNumber, usage))
+
+# Note that a macro was defined in a file
+# macro:      Name of macro
+# fileName:   File  in which the macro was defined
+# lineNumber: Line on which the macro was defined
+# returns nothing
+def WriteMacro(macro, fileName, lineNumber):
+    if Journal != None:
+        Journal.append((WriteMacro, (macro, fileName, lineNumber)))
+    if not macro in MacroDefiners:
+        MacroDefiners[macro] = set()
+    MacroDefiners[macro].add((fileName, lineNumber))
+
+# Reset all of the platform information (allows more than one platform to be processed)
+# Note: Databases are cleared in place because journals hold references to them
+# returns nothing
+def Reset():
+    global Paths, Worktree, Lines, DSCs, INFs, DECs, FDFs, SupportedArchitectures, ArchitectureGeneration, SkuGeneration, Overrides, Presence
+    for db in (Apriori, Sources, Pcds, Ppis, Protocols, Guids, Skus, DefaultStores, ModulePcds, BuildOptions, Macros, MacroReaders, MacroDefiners):
+        db.clear()
+    SkuGeneration          += 1
+    Paths                   = []
+    Worktree                = None
+    Lines                   = 0
+    DSCs                    = {}
+    INFs                    = []
+    DECs                    = []
+    FDFs                    = {}
+    SupportedArchitectures  = []
+    ArchitectureGeneration += 1
+    Overrides               = {}
+    Presence                = None
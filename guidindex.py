@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+# None
+
+# Local modules
+import globals as gbl
+
+# Groups of the kinds of items (values are only expected to be unique within a group, e.g. a FILE statement using the GUID a
+# DEC declares for finding the file in an FV is intended)
+Groups = {'guid': 'dec', 'ppi': 'dec', 'protocol': 'dec', 'inf': 'inf', 'fdf': 'fdf'}
+
+# Class for indexing GUID values by their canonical 128-bit value
+class GuidIndex:
+
+    # Constructor
+    # returns nothing
+    def __init__(self):
+        self._values  = {}      # Canonical value -> list of named users of the value
+        self._invalid = []      # Named users whose value could not be canonicalized
+
+    # Add a named GUID value to the index
+    # kind:       Kind of item using the value (guid, ppi, protocol, inf, or fdf)
+    # name:       Name of the item using the value
+    # value:      GUID value (in any supported format)
+    # fileName:   File containing the value
+    # lineNumber: Line number containing the value
+    # returns nothing
+    def Add(self, kind, name, value, fileName, lineNumber):
+        entry     = {'kind': kind, 'name': name, 'value': value, 'fileName': fileName, 'lineNumber': lineNumber}
+        canonical = gbl.CanonicalGuid(value)
+        if canonical == None:
+            self._invalid.append(entry)
+            return
+        if not canonical in self._values:
+            self._values[canonical] = []
+        self._values[canonical].append(entry)
+
+    # Get the named items using a GUID value
+    # value: GUID value (in any supported format)
+    # returns list of entries using the value (empty list if none)
+    def Lookup(self, value):
+        canonical = gbl.CanonicalGuid(value)
+        return [] if canonical == None or not canonical in self._values else self._values[canonical]
+
+    # Get the GUID values used by more than one item of the same group (see Groups)
+    # (the same name in two different files counts as two items, e.g. two copies of an INF)
+    # returns list of (canonical value, entries) tuples sorted by value
+    def Collisions(self):
+        return [(canonical, self._values[canonical]) for canonical in sorted(self._values) if self.__collides__(self._values[canonical])]
+
+    # Get the GUID values used by items of more than one group that do not collide (e.g. an INF FILE_GUID declared in a DEC)
+    # returns list of (canonical value, entries) tuples sorted by value
+    def Shared(self):
+        shared = []
+        for canonical in sorted(self._values):
+            entries = self._values[canonical]
+            if len(set([Groups[entry['kind']] for entry in entries])) > 1 and not self.__collides__(entries):
+                shared.append((canonical, entries))
+        return shared
+
+    # Determine if items using the same value collide
+    # entries: Entries using the value
+    # returns True if more than one item of the same group uses the value, False otherwise
+    def __collides__(self, entries):
+        names = set([(entry['kind'], entry['name'], entry['fileName']) for entry in entries])
+        return len(names) > len(set([Groups[kind] for kind, name, fileName in names]))
+
+    # Getter for values property
+    def _get_values(self):
+        return self._values
+
+    # Getter for invalid property
+    def _get_invalid(self):
+        return self._invalid
+
+    # Properties
+    values  = property(fget = _get_values)
+    invalid = property(fget = _get_invalid)
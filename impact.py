@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import os
+import sys
+
+# Local modules
+import globals as gbl
+
+# Kinds of items in the index
+FILE   = 'file'     # Any file (source, header, INF, DEC, DSC, FDF)
+MODULE = 'module'   # INF module or library instance
+FV     = 'fv'       # Firmware volume
+REGION = 'region'   # FD region (FD.<name> <offset>|<size>)
+
+# Names files have in the index (key is the file name as given) so each is only worked out once per index
+_names = {}
+
+# Class for a reverse index of what depends on each file, module, and FV
+class Index:
+
+    # Class constructor
+    # returns nothing
+    def __init__(self):
+        self.dependents = {}    # (kind, name) -> set of (kind, name) that depend on it
+        self.includes   = {}    # include directory -> set of DECs declaring it
+        self.libraries  = set() # INFs that are library instances
+        self.links      = 0
+
+    # Record that an item depends on another
+    # item:      (kind, name) depended on
+    # dependent: (kind, name) that depends on it
+    # returns nothing
+    def Add(self, item, dependent):
+        if not item in self.dependents:
+            self.dependents[item] = set()
+        if not dependent in self.dependents[item]:
+            self.dependents[item].add(dependent)
+            self.links += 1
+
+    # Record an include directory of a DEC
+    # directory: Include directory
+    # dec:       DEC declaring the include directory
+    # returns nothing
+    def AddInclude(self, directory, dec):
+        if not directory in self.includes:
+            self.includes[directory] = set()
+        self.includes[directory].add(dec)
+
+    # Get the items a changed file directly stands for
+    # A file in (or below) a DEC include directory is treated as a change to the DEC
+    # file: Changed file (see Normalize)
+    # returns list of (kind, name) starting with the file itself
+    def Changed(self, file):
+        items     = [(FILE, file)]
+        directory = os.path.dirname(file)
+        while directory:
+            items    += [(FILE, dec) for dec in self.includes.get(directory, ())]
+            parent    = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        return items
+
+    # Determine if a file is used by the platform
+    # file: File (see Normalize)
+    # returns True if a change to the file affects anything, False otherwise
+    def Used(self, file):
+        return len([item for item in self.Changed(file) if item in self.dependents]) > 0
+
+    # Get everything affected by changes to a set of files
+    # files: List of changed files (see Normalize)
+    # returns set of affected (kind, name) including the changed files
+    def Affected(self, files):
+        pending  = [item for file in files for item in self.Changed(file)]
+        affected = set(pending)
+        while pending:
+            for dependent in self.dependents.get(pending.pop(), ()):
+                if not dependent in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return affected
+
+# Get the files given on the command line
+# Must be called before the platform is processed (names are relative to the current directory or to the worktree)
+# specs: List of file names (- reads file names from stdin one per line, e.g. the output of git diff --name-only)
+# returns list of file names (absolute for those found relative to the current directory, the others as given)
+def Files(specs):
+    files = []
+    for spec in specs:
+        names  = [line.strip() for line in sys.stdin] if spec == '-' else [spec]
+        for name in [name for name in names if name]:
+            path   = os.path.abspath(name)
+            files.append((path if os.path.exists(path) else name).replace('\\', '/'))
+    return files
+
+# Get the name a file has in the index
+# file: File name (absolute or relative to the worktree)
+# returns file name relative to the worktree (absolute if outside of the worktree)
+def Normalize(file):
+    if not file in _names:
+        path         = os.path.abspath(os.path.join(gbl.Worktree, file))
+        relative     = os.path.relpath(path, gbl.Worktree)
+        _names[file] = (path if relative.startswith('..') else relative).replace('\\', '/')
+    return _names[file]
+
+# Build the reverse index of the platform
+# modules:  Dictionary of INF file -> (BASE_NAME, INF object) of the INFs processed
+# includes: Dictionary of DEC file -> list of include directories
+# returns Index object
+def Build(modules, includes):
+    _names.clear()
+    index = Index()
+    # An INF depends on itself, its sources, and the DECs in its [Packages]
+    for file in modules:
+        name, inf = modules[file]
+        index.Add((FILE, Normalize(file)), (MODULE, Normalize(file)))
+        if inf.library_class:
+            index.libraries.add(Normalize(file))
+    for reference in gbl.Sources:
+        infs = [item['fileName'] for item in gbl.Sources[reference].references if item['fileName'].lower().endswith('.inf')]
+        if infs:
+            file = gbl.FindPath(reference)
+            for inf in infs:
+                index.Add((FILE, Normalize(file if file else reference)), (MODULE, Normalize(inf)))
+    # A file in a DEC include directory affects the INFs using the DEC
+    for dec in includes:
+        for directory in includes[dec]:
+            index.AddInclude(Normalize(directory), Normalize(dec))
+    # A module depends on the library instances the DSC gives for its library classes (any architecture or module type)
+    instances = {}
+    for dsc in gbl.DSCs.values():
+        for entry in dsc.LIBRARYCLASSES:
+            file = gbl.FindPath(entry['path'].replace('"', ''))
+            if file:
+                instances.setdefault(entry['name'], set()).add(Normalize(file))
+    for file in modules:
+        name, inf = modules[file]
+        for library in inf.dependencies:
+            for instance in instances.get(library, ()):
+                index.Add((MODULE, instance), (MODULE, Normalize(file)))
+    # Everything depends on the DSC and FDF files
+    for dsc in gbl.DSCs:
+        for file in modules:
+            index.Add((FILE, Normalize(dsc)), (MODULE, Normalize(file)))
+    for fdf in gbl.FDFs:
+        __buildFdf__(index, fdf, gbl.FDFs[fdf])
+    return index
+
+# Add the FVs and FD regions of an FDF file to the index
+# index: Index object
+# fdf:   FDF file
+# this:  FDFParser object of the file
+# returns nothing
+def __buildFdf__(index, fdf, this):
+    # FVs depend on their INFs, the files their FILE statements use, and the FVs placed in them (INFs and FILE statements
+    # outside of [FV] sections, e.g. in [Capsule] sections, are not in an FV)
+    for inf, options, condition, fv in [item for item in this.INFS if item[3]]:
+        file = gbl.FindPath(inf)
+        index.Add((FILE, Normalize(fdf)), (FV, fv))
+        index.Add((MODULE, Normalize(file if file else inf)), (FV, fv))
+    for item in [item for item in this.FILES if item['fv']]:
+        index.Add((FILE, Normalize(fdf)), (FV, item['fv']))
+        for kind, value in __fileContents__(item):
+            if kind == 'FV_IMAGE':
+                index.Add((FV, value.upper()), (FV, item['fv']))
+            else:
+                file = gbl.FindPath(value)
+                if file:
+                    index.Add((FILE, Normalize(file)), (FV, item['fv']))
+    # FD regions depend on the FV or file placed in them
+    region = None
+    for entry in this.FDS:
+        if not isinstance(entry, dict):
+            continue
+        if 'offset' in entry:
+            region = f"FD.{entry['section'][1].upper() if len(entry['section']) > 1 else ''} {entry['offset']}|{entry['size']}"
+            index.Add((FILE, Normalize(fdf)), (REGION, region))
+        elif region and entry['token'].upper() == 'FV':
+            index.Add((FV, entry['value'].upper()), (REGION, region))
+        elif region and entry['token'].upper() == 'FILE':
+            file = gbl.FindPath(entry['value'])
+            index.Add((FILE, Normalize(file if file else entry['value'])), (REGION, region))
+
+# Get what a FILE statement puts in an FV
+# item: FILE statement (see FDFParser.match_reFile)
+# returns list of (section type, value) including those of guided sections
+def __fileContents__(item):
+    contents = [('RAW', item['path'])] if 'path' in item else []
+    pending  = list(item['sections']) + (item['guided'].get('sections', []) if 'guided' in item else [])
+    while pending:
+        sect = pending.pop()
+        if 'guided' in sect:
+            pending += sect['guided'].get('sections', [])
+        if 'value' in sect['type']:
+            contents.append((sect['type']['type'], sect['type']['value']))
+    return contents
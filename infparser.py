@@ -88,7 +88,13 @@ class INFParser(UEFIParser):
     ##################
     # Public methods #
     ##################
-    # None
+
+    # Handles a line that continues a [BuildOptions] line
+    # value: Line without the line continuation character and surrounding white space
+    # returns nothing
+    def ContinueLine(self, value):
+        entry          = self.BUILDOPTIONS[-1]
+        entry['value'] = f"{entry['value'].strip() if entry['value'] else ''} {value}".strip()
 
     ####################
     # Special handlers #
@@ -109,6 +115,14 @@ class INFParser(UEFIParser):
     # Match handlers #
     ##################
 
+    # Handle a match in the [BuildOptions] section
+    # match: Results of regex match
+    # returns nothing
+    def match_reBuildOptions(self, match):
+        # Look for line continuation character
+        if match.group(5):
+            self.lineContinuation = True
+
     # Handle a match in the [Ppis] section for rePpis
     # match: Results of regex match
     # returns nothing
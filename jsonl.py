@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import gzip
+import json
+import sys
+
+# Local modules
+# None
+
+# Indicates if records are to be exported (set when a file is opened)
+Enabled  = False
+
+# Stream records are written to
+_out     = None
+
+# Fields added to every record (platform and configuration of the current run)
+_context = {}
+
+# Open the file records are written to
+# fileName: File to be written ("-" for stdout, compressed with gzip if it ends with .gz)
+# returns nothing
+def Open(fileName):
+    global Enabled, _out
+    if fileName == '-':
+        _out = sys.stdout
+    elif fileName.lower().endswith('.gz'):
+        _out = gzip.open(fileName, 'wt', encoding = 'utf-8')
+    else:
+        _out = open(fileName, 'w', encoding = 'utf-8')
+    Enabled = True
+
+# Close the file records are written to
+# returns nothing
+def Close():
+    global Enabled, _out
+    if _out == sys.stdout:
+        _out.flush()
+    elif _out != None:
+        _out.close()
+    _out    = None
+    Enabled = False
+
+# Note the platform and configuration the following records are for
+# platform: Platform directory (relative to the worktree)
+# config:   Macro values that override the defaults (empty for none)
+# returns nothing
+def Begin(platform, config):
+    global _context
+    _context = {'platform': platform}
+    if config:
+        _context['config'] = dict(config)
+
+# Write a record (written as soon as it is given so the whole export is never held in memory)
+# kind:   Kind of entity (e.g. "macro", "source", "pcd")
+# fields: Fields of the record
+# returns nothing
+def Record(kind, **fields):
+    record = {'record': kind}
+    record.update(_context)
+    record.update(fields)
+    _out.write(json.dumps(record) + '\n')
+
+# Convert a list of references to records fields
+# references: List of reference dictionaries (with fileName and lineNumber)
+# returns list of dictionaries with file and line
+def References(references):
+    return [{'file': ref['fileName'], 'line': ref['lineNumber']} for ref in references] if references else []
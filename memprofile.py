@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import inspect
+import json
+import os
+import sys
+import tracemalloc
+try:
+    import resource             # Not available on Windows
+except ImportError:
+    resource = None
+
+# Local modules
+# None
+
+# Indicates if memory usage is to be collected
+Enabled    = False
+
+# Memory usage information
+Boundaries = []         # List of (phase, current bytes, peak bytes since previous boundary) at the end of each phase
+Sites      = {}         # fileName -> list of (first line, last line, category) for functions with their own category
+
+# Module categories for allocations not in a registered function
+ModuleCategories = {
+    'globals.py':    'gbl databases',
+    'fileir.py':     'file IR',
+    'parsecache.py': 'parse cache',
+    'dscparser.py':  'DSCParser',
+    'infparser.py':  'INFParser',
+    'decparser.py':  'DECParser',
+    'fdfparser.py':  'FDFParser',
+    'uefiparser.py': 'UEFIParser',
+}
+
+# Give allocations made by a function their own category
+# function: Function (e.g. UEFIParser.__updateAttribute__)
+# category: Category name for allocations made by the function
+# returns nothing
+def Attribute(function, category):
+    fileName     = os.path.abspath(inspect.getsourcefile(function))
+    lines, first = inspect.getsourcelines(function)
+    if not fileName in Sites:
+        Sites[fileName] = []
+    Sites[fileName].append((first, first + len(lines) - 1, category))
+
+# Get the category for an allocation site
+# fileName:   File in which the allocation was made
+# lineNumber: Line on which the allocation was made
+# returns category name
+def Categorize(fileName, lineNumber):
+    fileName = os.path.abspath(fileName)
+    for first, last, category in Sites[fileName] if fileName in Sites else []:
+        if first <= lineNumber <= last:
+            return category
+    base = os.path.basename(fileName)
+    if base in ModuleCategories:
+        return ModuleCategories[base]
+    return 'python' if os.path.dirname(fileName) != os.path.dirname(os.path.abspath(__file__)) else base
+
+# Start collecting memory usage (clears any previous information)
+# returns nothing
+def Reset():
+    global Boundaries
+    Boundaries = []
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(1)        # One frame is all that is needed for attribution (and is the cheapest)
+    tracemalloc.reset_peak()
+
+# Note the memory usage at the end of a phase
+# phase: Name of the phase
+# returns nothing
+def Boundary(phase):
+    current, peak = tracemalloc.get_traced_memory()
+    Boundaries.append((phase, current, peak))
+    tracemalloc.reset_peak()
+
+# Get the peak resident set size of the process
+# returns bytes (None if not available)
+def PeakRSS():
+    if resource == None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024             # Linux reports KB, macOS bytes
+
+# Get the memory currently held, attributed to categories and allocation sites
+# top: Number of allocation sites to return
+# returns tuple of (dictionary of category -> bytes, list of (fileName, lineNumber, bytes, blocks) for top sites)
+def Retained(top):
+    snapshot   = tracemalloc.take_snapshot()
+    categories = {}
+    sites      = []
+    for stat in snapshot.statistics('lineno'):
+        frame    = stat.traceback[0]
+        category = Categorize(frame.filename, frame.lineno)
+        categories[category] = categories[category] + stat.size if category in categories else stat.size
+        sites.append((frame.filename, frame.lineno, stat.size, stat.count))
+    return (categories, sites[:top])
+
+# Show the memory usage and save it to a JSON file
+# fileName: JSON file to be written
+# info:     Dictionary of additional information to include (e.g. version, platform)
+# top:      Number of allocation sites to show (default is 10)
+# returns nothing
+def Report(fileName, info, top = 10):
+    categories, sites = Retained(top)
+    rss               = PeakRSS()
+    print(f"\nMEMORY:")
+    print(f"-------")
+    print(f"Phases (held/peak KB):")
+    for phase, current, peak in Boundaries:
+        print(f"    {current // 1024:8} {peak // 1024:8}  {phase}")
+    print(f"Held by (KB):")
+    for category in sorted(categories, key = lambda name: -categories[name]):
+        print(f"    {categories[category] // 1024:8}  {category}")
+    print(f"Top allocation sites (KB, blocks):")
+    for site, lineNumber, size, count in sites:
+        print(f"    {size // 1024:8} {count:8}  {os.path.basename(site)}:{lineNumber}")
+    print(f"Peak RSS:                {'not available' if rss == None else f'{rss // (1024 * 1024)} MB'}")
+    data = dict(info)
+    data['phases']     = [{'name': phase, 'held': current, 'peak': peak} for phase, current, peak in Boundaries]
+    data['categories'] = categories
+    data['sites']      = [{'file': os.path.basename(site), 'line': lineNumber, 'bytes': size, 'blocks': count} for site, lineNumber, size, count in sites]
+    data['peakRSS']    = rss
+    print(f"\nGenerating memprofile.json ...")
+    with open(fileName, 'w') as out:
+        json.dump(data, out, indent = 2)
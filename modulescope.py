@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+# None
+
+# Local modules
+import globals as gbl
+
+# Where an effective PCD value comes from
+MODULE   = 'module'     # [Components] sub-element of the module
+PLATFORM = 'platform'   # DSC PCD section
+DEFAULT  = 'default'    # DEC default value
+UNKNOWN  = 'unknown'    # PCD is not declared in any DEC
+
+# Get the fingerprint of a module's scope (modules with the same fingerprint have the same effective configuration)
+# scope: INF of the module as given in the DSC (None if the module has no [Components] sub-element)
+# returns tuple of the module's PCD overrides and build options (empty tuples for modules without a sub-element)
+def Fingerprint(scope):
+    if scope == None:
+        return ((), ())
+    pcds    = gbl.ModulePcds[scope] if scope in gbl.ModulePcds else {}
+    options = gbl.BuildOptions[scope] if scope in gbl.BuildOptions else []
+    return (tuple(sorted([(name, pcds[name]['value']) for name in pcds])),
+            tuple([(item['family'], item['option'], item['value']) for item in options]))
+
+# Work out the effective configuration of each module
+# Results are shared by the modules that have the same scope fingerprint, so each PCD and the build options are only
+# resolved once for all of the modules without a [Components] sub-element
+# modules: List of (module, scope, PCD names) where scope is the INF as given in the DSC (None if there is none)
+# returns tuple of dictionary of module -> (dictionary of PCD -> (value, where from), build options) and number of distinct scopes
+def Resolve(modules):
+    cache   = {}
+    results = {}
+    for module, scope, names in modules:
+        key = Fingerprint(scope)
+        if not key in cache:
+            cache[key] = ({}, __buildOptions__(scope))
+        values, options = cache[key]
+        overrides       = gbl.ModulePcds[scope] if scope in gbl.ModulePcds else {}
+        names           = sorted(set(names) | set(overrides))
+        for name in names:
+            if not name in values:
+                values[name] = __resolvePcd__(name, overrides)
+        results[module] = ({name: values[name] for name in names}, options)
+    return (results, len(cache))
+
+# Get the [BuildOptions] layers of a module (lowest priority first)
+# inf:   INF object of the module (None if not known)
+# scope: INF of the module as given in the DSC (None if the module has no [Components] sub-element)
+# returns tuple of the INF, platform, and [Components] sub-element options, each a tuple of (family, option, value)
+def Layers(inf, scope):
+    platform = gbl.BuildOptions[None] if None in gbl.BuildOptions else []
+    module   = gbl.BuildOptions[scope] if scope != None and scope in gbl.BuildOptions else []
+    return (tuple(inf.buildoptions) if inf else (),
+            tuple([(item['family'], item['option'], item['value']) for item in platform]),
+            tuple([(item['family'], item['option'], item['value']) for item in module]))
+
+# Get the location a PCD value comes from
+# name:  PCD name (space.name)
+# where: Where the value comes from (see Resolve)
+# scope: INF of the module as given in the DSC (None if there is none)
+# returns dictionary with fileName and lineNumber or None if not known
+def Location(name, where, scope):
+    pcd = gbl.Pcds[name] if name in gbl.Pcds else None
+    if where == MODULE:
+        return gbl.ModulePcds[scope][name]
+    if where == PLATFORM:
+        return pcd.Resolve()
+    if where == DEFAULT:
+        return pcd.definer
+    return None
+
+# Resolve a PCD for a module (module scope, then the DSC PCD sections, then the DEC default)
+# name:      PCD name (space.name)
+# overrides: PCD overrides of the module's [Components] sub-element
+# returns tuple of value and where it comes from
+def __resolvePcd__(name, overrides):
+    if name in overrides:
+        return (overrides[name]['value'], MODULE)
+    pcd = gbl.Pcds[name] if name in gbl.Pcds else None
+    if pcd == None:
+        return (None, UNKNOWN)
+    override = pcd.Resolve()
+    if override:
+        return (override['value'], PLATFORM)
+    return (pcd.default, DEFAULT if pcd.definer else UNKNOWN)
+
+# Merge the platform [BuildOptions] with those of a module
+# Module options are added to the platform option with the same family and name (or replace it when given with ==)
+# scope: INF of the module as given in the DSC (None if there is none)
+# returns dictionary of (family, option) -> value
+def __buildOptions__(scope):
+    options = {}
+    for items, module in [(gbl.BuildOptions[None] if None in gbl.BuildOptions else [], False),
+                          (gbl.BuildOptions[scope] if scope != None and scope in gbl.BuildOptions else [], True)]:
+        for item in items:
+            key   = (item['family'], item['option'])
+            value = item['value']
+            if value.startswith('=') or not module or not key in options:
+                options[key] = value.lstrip('=').strip()
+            else:
+                options[key] = f'{options[key]} {value}'.strip()
+    return options
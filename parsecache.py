@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+# None
+
+# Local modules
+from   debug   import *
+import globals as     gbl
+import progress
+import tracer
+import visitor
+
+# Indicates if parse results are to be shared between platforms
+Enabled = False
+
+# Indicates if the parse results of DSC and FDF files are also kept (only while one platform is evaluated again, see whatif.py)
+Platform = False
+
+# Parser classes whose files can include other files (their results are only kept when Platform is True)
+Includers = ('DSCParser', 'FDFParser')
+
+# Files reading macros whose values are being changed (results read from any of them are not reused, None for no such files)
+Changed = None
+
+# Attributes kept in place of parser objects that are not retained (parser class name -> attribute names)
+# These are all the platform processing reads from the parsers of reused results (see PlatformInfo.__processINFs__ and
+# PlatformInfo.__processDECs__)
+Kept = {'INFParser': ['DEFINES', 'LIBRARYCLASSES', 'PCDS', 'BUILDOPTIONS', 'DEPEX'], 'DECParser': ['INCLUDES']}
+
+# Parse results (indexed by parser class name and file name, each holding a list of ParseResult)
+Results = {}
+
+# Parse result sharing statistics
+Hits    = 0
+Misses  = 0
+
+# Class standing in for a parser object that is not retained (only has the file name, macro inputs, and kept attributes)
+class StandIn:
+
+    # Constructor
+    # parser: Parser object
+    # names:  Names of the attributes to be kept
+    # returns nothing
+    def __init__(self, parser, names):
+        self.fileName    = parser.fileName
+        self.macroInputs = parser.macroInputs
+        for name in names:
+            setattr(self, name, getattr(parser, name))
+
+# Class for the results of parsing a file
+class ParseResult:
+
+    # Constructor
+    # parser:  Parser object that parsed the file
+    # journal: List of updates made to the global information while parsing the file
+    # lines:   Number of lines parsed
+    # state:   Tuple of the architectures and presence condition before parsing the file
+    # returns nothing
+    # Note: Only a StandIn is kept for INF and DEC parsers when parser objects are not retained (see visitor.Retain)
+    def __init__(self, parser, journal, lines, state):
+        name                = type(parser).__name__
+        self._parser        = StandIn(parser, Kept[name]) if not visitor.Retain and name in Kept else parser
+        self._journal       = journal
+        self._lines         = lines
+        self._inputs        = parser.macroInputs
+        self._architectures = state[0]
+        self._presence      = state[1]
+        self._readers       = set([args[1] for handler, args in journal if handler == gbl.ReadMacro])
+
+    # Indicates if the results can be used with the current macros
+    # returns True if all of the macro inputs (and architectures and presence condition) are unchanged and none of the files
+    #         read a changed macro, False otherwise
+    def Matches(self):
+        if self._architectures != gbl.SupportedArchitectures or self._presence != gbl.Presence:
+            return False
+        if Changed != None and not self._readers.isdisjoint(Changed):
+            return False
+        for macro in self._inputs:
+            value = gbl.Macros[macro] if macro in gbl.Macros else None
+            if value != self._inputs[macro]:
+                return False
+        return True
+
+    # Make the same updates to the global information that parsing the file made
+    # returns nothing
+    def Replay(self):
+        for handler, args in self._journal:
+            handler(*args)
+        gbl.Lines += self._lines
+
+    # Getter for parser property
+    def _get_parser(self):
+        return self._parser
+
+    # Getter for inputs property
+    def _get_inputs(self):
+        return self._inputs
+
+    # Properties
+    parser = property(fget = _get_parser)
+    inputs = property(fget = _get_inputs)
+
+# Parse a file (or reuse the results of a previous parse with the same macro inputs)
+# parserClass: Class used to parse the file (INFParser, DECParser, or when Platform is True DSCParser or FDFParser)
+# fileName:    File to be parsed
+# returns parser object for the file
+# Note: The macro inputs of files including other files cover those of the included files (see UEFIParser.IncludeMacros)
+def Parse(parserClass, fileName):
+    global Hits, Misses
+    # Parse normally if sharing is off (or if already recording for another file)
+    if not Enabled or gbl.Journal != None or (parserClass.__name__ in Includers and not Platform):
+        return parserClass(fileName)
+    # Look for previous results that can be reused
+    key = (parserClass.__name__, fileName)
+    if not key in Results:
+        Results[key] = []
+    for result in Results[key]:
+        if result.Matches():
+            Hits += 1
+            if Debug(SHOW_FILENAMES):
+                print(f"Processing {fileName} (previously parsed)")
+            if tracer.Enabled:
+                tracer.Begin(fileName, 'replay', {'parser': parserClass.__name__})
+            result.Replay()
+            if tracer.Enabled:
+                tracer.End()
+            if progress.Enabled:
+                progress.FileDone(fileName, result._lines)
+            if visitor.Enabled:
+                visitor.Emit('on_parsed', result.parser)
+            return result.parser
+    # Parse the file recording the updates it makes
+    Misses    += 1
+    lines      = gbl.Lines
+    state      = (list(gbl.SupportedArchitectures), gbl.Presence)
+    gbl.Journal = []
+    try:
+        parser = parserClass(fileName)
+    finally:
+        journal, gbl.Journal = (gbl.Journal, None)
+    Results[key].append(ParseResult(parser, journal, gbl.Lines - lines, state))
+    return parser
+
+# Forget the parse results of files that include other files (they are only valid for the platform they were recorded for)
+# returns nothing
+def ForgetPlatform():
+    for key in [key for key in Results if key[0] in Includers]:
+        del Results[key]
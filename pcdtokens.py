@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import re
+
+# Local modules
+import globals as gbl
+
+# Linear time tokenizer for PCD lines (used instead of rePcdReDef, rePcdHii, rePcdVal, rePcdVpd, rePcdOvr, and rePcdDef for
+# lines with long byte array values, on which the regular expressions backtrack over every character of the value)
+# The line is split on | outside of quoted strings and braces and each field is classified. The results are the same as the
+# regular expressions in globals (including their group numbers), so match handlers and __handleMatch__ use them unchanged.
+
+# Lines shorter than this (or without a {) are matched with the regular expression (which is faster for them)
+LongLine = 256
+
+# Kinds of field
+ITEM    = 0     # Anything up to the next | or { (see reItem)
+VALUE   = 1     # Quoted string, GUID, GUID structure, or anything up to the next | or { (see reVal)
+
+# Classes of value fields
+STRING  = 'string'      # L"..." or "..."
+GUID    = 'guid'        # {GUID({...{...}})}
+STRUCT  = 'struct'      # {0x..., 0x..., 0x..., {0x..., ...}}
+TEXT    = 'text'        # Anything else (numbers, booleans, expressions, byte arrays, ...)
+
+# Ways a field can be present
+REQUIRED = 0    # Field must be present
+GREEDY   = 1    # Field (and those after it) is optional, preferring it to be present
+LAZY     = 2    # Field (and those after it) is optional, preferring it to be absent
+
+# Fields for each regular expression: (regEx name, list of (kind, group, container group, presence), allow trailing {)
+# The container group is the group holding the field and those after it (including the separators), None if there is none
+Layouts = {
+    'rePcdReDef': ([(VALUE, 4,  3,    GREEDY),   (ITEM,  6,  5,    GREEDY),   (ITEM,  8,  7,    GREEDY)], False),
+    'rePcdHii':   ([(VALUE, 3,  None, REQUIRED), (ITEM,  5,  4,    LAZY),     (ITEM,  7,  6,    REQUIRED),
+                    (VALUE, 9,  8,    GREEDY),   (VALUE, 11, 10,   GREEDY),   (ITEM,  13, 12,   GREEDY)], False),
+    'rePcdVal':   ([(VALUE, 3,  None, REQUIRED)], False),
+    'rePcdVpd':   ([(ITEM,  4,  3,    GREEDY),   (VALUE, 6,  5,    GREEDY),   (VALUE, 8,  7,    GREEDY)], False),
+    'rePcdOvr':   ([(VALUE, 4,  3,    GREEDY),   (ITEM,  6,  5,    GREEDY)], False),
+    'rePcdDef':   ([(VALUE, 4,  3,    GREEDY),   (ITEM,  6,  5,    GREEDY),   (ITEM,  8,  7,    GREEDY)], True),
+}
+
+# Runs of characters scanned for (none of these can backtrack)
+reGuidRun = re.compile(r'[0-9A-Fa-fXx, ]*')                # Numbers in GUIDs and GUID structures
+reNameRun = re.compile(r'[^\s\|]*')                        # PCD name
+reSpaces  = re.compile(r'\s*')                             # White space
+
+# Class for the results of tokenizing a PCD line (used like the results of a regular expression match)
+class PcdMatch:
+
+    # Class constructor
+    # line:   Line that was tokenized
+    # values: List of the groups (index 0 is the whole line, None for groups that are not present)
+    # fields: List of (text, class) for the fields that are present (class is None for item fields)
+    # returns nothing
+    def __init__(self, line, values, fields):
+        self.string = line
+        self.values = values
+        self.fields = fields
+
+    # Get a group (same as re.Match.group)
+    # group: Group number (default is 0 for the whole line)
+    # returns text of the group or None if it is not present
+    def group(self, group = 0):
+        return self.values[group]
+
+    # Get all of the groups (same as re.Match.groups)
+    # returns tuple of groups 1 and up
+    def groups(self):
+        return tuple(self.values[1:])
+
+# Class for tokenizing the PCD lines of one regular expression (used like a compiled regular expression)
+class PcdPattern:
+
+    # Class constructor
+    # regEx: Name of the regular expression in globals (see Layouts)
+    # returns nothing
+    def __init__(self, regEx):
+        self.pattern            = regEx
+        self.regex              = re.compile(getattr(gbl, regEx), re.IGNORECASE)
+        self.layout, self.brace = Layouts[regEx]
+        self.groups             = max([max(group, container or 0) for kind, group, container, presence in self.layout]) + (1 if self.brace else 0)
+        # Numbers of fields the line can have (a field can only be left out if it is optional)
+        self.counts             = [count for count in range(len(self.layout) + 1) if count == len(self.layout) or self.layout[count][3] != REQUIRED]
+
+    # Match a line (same as re.Pattern.match with the regular expression)
+    # line: Line to be matched
+    # returns PcdMatch object or re.Match object, None if the line is not a valid PCD line
+    def match(self, line):
+        if len(line) < LongLine or not '{' in line:
+            return self.regex.match(line)
+        return self.Tokenize(line)
+
+    # Tokenize a line (gives the same groups as the regular expression)
+    # line: Line to be tokenized
+    # returns PcdMatch object or None if the line is not a valid PCD line
+    def Tokenize(self, line):
+        # Most lines have just one way to be split, so they are simply split on each | (the others are searched)
+        parts = line.split('|')
+        dot   = parts[0].find('.')
+        if dot <= 0 or not len(parts) - 1 in self.counts or line[-1:].isspace():
+            return self.__search__(line)
+        # Token space GUID and PCD name (space.pcd) followed by nothing but white space
+        end   = reNameRun.match(line, dot + 1).end()
+        if end == dot + 1 or (end < len(parts[0]) and not parts[0][end:].isspace()):
+            return self.__search__(line)
+        values = [line, line[:dot], line[dot + 1:end]] + [None] * (self.groups - 2)
+        fields = []
+        pos    = len(parts[0])
+        for part, (kind, group, container, presence) in zip(parts[1:], self.layout):
+            # Containers hold everything from the end of the previous field to the end of the line
+            if container:
+                values[container] = line[end:]
+            text  = part.lstrip()
+            start = pos + 1 + len(part) - len(text)
+            pos   = end = pos + 1 + len(part)
+            cls   = TEXT if kind == VALUE else None
+            if '"' in part or '{' in part:
+                if kind == ITEM:
+                    # Items stop at a {
+                    if '{' in part:
+                        return self.__search__(line)
+                elif text[:1] == '{' and not '{' in text[1:] and not '"' in text:
+                    # Byte array (only a GUID structure has another {)
+                    pass
+                elif text[:1] == '"' or text[:2] in ('L"', 'l"'):
+                    # Quoted string (white space after the closing quote is not part of the value)
+                    text = text.rstrip()
+                    if '{' in text or text.count('"') != 2 or text[-1] != '"' or text[-2:-1] in ('"', ''):
+                        return self.__search__(line)
+                    end = start + len(text)
+                    cls = STRING
+                else:
+                    return self.__search__(line)
+            values[group] = line[start:end]
+            fields.append((values[group], cls))
+        return PcdMatch(line, values, fields)
+
+    # Tokenize a line that has more than one way to be split (in the order the regular expression would try them)
+    # line: Line to be tokenized
+    # returns PcdMatch object or None if the line is not a valid PCD line
+    def __search__(self, line):
+        # Token space GUID and PCD name (space.pcd)
+        dot = line.find('.')
+        if dot <= 0:
+            return None
+        end = reNameRun.match(line, dot + 1).end()
+        if end == dot + 1:
+            return None
+        spans  = {1: (0, dot), 2: (dot + 1, end)}
+        fields = []
+        if not self.__fields__(line, 0, end, spans, fields):
+            return None
+        values = [line] + [None] * self.groups
+        for group, (start, end) in spans.items():
+            values[group] = line[start:end]
+        return PcdMatch(line, values, [(line[start:end], cls) for start, end, cls in fields])
+
+    # Match the fields starting with a particular one (in the order the regular expression would try them)
+    # line:   Line being tokenized
+    # index:  Index into the layout of the field
+    # pos:    Position in the line at which the field (separator) starts
+    # spans:  Dictionary of group spans (updated)
+    # fields: List of fields (updated)
+    # returns True if the rest of the line matched, False otherwise
+    def __fields__(self, line, index, pos, spans, fields):
+        if index == len(self.layout):
+            return self.__end__(line, pos, spans)
+        kind, group, container, presence = self.layout[index]
+        if presence == LAZY and self.__end__(line, pos, spans):
+            return True
+        # Separator
+        start = reSpaces.match(line, pos).end()
+        if line[start:start + 1] == '|':
+            start = reSpaces.match(line, start + 1).end()
+            for end, cls in (self.__values__(line, start) if kind == VALUE else [(self.__item__(line, start), None)]):
+                fields.append((start, end, cls))
+                if self.__fields__(line, index + 1, end, spans, fields):
+                    spans[group] = (start, end)
+                    if container:
+                        spans[container] = (pos, fields[-1][1])
+                    return True
+                fields.pop()
+        # Try without this field (and those after it) if it is optional
+        return presence == GREEDY and self.__end__(line, pos, spans)
+
+    # Match the end of the line
+    # line:  Line being tokenized
+    # pos:   Position in the line after the last field
+    # spans: Dictionary of group spans (updated with the trailing {)
+    # returns True if at the end of the line, False otherwise
+    def __end__(self, line, pos, spans):
+        if self.brace:
+            pos = reSpaces.match(line, pos).end()
+            if line[pos:pos + 1] == '{' and self.__atEnd__(line, pos + 1):
+                spans[self.groups] = (pos, pos + 1)
+                return True
+        return self.__atEnd__(line, pos)
+
+    # Indicates if a position is the end of the line (a final newline is ignored like $ does)
+    # line: Line being tokenized
+    # pos:  Position in the line
+    # returns True if at the end, False otherwise
+    def __atEnd__(self, line, pos):
+        return pos == len(line) or (pos == len(line) - 1 and line[pos] == '\n')
+
+    # Get the end of an item field
+    # line:  Line being tokenized
+    # start: Position in the line at which the field starts
+    # returns position after the field (the next | or {, or the end of the line)
+    def __item__(self, line, start):
+        bar   = line.find('|', start)
+        brace = line.find('{', start)
+        if bar < 0 or 0 <= brace < bar:
+            bar = brace
+        return bar if bar >= 0 else len(line)
+
+    # Get the possible ends of a value field (in the order the regular expression would try them)
+    # line:  Line being tokenized
+    # start: Position in the line at which the field starts
+    # returns list of (position after the field, class of the value)
+    def __values__(self, line, start):
+        values = []
+        # Quoted string
+        quote = start + 1 if line[start:start + 1] in ('L', 'l') else start
+        if line[quote:quote + 1] == '"':
+            close = line.find('"', quote + 1)
+            if close > quote + 1:
+                values.append((close + 1, STRING))
+        if line[start:start + 1] == '{':
+            # GUID and GUID structure
+            if line[start:start + 7].upper() == '{GUID({':
+                end = self.__struct__(line, start + 6)
+                if end and line[end:end + 2] == ')}':
+                    values.append((end + 2, GUID))
+            end = self.__struct__(line, start)
+            if end:
+                values.append((end, STRUCT))
+            # Anything up to the next | or { (with or without the {)
+            values.append((self.__item__(line, start + 1), TEXT))
+            values.append((start, TEXT))
+        else:
+            values.append((self.__item__(line, start), TEXT))
+        return values
+
+    # Get the end of a GUID structure ({numbers{numbers}})
+    # line:  Line being tokenized
+    # start: Position in the line of the opening {
+    # returns position after the structure or None if there is no structure
+    def __struct__(self, line, start):
+        pos = start + 1
+        for close in ('{', '}}'):
+            begin = pos
+            pos   = reGuidRun.match(line, pos).end()
+            if pos == begin or line[pos:pos + len(close)] != close:
+                return None
+            pos += len(close)
+        return pos
+
+# Tokenizers for each of the regular expressions (used instead of compiling them)
+Patterns = {regEx: PcdPattern(regEx) for regEx in Layouts}
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import re
+import struct
+import uuid
+
+# Local modules
+# None
+
+# Sizes of the fixed size datum types
+Sizes   = {'BOOLEAN': 1, 'UINT8': 1, 'UINT16': 2, 'UINT32': 4, 'UINT64': 8}
+
+# Parsed values (key is (value text, datum type), value is (value, error)) so identical literals are only parsed once
+_cache  = {}
+
+# Regular expression for numbers (hexadecimal or decimal)
+reNumber = re.compile(r'^(0x[0-9a-f]+|[0-9]+)$', re.IGNORECASE)
+
+# Regular expression for typed values (e.g. "UINT32(5)")
+reTyped  = re.compile(r'^(BOOLEAN|UINT8|UINT16|UINT32|UINT64)\s*\((.*)\)$', re.IGNORECASE | re.DOTALL)
+
+# Regular expression for GUID values (e.g. 'GUID("...")', "GUID({...})")
+reGuid   = re.compile(r'^GUID\s*\((.*)\)$', re.IGNORECASE | re.DOTALL)
+
+# Regular expression for values that can't be worked out without the EDK2 build (macros, PCD references, characters, and expressions)
+reLater  = re.compile(r'\$\(|^[A-Za-z_]\w*\.[A-Za-z_]\w*$|[\'()+\-*/%&|^~!<>=?:]')
+
+# Regular expression for literals that are never valid for a fixed size datum type (byte arrays, strings, and GUIDs)
+reArray  = re.compile(r'^(\{|L?"|GUID\s*\()', re.IGNORECASE)
+
+# Parse a PCD value into the value the PCD database would hold
+# text:  Value as given in a DEC or DSC file
+# datum: Datum type of the PCD (BOOLEAN, UINT8, UINT16, UINT32, UINT64, or VOID*)
+# returns tuple of value (int for the fixed size datum types, bytes for VOID*, None if it can't be worked out without the
+#         EDK2 build, e.g. expressions and macros) and error message (None if there is no error)
+def Parse(text, datum):
+    if text == None or datum == None:
+        return (None, None)
+    key = (text, datum)
+    if not key in _cache:
+        datum = datum.strip().upper()
+        try:
+            _cache[key] = (__parseVoid__(text.strip()) if datum == 'VOID*' else __parseFixed__(text.strip(), datum), None)
+        except ValueError as error:
+            _cache[key] = (None, str(error))
+    return _cache[key]
+
+# Get the number of bytes a value takes up in the PCD database
+# value: Value from Parse (None if it could not be worked out)
+# datum: Datum type of the PCD
+# returns number of bytes or None if not known
+def Size(value, datum):
+    datum = datum.strip().upper() if datum != None else None
+    if datum in Sizes:
+        return Sizes[datum]
+    return len(value) if type(value) is bytes else None
+
+# Parse a number
+# text: Number (hexadecimal or decimal)
+# returns the number or None if the text is not a number
+def Number(text):
+    text = text.strip() if text != None else ''
+    if not reNumber.match(text):
+        return None
+    return int(text, 16 if text[:2].lower() == '0x' else 10)
+
+# Parse a value of a fixed size datum type
+# text:  Value text
+# datum: Datum type (upper case)
+# returns int or None if the value can't be worked out (e.g. macros, PCD references, and expressions)
+# Note: Raises ValueError if the value is not valid for the datum type or does not fit in it
+def __parseFixed__(text, datum):
+    if not datum in Sizes:
+        return None
+    typed = reTyped.match(text)
+    if typed:
+        text = typed.group(2).strip()
+    if text.upper() in ('TRUE', 'FALSE'):
+        value = 1 if text.upper() == 'TRUE' else 0
+    else:
+        value = Number(text)
+        if value == None:
+            if not reArray.match(text) and reLater.search(text):
+                return None
+            raise ValueError(f'{text} is not a valid {datum} value')
+    if (datum == 'BOOLEAN' and value > 1) or value >= 1 << (8 * Sizes[datum]):
+        raise ValueError(f'{text} does not fit in {datum}')
+    return value
+
+# Parse a value of the VOID* datum type
+# text: Value text
+# returns bytes or None if the value can't be worked out
+# Note: Raises ValueError if part of the value is not valid
+def __parseVoid__(text):
+    if text[:1] == '{' and text[-1:] == '}':
+        return __parseArray__(text[1:-1])
+    return __parseElement__(text)
+
+# Parse the inside of a byte array ({...}) or GUID structure
+# text: Text between the braces
+# returns bytes or None if the value can't be worked out
+def __parseArray__(text):
+    elements = __split__(text)
+    if elements[-1] == '':
+        elements.pop()
+    if not elements:
+        return b''
+    # GUID structure ({0x..., 0x..., 0x..., {0x..., 0x..., 0x..., 0x..., 0x..., 0x..., 0x..., 0x...}})
+    guid = __parseGuidStruct__(elements)
+    if guid != None:
+        return guid
+    value = b''
+    for element in elements:
+        if element[:1] == '{' and element[-1:] == '}':
+            item = __parseArray__(element[1:-1])
+        else:
+            number = Number(element)
+            if number != None and number > 0xFF:
+                raise ValueError(f'{element} does not fit in a byte')
+            item = bytes([number]) if number != None else __parseElement__(element)
+        if item == None:
+            return None
+        value += item
+    return value
+
+# Parse a string, typed value, or GUID
+# text: Text of the element
+# returns bytes or None if the value can't be worked out
+def __parseElement__(text):
+    # Strings (null terminated)
+    if text[:2] in ('L"', 'l"') and text[-1:] == '"' and len(text) >= 3:
+        return (__unescape__(text[2:-1]) + '\0').encode('utf-16-le')
+    if text[:1] == '"' and text[-1:] == '"' and len(text) >= 2:
+        try:
+            return (__unescape__(text[1:-1]) + '\0').encode('ascii')
+        except UnicodeEncodeError:
+            raise ValueError(f'{text} is not an ASCII string')
+    # Typed values (e.g. "UINT16(0x10)")
+    typed = reTyped.match(text)
+    if typed:
+        value = __parseFixed__(typed.group(2).strip(), typed.group(1).upper())
+        return value.to_bytes(Sizes[typed.group(1).upper()], 'little') if value != None else None
+    # GUIDs (registry format or structure)
+    guid = reGuid.match(text)
+    if guid:
+        guid = guid.group(1).strip()
+        if guid[:1] == '"' and guid[-1:] == '"':
+            try:
+                return uuid.UUID(guid[1:-1]).bytes_le
+            except ValueError:
+                raise ValueError(f'{guid} is not a GUID')
+        if guid[:1] == '{' and guid[-1:] == '}':
+            return __parseGuidStruct__(__split__(guid[1:-1]))
+    return None
+
+# Parse a GUID structure
+# elements: Elements of the structure (the last one is the braced array of 8 bytes)
+# returns bytes or None if the elements are not a GUID structure
+def __parseGuidStruct__(elements):
+    if len(elements) != 4 or elements[3][:1] != '{' or elements[3][-1:] != '}':
+        return None
+    data4   = __split__(elements[3][1:-1])
+    numbers = [Number(element) for element in elements[:3] + data4]
+    if len(data4) != 8 or None in numbers:
+        return None
+    try:
+        return struct.pack('<IHH8B', *numbers)
+    except struct.error:
+        raise ValueError(f'{{{", ".join(elements)}}} is not a GUID')
+
+# Split text on the commas that are not inside of quotes, parentheses, or braces
+# text: Text to be split
+# returns list of elements (without surrounding white space)
+def __split__(text):
+    elements = []
+    depth    = 0
+    quote    = False
+    start    = 0
+    for i, c in enumerate(text):
+        if quote:
+            quote = c != '"' or text[i - 1] == '\\'
+        elif c == '"':
+            quote = True
+        elif c in '({':
+            depth += 1
+        elif c in ')}':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            elements.append(text[start:i].strip())
+            start = i + 1
+    elements.append(text[start:].strip())
+    return elements
+
+# Replace the escape sequences in a string
+# text: Text between the quotes
+# returns text with the escape sequences replaced
+def __unescape__(text):
+    if not '\\' in text:
+        return text
+    return re.sub(r'\\(.)', lambda match: {'n': '\n', 't': '\t', 'r': '\r', '0': '\0'}.get(match.group(1), match.group(1)), text)
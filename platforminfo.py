@@ -13,16 +13,58 @@ from   dscparser  import DSCParser
 from   infparser  import INFParser
 from   decparser  import DECParser
 from   fdfparser  import FDFParser
+from   guidindex  import GuidIndex
+import fingerprint
+import impact
+import jsonl
+import memprofile
+import modulescope
+import parsecache
+import presence
+import profiler
+import progress
+import toolsdef
+import tracer
+import visitor
+
+# Find all of the platforms in a worktree
+# worktree: Base directory of the UEFI platform tree
+# returns sorted list of platform directories (directories named *Pkg containing PlatformPkg.dsc)
+def FindPlatforms(worktree):
+    platforms = []
+    for root, dirs, files in os.walk(worktree):
+        # Don't look in build output or hidden directories
+        dirs[:] = [d for d in dirs if d != 'Build' and not d.startswith('.')]
+        if root.endswith('Pkg') and 'PlatformPkg.dsc' in files:
+            platforms.append(root.replace('\\', '/'))
+    platforms.sort()
+    return platforms
+
+# Get all of the configurations indicated by a list of matrix specifications
+# specs: List of strings with format "macro=value1[,value2[,...]]" (None for no specifications)
+# returns list of configurations (dictionaries of macro values) for every combination of values
+def MatrixConfigurations(specs):
+    configs = [{}]
+    for spec in specs if specs else []:
+        macro, values = spec.split('=', 1) if '=' in spec else (spec, '')
+        configs = [dict(config, **{macro.strip(): value.strip()}) for config in configs for value in values.split(',')]
+    return configs
 
 class PlatformInfo:
-    content = []
+    content      = []
+    SpoofResults = {}       # Spoofed build output indexed by (platform, PLATFORM, TARGET)
 
     # Class constructor
     # platform: Platform directory
+    # config:   Macro values that override the defaults and the DSC/FDF files (default is None for no overrides)
+    #           Output files are placed in a configuration specific sub-directory when overrides are given
+    # report:   True to show the results and generate the output files (default), False to only process the files
     # returns nothing
-    def __init__(self, platform):
-        # Save platform
+    def __init__(self, platform, config = None, report = True):
+        # Save platform and configuration
         self.platform  = platform
+        self.config    = config if config else {}
+        self.report    = report
         # Find Worktree and change to it (this is where builds happen!)
         self.__findWorktree__()
         savedDir = os.getcwd()
@@ -31,10 +73,35 @@ class PlatformInfo:
         self.dscFile   = gbl.JoinPath(self.platform, "PlatformPkg.dsc")
         self.decFile   = gbl.JoinPath(self.platform, "PlatformPkg.dec")
         self.fdfFile   = gbl.JoinPath(self.platform, "PlatformPkg.fdf")
-        self.__initializeEnvironment__()
-        out = self.__spoofBuild__()
-        self.__processOutput__(out)
+        self.outputDir = self.platform
+        if self.config and self.report:
+            name = '_'.join([f'{macro}-{self.config[macro]}' for macro in self.config])
+            self.outputDir = gbl.JoinPath(self.platform, f'uefitool_{name}')
+            os.makedirs(self.outputDir, exist_ok = True)
+            print(f'Configuration:           {" ".join([f"{macro}={self.config[macro]}" for macro in self.config])}')
+        gbl.Overrides = dict(self.config)
+        gbl.Presence  = presence.TRUE if getattr(gbl.CommandLineResults, 'symbolic', False) else None
+        profiler.Enabled = getattr(gbl.CommandLineResults, 'profile', False)
+        profiler.Reset()
+        memprofile.Enabled = getattr(gbl.CommandLineResults, 'memprofile', False)
+        if memprofile.Enabled:
+            memprofile.Reset()
+        self.start     = time.perf_counter()
+        if tracer.Enabled:
+            tracer.Begin(self.platform, 'platform', self.config)
+        if jsonl.Enabled:
+            jsonl.Begin(self.platform, self.config)
+        with profiler.Phase('environment'):
+            self.__initializeEnvironment__()
+        key = (self.platform, gbl.Macros['PLATFORM'], gbl.Macros['TARGET'])
+        if not key in PlatformInfo.SpoofResults:
+            with profiler.Phase('spoof'):
+                PlatformInfo.SpoofResults[key] = self.__spoofBuild__()
+        with profiler.Phase('spoof output'):
+            self.__processOutput__(PlatformInfo.SpoofResults[key])
         self.__processPlatform__()
+        if tracer.Enabled:
+            tracer.End({'lines': gbl.Lines})
         os.chdir(savedDir)
 
     ###################
@@ -61,7 +128,7 @@ class PlatformInfo:
     def __processDSCs__(self):
         # Processing starts with the platform DSC file in the platform directory
         gbl.ReferenceSource(self.dscFile, self.platform, None)
-        gbl.DSCs[self.dscFile] = DSCParser(self.dscFile)
+        gbl.DSCs[self.dscFile] = parsecache.Parse(DSCParser, self.dscFile)
 
     # Process the INF file(s)
     # returns nothing
@@ -71,59 +138,98 @@ class PlatformInfo:
                 if item['macro'] == macro:
                     return item['value']
             return None
-        # Build a new dictionary of INF files
-        self.infs = {}
+        # Build a new dictionary of INF files (and of the module information and FILE_GUIDs recorded from them)
+        self.infs      = {}
+        self.modules   = {}
+        self.fileGuids = {}
+        # Each INF file is present when any of the DSC lines referencing it are (symbolic only)
+        presences = self.__infPresences__() if gbl.Presence != None else {}
+        if progress.Enabled:
+            progress.Total(len(set(gbl.INFs)))
         # Loop through the list of INFs generated by processing DSCs
         for inf in gbl.INFs:
             file = gbl.FindPath(inf)
             if not file:
                 info = gbl.References[inf][0]
-                gbl.Error(f"Unable to locate INF file: {inf} (reference {info[1]}:{info[0]})\n")
+                gbl.Error(f"Unable to locate INF file: {inf} (reference {info[1]}:{info[0]})", code = 'missing-file')
                 continue
             # See if file has already been processed
             if file in self.infs:
                 if Debug(SHOW_SKIPPED_INFS):
                     print(f"{file} already processed")
             else:
-                self.infs[file] = INFParser(file)
+                if gbl.Presence != None:
+                    gbl.Presence = presences[file] if file in presences else presence.TRUE
+                this = parsecache.Parse(INFParser, file)
+                self.infs[file] = this if visitor.Retain else None
+                # Record the module information right away so the parser need not be kept
+                name = GetDefinedValue(this.DEFINES, 'BASE_NAME')
+                inf  = gbl.INF(file)
+                inf.SetItem('parser', this if visitor.Retain else None)
+                inf.SetItem('dependencies', [item['name'] for item in this.LIBRARYCLASSES])
+                inf.SetItem('pcds', [f"{item['pcdtokenspaceguidname']}.{item['pcdname']}" for item in this.PCDS])
+                inf.SetItem('buildoptions', [(item['tag'], item['option'], item['value'].strip() if item['value'] else '') for item in this.BUILDOPTIONS])
+                if bool(this.DEPEX):
+                    depex = ''
+                    for item in this.DEPEX:
+                        items = item['depex'].split()
+                        depex += ' '.join(items) + ' '
+                    inf.SetItem('depex', depex.rstrip())
+                for define in ("FILE_GUID", "LIBRARY_CLASS", "MODULE_TYPE", "VERSION_STRING"):
+                    value = GetDefinedValue(this.DEFINES, define)
+                    if value:
+                        inf.SetItem(define, value)
+                self.modules[file] = (name, inf)
+                for item in this.DEFINES:
+                    if item['macro'] == 'FILE_GUID':
+                        self.fileGuids[file] = (name if name else file, item)
+        if gbl.Presence != None:
+            gbl.Presence = presence.TRUE
         # Create global dictionary of INF class items indexed by BASE_NAME
         gbl.INFs = {}
-        for file in self.infs:
-            this = self.infs[file]
-            name = GetDefinedValue(this.DEFINES, 'BASE_NAME')
+        for file in self.modules:
+            name, inf = self.modules[file]
             if not name:
-                gbl.Error(f'INF file does not define BASE_NAME: {file}')
+                gbl.Error('INF file does not define BASE_NAME', file, code = 'missing-base-name')
                 continue
-            gbl.INFs[name] = inf = gbl.INF(file)
-            inf.SetItem('parser', this)
-            if bool(this.DEPEX):
-                depex = ''
-                for item in this.DEPEX:
-                    items = item['depex'].split()
-                    depex += ' '.join(items) + ' '
-                inf.SetItem('depex', depex.rstrip())
-            for define in ("FILE_GUID", "LIBRARY_CLASS", "MODULE_TYPE", "VERSION_STRING"):
-                value = GetDefinedValue(this.DEFINES, define)
-                if value:
-                    inf.SetItem(define, value)
+            gbl.INFs[name] = inf
+            if visitor.Enabled:
+                visitor.Emit('on_module', name, inf)
+
+    # Get the presence condition of each INF file referenced by the DSC files (symbolic only)
+    # returns dictionary of INF file -> presence condition
+    def __infPresences__(self):
+        presences = {}
+        for dsc in gbl.DSCs.values():
+            for entry, field in [(entry, 'inf') for entry in dsc.COMPONENTS] + [(entry, 'path') for entry in dsc.LIBRARYCLASSES]:
+                file = gbl.FindPath(entry[field].replace('"', ''))
+                if file:
+                    presences[file] = presence.Or(presences[file], entry['presence']) if file in presences else entry['presence']
+        return presences
 
     # Process the INF file(s)
     # returns nothing
     def __processDECs__(self):
-        # Build a new dictionary of DEC files
-        self.decs = {}
+        # Build a new dictionary of DEC files (and of the include directories they declare)
+        self.decs     = {}
+        self.includes = {}
+        if progress.Enabled:
+            progress.Total(len(set(gbl.DECs)))
         # Loop through the list of DECs generated by processing DSCs and INFs
         for dec in gbl.DECs:
             file = gbl.FindPath(dec)
             if not file:
                 info = gbl.References[dec][0]
-                gbl.Error(f"Unable to locate DEC file: {dec} (reference {info[1]}:{info[0]})\n")
+                gbl.Error(f"Unable to locate DEC file: {dec} (reference {info[1]}:{info[0]})", code = 'missing-file')
                 continue
             if file in self.decs:
                 if Debug(SHOW_SKIPPED_DECS):
                     print(f"{file} already processed")
             else:
-                self.decs[file] = DECParser(file)
+                self.decs[file] = parsecache.Parse(DECParser, file)
+                self.includes[file] = [gbl.JoinPath(os.path.dirname(file), item['include']) for item in self.decs[file].INCLUDES]
+                if not visitor.Retain:
+                    self.decs[file] = None
         # Use new dictionary globally
         temp = gbl.DECs
         gbl.DECs = self.decs
@@ -134,7 +240,27 @@ class PlatformInfo:
     def __processFDFs__(self):
         # Processing starts with the platform DSC file in the platform directory
         gbl.ReferenceSource(self.fdfFile, self.platform, None)
-        gbl.FDFs[self.fdfFile] = FDFParser(self.fdfFile)
+        gbl.FDFs[self.fdfFile] = parsecache.Parse(FDFParser, self.fdfFile)
+
+    # Build an index of all GUID values by their canonical value
+    # returns GuidIndex of DEC GUIDs/PPIs/protocols, INF FILE_GUIDs, and FDF FILE statements
+    def __buildGuidIndex__(self):
+        index = GuidIndex()
+        # Add GUIDs, PPIs, and protocols defined in DECs
+        for kind, db in [('guid', gbl.Guids), ('ppi', gbl.Ppis), ('protocol', gbl.Protocols)]:
+            for name in db:
+                this = db[name]
+                if this.value != None:
+                    index.Add(kind, name, this.value, this.fileName, this.lineNumber)
+        # Add FILE_GUIDs of INFs
+        for file in self.fileGuids:
+            name, item = self.fileGuids[file]
+            index.Add('inf', name, item['value'], item['fileName'], item['lineNumber'])
+        # Add FILE statements of FDFs
+        for fdf in gbl.FDFs:
+            for item in gbl.FDFs[fdf].FILES:
+                index.Add('fdf', f"FILE {item['type']}", item['guid'], item['fileName'], item['lineNumber'])
+        return index
 
     # Finds the base directory of the platform tree
     # returns nothing
@@ -150,7 +276,7 @@ class PlatformInfo:
             gbl.Worktree = os.path.dirname(gbl.Worktree)
             # Get out if not found and no more levels to explore
             if gbl.Worktree == old:
-                gbl.Error('Unable to locate base of UEFI platform tree ... exiting!')
+                gbl.Error('Unable to locate base of UEFI platform tree ... exiting!', code = 'no-worktree')
                 sys.exit(1)
         gbl.Worktree = os.path.abspath(gbl.Worktree)
 
@@ -163,9 +289,9 @@ class PlatformInfo:
         if Debug(SHOW_MACRO_DEFINITIONS):
             print(f'{result}')
         self.__setEnvironment__('PLAT_PKG_PATH', self.platform)
-        platform = self.platform[-6:-3]
+        platform = self.config['PLATFORM'] if 'PLATFORM' in self.config else self.platform[-6:-3]
         self.__setEnvironment__('PLATFORM', platform)
-        self.__setEnvironment__('TARGET', 'DEBUG')
+        self.__setEnvironment__('TARGET', self.config['TARGET'] if 'TARGET' in self.config else 'DEBUG')
         build_dir = os.path.join(gbl.Worktree, 'Build')
         self.__setEnvironment__('BUILD_DIR', build_dir)
         self.__setEnvironment__('WORKSPACE', gbl.Worktree)
@@ -184,7 +310,7 @@ class PlatformInfo:
             os.remove(out)
             return results
         def GetWindowsOutput():
-            cmd = f'hpbuild.bat -P {gbl.Macros["PLATFORM"]} -b DEBUG'
+            cmd = f'hpbuild.bat -P {gbl.Macros["PLATFORM"]} -b {gbl.Macros["TARGET"]}'
             out = GetOutput(cmd)
             return out
         def GetLinuxOutput():
@@ -202,7 +328,7 @@ class PlatformInfo:
             else:
                 usr       = os.environ['HOME']
                 container = 'hub.docker.hpecorp.net/hpe-rom-team/gnext'
-                cmd       = f'cd {gbl.Worktree} && ./hpbuild.sh -P {gbl.Macros["PLATFORM"]} -b DEBUG'
+                cmd       = f'cd {gbl.Worktree} && ./hpbuild.sh -P {gbl.Macros["PLATFORM"]} -b {gbl.Macros["TARGET"]}'
                 with open(script, 'w') as scr:
                     scr.write('#!/bin/bash\n')
                     scr.write(f'sudo docker run --rm -it --privileged -v {gbl.Worktree}:{gbl.Worktree} -v  {usr}/.cache:/ccache -e "CCACHE_DIR=/ccache" {container} /bin/bash -c "{cmd}"\n')
@@ -216,7 +342,7 @@ class PlatformInfo:
         old    = gbl.JoinPath(tgtDir, 'build_old.py')
         # Make sure old file does not exist (that means last spoof did not complete)
         if os.path.exists(old):
-            gbl.Error('Unable to spoof build.py ... exiting!')
+            gbl.Error('Unable to spoof build.py ... exiting!', code = 'spoof-failed')
             sys.exit(2)
         # Rename build.py to build_old.py and remove build.py
         shutil.copyfile(build, old)
@@ -266,7 +392,7 @@ class PlatformInfo:
                 envEnd   = i
                 break
         else:
-            gbl.Error('Spoof output not as expected ... exiting!')
+            gbl.Error('Spoof output not as expected ... exiting!', code = 'spoof-failed')
             sys.exit(3)
         # Loop through command line
         i = cmdStart
@@ -294,6 +420,405 @@ class PlatformInfo:
             result = gbl.SetMacro(env, value.replace('\\', '/'))
             if Debug(SHOW_MACRO_DEFINITIONS):
                 print(f'{result}')
+        # Add configuration macros (same as -D on the build command line)
+        for macro in self.config:
+            result = gbl.SetMacro(macro, self.config[macro])
+            if Debug(SHOW_MACRO_DEFINITIONS):
+                print(f'{result}')
+
+    # Generate macro list
+    # returns nothing
+    def __reportMacros__(self):
+        print(f"\nGenerating macros.lst ...")
+        with open(os.path.join(self.outputDir, 'macros.lst'), 'w') as lst:
+            for macro in self.__sortedKeys__(gbl.Macros):
+                lst.write(f"{macro}={gbl.Macros[macro]}\n")
+                if jsonl.Enabled:
+                    jsonl.Record('macro', name = macro, value = gbl.Macros[macro])
+
+    # Generate apriori lists
+    # returns nothing
+    def __reportApriori__(self):
+        for item in ('PEI', 'DXE'):
+            if item in gbl.Apriori:
+                print(f"Generating apriori_{item.lower()}.lst ...")
+                with open(os.path.join(self.outputDir, f'apriori_{item.lower()}.lst'), 'w') as lst:
+                    lst.write(f"Define: {gbl.Apriori[item].lineNumber}:{gbl.Apriori[item].fileName}\n")
+                    for i, apriori in enumerate(gbl.Apriori[item].list):
+                        lst.write(f"{i+1}. {apriori}\n")
+                        if jsonl.Enabled:
+                            jsonl.Record('apriori', list = item, index = i + 1, inf = apriori, file = gbl.Apriori[item].fileName, line = gbl.Apriori[item].lineNumber)
+
+    # Generate sources and references lists
+    # returns nothing
+    def __reportSources__(self):
+        print(f"Generating sources.lst and references.lst ...")
+        with open(os.path.join(self.outputDir, 'sources.lst'), 'w') as lst:
+            with open(os.path.join(self.outputDir, 'references.lst'), 'w') as lst2:
+                for source in self.__sortedKeys__(gbl.Sources):
+                    lst.write(f"{source}\n")
+                    lst2.write(f"{source}\n")
+                    if jsonl.Enabled:
+                        jsonl.Record('source', name = source)
+                    for ref in gbl.Sources[source].references:
+                        lst2.write(f"    ref: {ref['lineNumber']}:{ref['fileName']}\n")
+                        if jsonl.Enabled:
+                            jsonl.Record('reference', source = source, file = ref['fileName'], line = ref['lineNumber'])
+
+    # Generate library list
+    # returns nothing
+    def __reportLibraries__(self):
+        print(f"Generating libraries.lst ...")
+        with open(os.path.join(self.outputDir, 'libraries.lst'), 'w') as lst:
+            for library in self.__sortedKeys__(gbl.INFs):
+                this = gbl.INFs[library]
+                lst.write(f'{library}\n')
+                lst.write(f'    fileName:       {this.fileName}\n')
+                lst.write(f'    FILE_GUID:      {this.file_guid}\n')
+                lst.write(f'    MODULE_TYPE:    {this.module_type}\n')
+                lst.write(f'    LIBRARY_CLASS:  {this.library_class}\n')
+                if this.version_string:
+                    lst.write(f'    VERSION_STRING: {this.version_string}\n')
+                if this.depex:
+                    lst.write(f'    DepEx:          {this.depex}\n')
+                dependency = this.dependencies
+                if dependency:
+                    lst.write(f'    Dependency:     ')
+                    space = ''
+                    for i, depends in enumerate(dependency):
+                        lst.write(f'{space}{i+1}. {depends}\n')
+                        space = '                    '
+                if jsonl.Enabled:
+                    jsonl.Record('library', name = library, file = this.fileName, FILE_GUID = this.file_guid, MODULE_TYPE = this.module_type,
+                                 LIBRARY_CLASS = this.library_class, VERSION_STRING = this.version_string, depex = this.depex, dependencies = dependency)
+
+    # Generate PPI list
+    # returns nothing
+    def __reportPpis__(self):
+        print(f"Generating ppis.lst ...")
+        with open(os.path.join(self.outputDir, 'ppis.lst'), 'w') as lst:
+            for ppi in self.__sortedKeys__(gbl.Ppis):
+                this = gbl.Ppis[ppi]
+                refs = gbl.Ppis[ppi].references
+                lst.write(f'{ppi}\n')
+                lst.write(f"    value:   {this.value}\n")
+                lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
+                if jsonl.Enabled:
+                    jsonl.Record('ppi', name = ppi, value = this.value, file = this.fileName, line = this.lineNumber, references = jsonl.References(refs))
+                if refs:
+                    for ref in refs:
+                        lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
+
+    # Generate Protocol list
+    # returns nothing
+    def __reportProtocols__(self):
+        print(f"Generating protocols.lst ...")
+        with open(os.path.join(self.outputDir, 'protocols.lst'), 'w') as lst:
+            for protocol in self.__sortedKeys__(gbl.Protocols):
+                this = gbl.Protocols[protocol]
+                refs = gbl.Protocols[protocol].references
+                lst.write(f'{protocol}\n')
+                lst.write(f"    value:   {this.value}\n")
+                lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
+                if jsonl.Enabled:
+                    jsonl.Record('protocol', name = protocol, value = this.value, file = this.fileName, line = this.lineNumber, references = jsonl.References(refs))
+                if refs:
+                    for ref in refs:
+                        lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
+
+    # Generate Guid list
+    # returns nothing
+    def __reportGuids__(self):
+        print(f"Generating guids.lst ...")
+        with open(os.path.join(self.outputDir, 'guids.lst'), 'w') as lst:
+            for guid in self.__sortedKeys__(gbl.Guids):
+                this = gbl.Guids[guid]
+                refs = gbl.Guids[guid].references
+                lst.write(f'{guid}\n')
+                lst.write(f"    value:   {this.value}\n")
+                lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
+                if jsonl.Enabled:
+                    jsonl.Record('guid', name = guid, value = this.value, file = this.fileName, line = this.lineNumber, references = jsonl.References(refs))
+                if refs:
+                    for ref in refs:
+                        lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
+
+    # Generate GUID collision list
+    # Values used by items of different kinds (e.g. an INF FILE_GUID declared in a DEC) are listed separately as they are intended
+    # returns nothing
+    def __reportCollisions__(self):
+        def WriteEntry(entry):
+            spaces = ' ' * (9 - len(entry['kind']))
+            lst.write(f"        {entry['kind']}:{spaces}{entry['name']} ({entry['lineNumber']}:{entry['fileName']})\n")
+        print(f"Generating collisions.lst ...")
+        index      = self.__buildGuidIndex__()
+        collisions = index.Collisions()
+        shared     = index.Shared()
+        with open(os.path.join(self.outputDir, 'collisions.lst'), 'w') as lst:
+            for title, values in [('Collisions', collisions), ('Shared by different kinds of items', shared)]:
+                lst.write(f'{title}:\n')
+                for value, entries in values:
+                    lst.write(f'    {gbl.FormatGuid(value)}\n')
+                    for entry in entries:
+                        WriteEntry(entry)
+            lst.write('Invalid values:\n')
+            for entry in index.invalid:
+                lst.write(f"    {entry['value']}\n")
+                WriteEntry(entry)
+        if collisions:
+            gbl.Error(f'{len(collisions)} GUID value collision(s) found (see collisions.lst)', code = 'guid-collision', severity = 'warning')
+        if shared:
+            gbl.Error(f'{len(shared)} GUID value(s) shared by different kinds of items (see collisions.lst)', code = 'guid-shared', severity = 'note')
+        for entry in index.invalid:
+            gbl.Error(f"Invalid GUID value for {entry['kind']} {entry['name']}: {entry['value']}", entry['fileName'], entry['lineNumber'], code = 'guid-invalid', severity = 'warning')
+
+    # Generate presence list
+    # returns nothing
+    def __reportPresence__(self):
+        print(f"Generating presence.lst ...")
+        with open(os.path.join(self.outputDir, 'presence.lst'), 'w') as lst:
+            def WritePresence(name, condition, fileName, lineNumber = None):
+                lst.write(f'    {name}\n')
+                lst.write(f'        when: {presence.ToString(condition)}\n')
+                lst.write(f'        at:   {fileName if lineNumber == None else f"{lineNumber}:{fileName}"}\n')
+            lst.write('Components:\n')
+            for dsc in gbl.DSCs.values():
+                for entry in dsc.COMPONENTS:
+                    WritePresence(entry['inf'], entry['presence'], entry['fileName'], entry['lineNumber'])
+            lst.write('Library classes:\n')
+            for dsc in gbl.DSCs.values():
+                for entry in dsc.LIBRARYCLASSES:
+                    WritePresence(f"{entry['name']}|{entry['path']}", entry['presence'], entry['fileName'], entry['lineNumber'])
+            lst.write('PCD settings:\n')
+            for dsc in gbl.DSCs.values():
+                for entry in dsc.PCDS:
+                    value = f"|{entry['value']}" if 'value' in entry else ''
+                    WritePresence(f"{entry['pcdtokenspaceguidname']}.{entry['pcdname']}{value}", entry['presence'], entry['fileName'], entry['lineNumber'])
+            lst.write('FV contents:\n')
+            for fdf in gbl.FDFs:
+                for inf, options, condition, fv in gbl.FDFs[fdf].INFS:
+                    WritePresence(f'INF {inf}', condition, fdf)
+                for file in gbl.FDFs[fdf].FILES:
+                    WritePresence(f"FILE {file['type']} {file['guid']}", file['presence'], file['fileName'], file['lineNumber'])
+            lst.write(f'Conditions: {len(presence.Atoms)} atoms, {len(presence.Nodes)} BDD nodes\n')
+
+    # Export the contents of each FV (INFs and FILE statements)
+    # returns nothing
+    def __reportFvMembers__(self):
+        for fdf in gbl.FDFs:
+            for inf, options, condition, fv in gbl.FDFs[fdf].INFS:
+                jsonl.Record('fv-member', type = 'INF', inf = inf, options = options, fv = fv, fdf = fdf)
+            for file in gbl.FDFs[fdf].FILES:
+                jsonl.Record('fv-member', type = 'FILE', fileType = file['type'], guid = file['guid'], file = file['fileName'], line = file['lineNumber'], fv = file['fv'], fdf = fdf)
+
+    # Generate PCD list
+    # returns nothing
+    def __reportPcds__(self):
+        print(f"Generating pdcs.lst ...")
+        total   = 0
+        unknown = 0
+        with open(os.path.join(self.outputDir, 'pcds.lst'), 'w') as lst:
+            # Get PCD settings from DECs
+            for name in self.__sortedKeys__(gbl.Pcds):
+                pcd = gbl.Pcds[name]
+                # Don't include subtype PCDs
+                if '[' in name or len(name.split('.')) > 2:
+                    continue
+                lst.write(f"{name}\n")
+                definer = pcd.definer
+                if definer:
+                    lst.write(f"    defined:  {pcd.definer['lineNumber']}:{pcd.definer['fileName']}\n")
+                lst.write(f"    default:  {pcd.default}\n")
+                lst.write(f"    type:     {pcd.datum}\n")
+                lst.write(f"    token:    {pcd.token}\n")
+                # Size in the PCD database (values are checked against the datum type and maximum size)
+                size = pcd.dataSize
+                lst.write(f"    datasize: {size}\n")
+                if size == None:
+                    unknown += 1
+                else:
+                    total   += size
+                for message, location in pcd.Check(name):
+                    gbl.Error(message, location['fileName'], location['lineNumber'], code = 'pcd-value', severity = 'warning')
+                overrider = pcd.overrider
+                if overrider:
+                    lst.write(f"    override: {pcd.overrider['lineNumber']}:{pcd.overrider['fileName']}\n")
+                    lst.write(f"    value:    {pcd.value}\n")
+                    lst.write(f"    size:     {pcd.size}\n")
+                references = pcd.references
+                if references:
+                    for ref in references:
+                        lst.write(f'    ref:      {ref["lineNumber"]}:{ref["fileName"]}\n')                            
+                if jsonl.Enabled:
+                    record = {'default': pcd.default, 'type': pcd.datum, 'token': pcd.token, 'datasize': size, 'references': jsonl.References(references)}
+                    if definer:
+                        record.update({'file': definer['fileName'], 'line': definer['lineNumber']})
+                    if overrider:
+                        record['override'] = {'value': pcd.value, 'size': pcd.size, 'file': overrider['fileName'], 'line': overrider['lineNumber']}
+                    jsonl.Record('pcd', name = name, **record)
+        print(f"PCD data size:           {total} bytes ({unknown} PCD(s) of unknown size)")
+        self.__reportSkuPcds__()
+
+    # Generate the PCD values in effect for each SKU (pcds_<SKU>.lst) and non-default store (pcds_<SKU>_<STORE>.lst)
+    # returns nothing
+    def __reportSkuPcds__(self):
+        default = gbl.LowestStore()
+        names   = [name for name in self.__sortedKeys__(gbl.Pcds) if not '[' in name and len(name.split('.')) <= 2]
+        for sku in self.__sortedKeys__(gbl.Skus):
+            for store in [None] + [store for store in self.__sortedKeys__(gbl.DefaultStores) if store != default]:
+                fileName = f'pcds_{sku}.lst' if store == None else f'pcds_{sku}_{store}.lst'
+                print(f"Generating {fileName} ...")
+                with open(os.path.join(self.outputDir, fileName), 'w') as lst:
+                    for name in names:
+                        pcd      = gbl.Pcds[name]
+                        override = pcd.Resolve(sku, store)
+                        lst.write(f"{name}\n")
+                        if override:
+                            lst.write(f"    value:    {override['value']}\n")
+                            lst.write(f"    sku:      {override['sku'] if override['sku'] else 'DEFAULT'}\n")
+                            if override['store']:
+                                lst.write(f"    store:    {override['store']}\n")
+                            lst.write(f"    override: {override['lineNumber']}:{override['fileName']}\n")
+                        else:
+                            lst.write(f"    value:    {pcd.default}\n")
+                            if pcd.definer:
+                                lst.write(f"    defined:  {pcd.definer['lineNumber']}:{pcd.definer['fileName']}\n")
+
+    # Generate the effective PCD values and build options of each module in the FVs
+    # returns nothing
+    def __reportModules__(self):
+        print(f"Generating modules.lst ...")
+        # DSC components with a sub-element (by full path)
+        scopes  = {}
+        for scope in [scope for scope in list(gbl.ModulePcds) + list(gbl.BuildOptions) if scope != None]:
+            file = gbl.FindPath(scope.replace('"', ''))
+            scopes[file if file else scope] = scope
+        # INFs in the FVs
+        modules = {}
+        for fdf in gbl.FDFs:
+            for inf, options, condition, fv in gbl.FDFs[fdf].INFS:
+                file = gbl.FindPath(inf)
+                if file and not file in modules:
+                    modules[file] = inf
+        items   = []
+        for file in self.__sortedKeys__(modules):
+            name, inf = self.modules[file] if file in self.modules else (None, None)
+            items.append((file, scopes[file] if file in scopes else None, inf.pcds if inf else []))
+        results, distinct = modulescope.Resolve(items)
+        with open(os.path.join(self.outputDir, 'modules.lst'), 'w') as lst:
+            for file, scope, names in items:
+                pcds, options = results[file]
+                lst.write(f"{modules[file]}\n")
+                if scope != None:
+                    lst.write(f"    scope:    {scope}\n")
+                for name in pcds:
+                    value, where = pcds[name]
+                    location     = modulescope.Location(name, where, scope)
+                    if location:
+                        where    = f"{where} {location['lineNumber']}:{location['fileName']}"
+                    lst.write(f"    pcd:      {name}|{value} ({where})\n")
+                for family, option in options:
+                    lst.write(f"    option:   {f'{family}:' if family else ''}{option} = {options[(family, option)]}\n")
+                if jsonl.Enabled:
+                    jsonl.Record('module', inf = modules[file], scope = scope, pcds = {name: {'value': pcds[name][0], 'from': pcds[name][1]} for name in pcds},
+                                 options = {f"{f'{family}:' if family else ''}{option}": options[(family, option)] for family, option in options})
+        print(f"Module configurations:   {len(items)} module(s), {distinct} distinct scope(s)")
+        self.__reportFlags__(items, modules)
+
+    # Generate the effective tool flags of each module in the FVs for each of its architectures (flags.lst)
+    # items:   List of (file, scope, PCD names) for each module (see __reportModules__)
+    # modules: Dictionary of file -> INF as given in the FDF
+    # returns nothing
+    def __reportFlags__(self, items, modules):
+        tools, settings = toolsdef.Load()
+        toolchain       = gbl.Macros['TOOL_CHAIN_TAG'] if 'TOOL_CHAIN_TAG' in gbl.Macros else settings.get('TOOL_CHAIN_TAG', '')
+        toolchain       = toolchain.replace(',', ' ').split()[0].upper() if toolchain.strip() else None
+        if not tools or not toolchain:
+            return
+        target   = gbl.Macros['TARGET'].upper()
+        arches   = [arch.upper() for arch in gbl.SupportedArchitectures] if gbl.SupportedArchitectures else settings.get('TARGET_ARCH', 'X64').upper().split()
+        # A tool chain tag that tools_def.txt does not define would give every module empty flags
+        if all([tools.Lookup(target, toolchain, arch, '*', 'FAMILY') == None for arch in arches]):
+            gbl.Error(f'Tool chain {toolchain} is not defined in {os.path.relpath(tools.fileName, gbl.Worktree)} (flags.lst not generated)', code = 'unknown-toolchain', severity = 'warning')
+            return
+        print(f"Generating flags.lst ...")
+        # Architectures of each component (from the [Components.<arch>] section it is in)
+        used     = {}
+        for dsc in gbl.DSCs.values():
+            for entry in dsc.COMPONENTS:
+                file = gbl.FindPath(entry['inf'].replace('"', ''))
+                arch = entry['section'][1].upper() if len(entry['section']) > 1 else 'COMMON'
+                used.setdefault(file, set()).update(arches if arch == 'COMMON' else [arch])
+        count    = 0
+        layers   = set()
+        with open(os.path.join(self.outputDir, 'flags.lst'), 'w') as lst:
+            for file, scope, names in items:
+                inf    = self.modules[file][1] if file in self.modules else None
+                layer  = modulescope.Layers(inf, scope)
+                layers.add(layer)
+                lst.write(f"{modules[file]}\n")
+                for arch in [arch for arch in arches if arch in used.get(file, arches)]:
+                    count += 1
+                    flags  = toolsdef.Flags(tools, target, toolchain, arch, layer)
+                    for command in sorted(flags):
+                        lst.write(f"    {target}_{toolchain}_{arch}_{command}_FLAGS = {flags[command]}".rstrip() + '\n')
+        print(f"Module flags:            {count} module/architecture(s), {len(layers)} distinct option layer set(s) ({os.path.relpath(tools.fileName, gbl.Worktree)})")
+
+    # Hash the files used by the platform and save the manifest (fingerprint.json)
+    # The hashes in the previous manifest are reused for files whose size, mtime and inode have not changed
+    # returns nothing
+    def __reportFingerprint__(self):
+        print(f"Generating fingerprint.json ...")
+        start    = time.perf_counter()
+        manifest = os.path.join(self.outputDir, 'fingerprint.json')
+        files    = set(list(gbl.DSCs) + list(self.infs) + list(gbl.DECs) + list(gbl.FDFs))
+        for source in gbl.Sources:
+            file = gbl.FindPath(source)
+            files.add(file if file else source)
+        entries, missing, hashed = fingerprint.Fingerprint(files, fingerprint.Load(manifest))
+        fingerprint.Save(manifest, entries, missing)
+        print(f"Files fingerprinted:     {len(entries)} ({hashed} hashed, {len(entries) - hashed} unchanged, {len(missing)} missing) in {time.perf_counter() - start:.2f} seconds")
+
+    # Show the modules, FVs, and FD regions affected by the files given with --impact
+    # returns nothing
+    def __reportImpact__(self):
+        start    = time.perf_counter()
+        index    = impact.Build(self.modules, self.includes)
+        built    = time.perf_counter()
+        files    = [impact.Normalize(file) for file in gbl.CommandLineResults.impact]
+        affected = index.Affected(files)
+        done     = time.perf_counter()
+        print(f"\nIMPACT:")
+        print(f"-------")
+        for file in files:
+            print(f"Changed file:            {file}{'' if index.Used(file) else ' (not used by the platform)'}")
+        modules  = sorted([name for kind, name in affected if kind == impact.MODULE])
+        groups   = [('library',   [name for name in modules if name in index.libraries]),
+                    ('module',    [name for name in modules if not name in index.libraries]),
+                    ('FV',        sorted([name for kind, name in affected if kind == impact.FV])),
+                    ('FD region', sorted([name for kind, name in affected if kind == impact.REGION]))]
+        for title, names in groups:
+            for name in names:
+                print(f"Affected {title}:{' ' * (15 - len(title))}{name}")
+                if jsonl.Enabled:
+                    jsonl.Record('impact', item = title, name = name)
+        print(f"Impact:                  {', '.join([f'{len(names)} {title}(s)' for title, names in groups])}")
+        print(f"Impact index:            {len(index.dependents)} item(s), {index.links} link(s) built in {(built - start) * 1000:.1f} ms, query in {(done - built) * 1000:.2f} ms")
+
+    # Show file dumps
+    # returns nothing
+    def __reportDump__(self):
+        for list in ['ARGs', 'DSCs', 'INFs', 'DECs', 'FDFs']:
+            print(f'\n{list[0:-1].upper()} Information:')
+            length = len(' Information:') + len(list[0:-1])
+            print('-'*length)
+            list = eval('gbl.'+list)
+            for item in list:
+                print(item)
+                if list[item] == None:
+                    print('    (not retained)')
+                else:
+                    list[item].Dump()
 
     # Process a platform and output the results
     # returns nothing
@@ -312,7 +837,14 @@ class PlatformInfo:
                 print(f"Parsing {name} files:")
                 length = len('Parsing  files:') + len(name)
                 print('-'*length)
-            handler()
+            with profiler.Phase(name):
+                if progress.Enabled:
+                    progress.PhaseStart(name)
+                handler()
+                if progress.Enabled:
+                    progress.PhaseEnd()
+        if not self.report:
+            return
 
         # Display the results
         # Show results
@@ -333,136 +865,38 @@ class PlatformInfo:
         print(f'Total files processed:   {total}')
         print(f'Total lines processed:   {gbl.Lines}')
 
-        # Generate macro list (if indicated)
-        if not gbl.CommandLineResults.macros:
-            print(f"\nGenerating macros.lst ...")
-            with open(os.path.join(self.platform, 'macros.lst'), 'w') as lst:
-                for macro in self.__sortedKeys__(gbl.Macros):
-                    lst.write(f"{macro}={gbl.Macros[macro]}\n")
-
-        # Generate apriori lists (if indicated)
-        if not gbl.CommandLineResults.apriori:
-            for item in ('PEI', 'DXE'):
-                if item in gbl.Apriori:
-                    print(f"Generating apriori_{item.lower()}.lst ...")
-                    with open(os.path.join(self.platform, f'apriori_{item.lower()}.lst'), 'w') as lst:
-                        lst.write(f"Define: {gbl.Apriori[item].lineNumber}:{gbl.Apriori[item].fileName}\n")
-                        for i, apriori in enumerate(gbl.Apriori[item].list):
-                            lst.write(f"{i+1}. {apriori}\n")
-
-        # Generate sources and references lists (if indicated)
-        if not gbl.CommandLineResults.sources:
-            print(f"Generating sources.lst and references.lst ...")
-            with open(os.path.join(self.platform, 'sources.lst'), 'w') as lst:
-                with open(os.path.join(self.platform, 'references.lst'), 'w') as lst2:
-                    for source in self.__sortedKeys__(gbl.Sources):
-                        lst.write(f"{source}\n")
-                        lst2.write(f"{source}\n")
-                        for ref in gbl.Sources[source].references:
-                            lst2.write(f"    ref: {ref['lineNumber']}:{ref['fileName']}\n")
-
-        # Generate library list (if indicated)
-        if not gbl.CommandLineResults.libraries:
-            print(f"Generating libraries.lst ...")
-            with open(os.path.join(self.platform, 'libraries.lst'), 'w') as lst:
-                for library in self.__sortedKeys__(gbl.INFs):
-                    this = gbl.INFs[library]
-                    lst.write(f'{library}\n')
-                    lst.write(f'    fileName:       {this.fileName}\n')
-                    lst.write(f'    FILE_GUID:      {this.file_guid}\n')
-                    lst.write(f'    MODULE_TYPE:    {this.module_type}\n')
-                    lst.write(f'    LIBRARY_CLASS:  {this.library_class}\n')
-                    if this.version_string:
-                        lst.write(f'    VERSION_STRING: {this.version_string}\n')
-                    if this.depex:
-                        lst.write(f'    DepEx:          {this.depex}\n')
-                    dependency = gbl.INFs[library].parser.LIBRARYCLASSES
-                    if dependency:
-                        lst.write(f'    Dependency:     ')
-                        space = ''
-                        for i, depends in enumerate(dependency):
-                            lst.write(f'{space}{i+1}. {depends["name"]}\n')
-                            space = '                    '
-
-        # Generate PPI list (if indicated)
-        if not gbl.CommandLineResults.ppis:
-            print(f"Generating ppis.lst ...")
-            with open(os.path.join(self.platform, 'ppis.lst'), 'w') as lst:
-                for ppi in self.__sortedKeys__(gbl.Ppis):
-                    this = gbl.Ppis[ppi]
-                    refs = gbl.Ppis[ppi].references
-                    lst.write(f'{ppi}\n')
-                    lst.write(f"    value:   {this.value}\n")
-                    lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
-                    if refs:
-                        for ref in refs:
-                            lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
-
-        # Generate Protocol list (if indicated)
-        if not gbl.CommandLineResults.protocols:
-            print(f"Generating protocols.lst ...")
-            with open(os.path.join(self.platform, 'protocols.lst'), 'w') as lst:
-                for protocol in self.__sortedKeys__(gbl.Protocols):
-                    this = gbl.Protocols[protocol]
-                    refs = gbl.Protocols[protocol].references
-                    lst.write(f'{protocol}\n')
-                    lst.write(f"    value:   {this.value}\n")
-                    lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
-                    if refs:
-                        for ref in refs:
-                            lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
-
-        # Generate Guid list (if indicated)
-        if not gbl.CommandLineResults.guids:
-            print(f"Generating guids.lst ...")
-            with open(os.path.join(self.platform, 'guids.lst'), 'w') as lst:
-                for guid in self.__sortedKeys__(gbl.Guids):
-                    this = gbl.Guids[guid]
-                    refs = gbl.Guids[guid].references
-                    lst.write(f'{guid}\n')
-                    lst.write(f"    value:   {this.value}\n")
-                    lst.write(f'    defined: {this.lineNumber}:{this.fileName}\n')
-                    if refs:
-                        for ref in refs:
-                            lst.write(f'    ref:     {ref["lineNumber"]}:{ref["fileName"]}\n')                            
-
-        # Generate PCD list (if indicated)
-        if not gbl.CommandLineResults.pcds:
-            print(f"Generating pdcs.lst ...")
-            with open(os.path.join(self.platform, 'pcds.lst'), 'w') as lst:
-                # Get PCD settings from DECs
-                for name in self.__sortedKeys__(gbl.Pcds):
-                    pcd = gbl.Pcds[name]
-                    # Don't include subtype PCDs
-                    if '[' in name or len(name.split('.')) > 2:
-                        continue
-                    lst.write(f"{name}\n")
-                    definer = pcd.definer
-                    if definer:
-                        lst.write(f"    defined:  {pcd.definer['lineNumber']}:{pcd.definer['fileName']}\n")
-                    lst.write(f"    default:  {pcd.default}\n")
-                    lst.write(f"    type:     {pcd.datum}\n")
-                    lst.write(f"    token:    {pcd.token}\n")
-                    overrider = pcd.overrider
-                    if overrider:
-                        lst.write(f"    override: {pcd.overrider['lineNumber']}:{pcd.overrider['fileName']}\n")
-                        lst.write(f"    value:    {pcd.value}\n")
-                        lst.write(f"    size:     {pcd.size}\n")
-                    references = pcd.references
-                    if references:
-                        for ref in references:
-                            lst.write(f'    ref:      {ref["lineNumber"]}:{ref["fileName"]}\n')                            
-
-        # Show file dumps (if indicated)
-        if gbl.CommandLineResults.dump:
-            for list in ['ARGs', 'DSCs', 'INFs', 'DECs', 'FDFs']:
-                print(f'\n{list[0:-1].upper()} Information:')
-                length = len(' Information:') + len(list[0:-1])
-                print('-'*length)
-                list = eval('gbl.'+list)
-                for item in list:
-                    print(item)
-                    list[item].Dump()
+        # Generate the output files (if indicated)
+        for name, generate, handler in [
+                ('macros.lst',     not gbl.CommandLineResults.macros,     self.__reportMacros__),
+                ('apriori lists',  not gbl.CommandLineResults.apriori,    self.__reportApriori__),
+                ('sources.lst',    not gbl.CommandLineResults.sources,    self.__reportSources__),
+                ('libraries.lst',  not gbl.CommandLineResults.libraries,  self.__reportLibraries__),
+                ('ppis.lst',       not gbl.CommandLineResults.ppis,       self.__reportPpis__),
+                ('protocols.lst',  not gbl.CommandLineResults.protocols,  self.__reportProtocols__),
+                ('guids.lst',      not gbl.CommandLineResults.guids,      self.__reportGuids__),
+                ('collisions.lst', not gbl.CommandLineResults.collisions, self.__reportCollisions__),
+                ('presence.lst',   gbl.Presence != None,                  self.__reportPresence__),
+                ('pcds.lst',       not gbl.CommandLineResults.pcds,       self.__reportPcds__),
+                ('modules.lst',    not gbl.CommandLineResults.modules,    self.__reportModules__),
+                ('FV members',     jsonl.Enabled,                         self.__reportFvMembers__),
+                ('fingerprint',    gbl.CommandLineResults.fingerprint,    self.__reportFingerprint__),
+                ('impact',         gbl.CommandLineResults.impact,         self.__reportImpact__),
+                ('dump',           gbl.CommandLineResults.dump,           self.__reportDump__)
+            ]:
+            if generate:
+                with profiler.Phase(name):
+                    handler()
+
+        # Show and save profiling information (if indicated)
+        if profiler.Enabled:
+            profiler.Summary()
+            profile = os.path.join(self.outputDir, 'profile.json')
+            print(f"\nGenerating profile.json ...")
+            profiler.Write(profile, {'version': gbl.ProgramVersion, 'platform': self.platform, 'config': self.config, 'lines': gbl.Lines, 'total': time.perf_counter() - self.start})
+
+        # Show and save memory usage (if indicated)
+        if memprofile.Enabled:
+            memprofile.Report(os.path.join(self.outputDir, 'memprofile.json'), {'version': gbl.ProgramVersion, 'platform': self.platform, 'config': self.config, 'lines': gbl.Lines})
 
     ##################
     # Public methods #
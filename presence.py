@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import re
+
+# Local modules
+# None
+
+# Presence conditions are kept as nodes of a reduced ordered binary decision diagram (BDD)
+# Nodes are hash-consed so equal conditions are always the same node (an integer)
+FALSE      = 0
+TRUE       = 1
+
+# Node table (index is the node, each is a tuple of (atom index, low node, high node))
+Nodes      = [(None, None, None), (None, None, None)]
+
+# Atoms (conditions that cannot be broken down any further) in the order they were first seen
+Atoms      = []
+
+# Internal lookup tables
+_unique    = {}         # (atom index, low, high) -> node
+_atomIndex = {}         # atom text -> atom index
+_andCache  = {}         # (node1, node2) -> node
+_notCache  = {}         # node -> node
+
+# Regular expression for breaking a condition into tokens
+# Groups 1=>token
+reToken    = re.compile(r'\s*(defined\s*\(\s*(?:\$\([^\)]*\)|[^\)]*)\s*\)|\$\([^\)]*\)|"[^"]*"|&&|\|\||!=|!|\(|\)|[^\s()!&|"$]+|[&|$])', re.IGNORECASE)
+
+# Get the node for an atom index and its two cofactors
+# atom: Atom index
+# low:  Node when the atom is False
+# high: Node when the atom is True
+# returns node
+def _node(atom, low, high):
+    if low == high:
+        return low
+    key = (atom, low, high)
+    if not key in _unique:
+        _unique[key] = len(Nodes)
+        Nodes.append(key)
+    return _unique[key]
+
+# Get the atom index at the top of a node (terminals sort after all atoms)
+# node: Node
+# returns atom index
+def _top(node):
+    return len(Atoms) if node <= TRUE else Nodes[node][0]
+
+# Get the cofactor of a node for an atom value
+# node:  Node
+# atom:  Atom index
+# value: True for the high cofactor, False for the low cofactor
+# returns node
+def _cofactor(node, atom, value):
+    if node <= TRUE or Nodes[node][0] != atom:
+        return node
+    return Nodes[node][2] if value else Nodes[node][1]
+
+# Get the condition for an atom
+# text: Atom text (e.g. "defined(FEATURE_X)" or "$(TARGET) == RELEASE")
+# returns node
+def Atom(text):
+    text = ' '.join(text.split())
+    if not text in _atomIndex:
+        _atomIndex[text] = len(Atoms)
+        Atoms.append(text)
+    return _node(_atomIndex[text], FALSE, TRUE)
+
+# Get the negation of a condition
+# node: Condition
+# returns node
+def Not(node):
+    if node <= TRUE:
+        return TRUE - node
+    if not node in _notCache:
+        atom, low, high = Nodes[node]
+        _notCache[node] = _node(atom, Not(low), Not(high))
+    return _notCache[node]
+
+# Get the conjunction of two conditions
+# node1: First  condition
+# node2: Second condition
+# returns node
+def And(node1, node2):
+    if node1 == FALSE or node2 == FALSE:
+        return FALSE
+    if node1 == TRUE or node1 == node2:
+        return node2
+    if node2 == TRUE:
+        return node1
+    key = (node1, node2) if node1 < node2 else (node2, node1)
+    if not key in _andCache:
+        atom = min(_top(node1), _top(node2))
+        low  = And(_cofactor(node1, atom, False), _cofactor(node2, atom, False))
+        high = And(_cofactor(node1, atom, True),  _cofactor(node2, atom, True))
+        _andCache[key] = _node(atom, low, high)
+    return _andCache[key]
+
+# Get the disjunction of two conditions
+# node1: First  condition
+# node2: Second condition
+# returns node
+def Or(node1, node2):
+    return Not(And(Not(node1), Not(node2)))
+
+# Evaluate a condition for a particular configuration
+# node:   Condition
+# values: Dictionary of atom text -> True/False (atoms that are not given are taken as False)
+# returns True or False
+def Evaluate(node, values):
+    while node > TRUE:
+        atom, low, high = Nodes[node]
+        node = high if Atoms[atom] in values and values[Atoms[atom]] else low
+    return node == TRUE
+
+# Convert a condition to a string (in disjunctive normal form)
+# node: Condition
+# returns string for the condition
+def ToString(node):
+    if node <= TRUE:
+        return 'TRUE' if node == TRUE else 'FALSE'
+    terms = []
+    def walk(node, literals):
+        if node == FALSE:
+            return
+        if node == TRUE:
+            terms.append(' && '.join(literals))
+            return
+        atom, low, high = Nodes[node]
+        text = Atoms[atom] if not ' ' in Atoms[atom] else f'({Atoms[atom]})'
+        walk(high, literals + [text])
+        walk(low,  literals + [f'!{text}'])
+    walk(node, [])
+    return ' || '.join(terms if len(terms) == 1 else [f'({term})' if ' && ' in term else term for term in terms])
+
+# Normalize a macro name used in an ifdef/ifndef/defined condition
+# name: Macro name (format "<name>" or "$(<name>)")
+# returns macro name
+def _macroName(name):
+    name = name.strip()
+    return name[2:-1].strip() if name.startswith('$(') and name.endswith(')') else name
+
+# Get the condition for a list of tokens that do not contain any boolean operators
+# tokens: List of tokens (e.g. ['$(TARGET)', '==', 'RELEASE'])
+# returns node
+def _leaf(tokens):
+    def constant(token):
+        token = token.replace('"', '').upper()
+        return TRUE if token == 'TRUE' else FALSE if token == 'FALSE' else None
+    if len(tokens) == 1:
+        value = constant(tokens[0])
+        if value != None:
+            return value
+        if tokens[0].lower().startswith('defined'):
+            return Atom(f'defined({_macroName(tokens[0][tokens[0].index("(")+1:-1])})')
+    # Comparisons with TRUE or FALSE are just the other side of the comparison
+    if len(tokens) == 3 and tokens[1] in ('==', '!='):
+        for this, other in ((0, 2), (2, 0)):
+            value = constant(tokens[this])
+            if value != None and constant(tokens[other]) == None:
+                node = _leaf([tokens[other]])
+                return node if (value == TRUE) == (tokens[1] == '==') else Not(node)
+    return Atom(' '.join(tokens))
+
+# Get the condition for a conditional directive
+# kind:      Type of conditional (one of "If", "Ifdef", or "Ifndef")
+# condition: Condition as written in the file (macros not expanded)
+# returns node
+def Condition(kind, condition):
+    if kind != 'If':
+        node = Atom(f'defined({_macroName(condition)})')
+        return node if kind == 'Ifdef' else Not(node)
+    tokens = reToken.findall(condition)
+    # Classify tokens as boolean operators or parts of a leaf
+    def operator(token):
+        upper = token.upper()
+        return '&&' if upper == 'AND' else '||' if upper == 'OR' else '!' if upper == 'NOT' else token if token in ('&&', '||', '!', '(', ')') else None
+    index = 0
+    # expression := term ('||' term)*
+    def expression():
+        nonlocal index
+        node = term()
+        while index < len(tokens) and operator(tokens[index]) == '||':
+            index += 1
+            node  = Or(node, term())
+        return node
+    # term := factor ('&&' factor)*
+    def term():
+        nonlocal index
+        node = factor()
+        while index < len(tokens) and operator(tokens[index]) == '&&':
+            index += 1
+            node  = And(node, factor())
+        return node
+    # factor := '!' factor | '(' expression ')' | leaf
+    def factor():
+        nonlocal index
+        if index >= len(tokens):
+            raise SyntaxError(condition)
+        op = operator(tokens[index])
+        if op == '!':
+            index += 1
+            return Not(factor())
+        if op == '(':
+            index += 1
+            node = expression()
+            if index >= len(tokens) or operator(tokens[index]) != ')':
+                raise SyntaxError(condition)
+            index += 1
+            return node
+        leaf = []
+        while index < len(tokens) and operator(tokens[index]) == None:
+            leaf.append(tokens[index])
+            index += 1
+        if not leaf:
+            raise SyntaxError(condition)
+        return _leaf(leaf)
+    try:
+        node = expression()
+        if index != len(tokens):
+            raise SyntaxError(condition)
+        return node
+    except SyntaxError:
+        # Condition could not be broken down so treat the whole thing as an atom
+        return Atom(condition)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import json
+import time
+from   contextlib import contextmanager
+
+# Local modules
+import memprofile
+import tracer
+
+# Indicates if profiling information is to be collected
+Enabled  = False
+
+# Profiling information
+Phases   = []       # List of (name, wall seconds, cpu seconds) in the order the phases completed
+Files    = {}       # fileName -> [times parsed, inclusive seconds, exclusive seconds]
+Regexes  = {}       # regular expression name -> [attempts, hits, seconds]
+Counters = {}       # name -> [calls, seconds]
+_files   = []       # Stack of [fileName, start time, seconds spent in included files] for files being parsed
+
+# Clear all profiling information
+# returns nothing
+def Reset():
+    global Phases, _files
+    Phases = []
+    _files = []
+    for db in (Files, Regexes, Counters):
+        db.clear()
+
+# Time a phase of processing (use as "with profiler.Phase(name):")
+# Phases are also shown in the timeline when tracing and have their memory usage noted when memory profiling
+# name: Name of the phase
+# returns nothing
+@contextmanager
+def Phase(name):
+    if not Enabled and not tracer.Enabled and not memprofile.Enabled:
+        yield
+        return
+    wall, cpu = (time.perf_counter(), time.process_time())
+    if tracer.Enabled:
+        tracer.Begin(name, 'phase')
+    try:
+        yield
+    finally:
+        if tracer.Enabled:
+            tracer.End()
+        if Enabled:
+            Phases.append((name, time.perf_counter() - wall, time.process_time() - cpu))
+        if memprofile.Enabled:
+            memprofile.Boundary(name)
+
+# Note the start of parsing a file
+# fileName: File being parsed
+# returns nothing
+def EnterFile(fileName):
+    _files.append([fileName, time.perf_counter(), 0.0])
+
+# Note the end of parsing the most recently entered file
+# returns nothing
+def ExitFile():
+    fileName, start, included = _files.pop()
+    elapsed = time.perf_counter() - start
+    if not fileName in Files:
+        Files[fileName] = [0, 0.0, 0.0]
+    Files[fileName][0] += 1
+    Files[fileName][1] += elapsed
+    Files[fileName][2] += elapsed - included
+    # Time spent in this file is part of the including file's time
+    if _files:
+        _files[-1][2] += elapsed
+
+# Note a regular expression match attempt
+# regEx:   Name of the regular expression (e.g. "rePcdReDef")
+# hit:     True if the regular expression matched
+# seconds: Time taken by the attempt
+# returns nothing
+def Regex(regEx, hit, seconds):
+    if not regEx in Regexes:
+        Regexes[regEx] = [0, 0, 0.0]
+    Regexes[regEx][0] += 1
+    Regexes[regEx][1] += 1 if hit else 0
+    Regexes[regEx][2] += seconds
+
+# Note a call to something being counted
+# name:    Name of the item being counted (e.g. "FindPath")
+# seconds: Time taken by the call
+# returns nothing
+def Count(name, seconds):
+    if not name in Counters:
+        Counters[name] = [0, 0.0]
+    Counters[name][0] += 1
+    Counters[name][1] += seconds
+
+# Show a ranked summary of the profiling information
+# top: Maximum number of items to show in each ranking (default is 10)
+# returns nothing
+def Summary(top = 10):
+    print(f"\nPROFILE:")
+    print(f"--------")
+    print(f"Phases (wall/cpu seconds):")
+    for name, wall, cpu in sorted(Phases, key = lambda phase: -phase[1]):
+        print(f"    {wall:8.3f} {cpu:8.3f}  {name}")
+    print(f"Files (exclusive/inclusive seconds, times parsed):")
+    for fileName in sorted(Files, key = lambda name: -Files[name][2])[:top]:
+        count, inclusive, exclusive = Files[fileName]
+        print(f"    {exclusive:8.3f} {inclusive:8.3f} {count:4}  {fileName}")
+    print(f"Regular expressions (seconds, attempts, hits):")
+    for regEx in sorted(Regexes, key = lambda name: -Regexes[name][2])[:top]:
+        attempts, hits, seconds = Regexes[regEx]
+        print(f"    {seconds:8.3f} {attempts:8} {hits:8}  {regEx}")
+    print(f"Other (seconds, calls):")
+    for name in sorted(Counters, key = lambda name: -Counters[name][1])[:top]:
+        calls, seconds = Counters[name]
+        print(f"    {seconds:8.3f} {calls:8}  {name}")
+
+# Write the profiling information to a JSON file
+# fileName: File to be written
+# info:     Dictionary of additional information to include (e.g. version, platform)
+# returns nothing
+def Write(fileName, info):
+    data = dict(info)
+    data['phases']   = [{'name': name, 'wall': wall, 'cpu': cpu} for name, wall, cpu in Phases]
+    data['files']    = {name: {'count': count, 'inclusive': inclusive, 'exclusive': exclusive} for name, (count, inclusive, exclusive) in Files.items()}
+    data['regexes']  = {regEx: {'attempts': attempts, 'hits': hits, 'seconds': seconds} for regEx, (attempts, hits, seconds) in Regexes.items()}
+    data['counters'] = {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in Counters.items()}
+    with open(fileName, 'w') as out:
+        json.dump(data, out, indent = 2)
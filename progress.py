@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import json
+import sys
+import time
+
+# Local modules
+# None
+
+# Indicates if progress events are to be generated (set when a consumer is added)
+Enabled  = False
+
+# Consumers of progress events (each is called with an event dictionary)
+Sinks    = []
+
+# Minimum seconds between progress events within a phase (phase start and end events are never throttled)
+Interval = 0.2
+
+# Current phase as [name, start time, files done, lines done, expected files (None if not known), time of last event]
+_phase   = None
+
+# Add a consumer of progress events
+# sink: Function to be called with each event
+# returns nothing
+def AddSink(sink):
+    global Enabled
+    Sinks.append(sink)
+    Enabled = True
+
+# Build an event for the current phase
+# kind: Kind of event ("phase-start", "progress", or "phase-end")
+# file: File most recently done (default is None for none)
+# returns event dictionary
+def _event(kind, file = None):
+    name, start, files, lines, total, last = _phase
+    elapsed = time.perf_counter() - start
+    rate    = files / elapsed if elapsed > 0 else 0.0
+    eta     = (total - files) / rate if total != None and rate > 0 and total > files else None
+    event   = {'event': kind, 'phase': name, 'files': files, 'lines': lines, 'total': total, 'elapsed': elapsed, 'filesPerSecond': rate, 'eta': eta}
+    if file != None:
+        event['file'] = file
+    return event
+
+# Send an event to all of the consumers
+# event: Event dictionary
+# returns nothing
+def _emit(event):
+    for sink in Sinks:
+        sink(event)
+
+# Note the start of a phase
+# name: Name of the phase
+# returns nothing
+def PhaseStart(name):
+    global _phase
+    _phase = [name, time.perf_counter(), 0, 0, None, 0.0]
+    _emit(_event('phase-start'))
+
+# Note the number of files the current phase is expected to process (allows an ETA)
+# files: Expected number of files
+# returns nothing
+def Total(files):
+    if _phase != None:
+        _phase[4] = files
+
+# Note that a file has been done (events are throttled so this is cheap enough to call for every file)
+# fileName: File that was done
+# lines:    Number of lines in the file
+# returns nothing
+def FileDone(fileName, lines):
+    phase = _phase
+    if phase == None:
+        return
+    phase[2] += 1
+    phase[3] += lines
+    now = time.perf_counter()
+    if now - phase[5] < Interval:
+        return
+    phase[5] = now
+    _emit(_event('progress', fileName))
+
+# Note the end of the current phase
+# returns nothing
+def PhaseEnd():
+    global _phase
+    if _phase == None:
+        return
+    event  = _event('phase-end')
+    _phase = None
+    _emit(event)
+
+# Class for showing progress as a single line progress bar on a terminal
+class Bar:
+
+    # Class constructor
+    # stream: Stream to write to (default is None for stderr)
+    # width:  Width of the bar in characters (default is 30)
+    # returns nothing
+    def __init__(self, stream = None, width = 30):
+        self.stream = stream if stream else sys.stderr
+        self.width  = width
+        self.shown  = 0         # Length of the line currently shown (so it can be cleared)
+
+    # Show an event
+    # event: Event dictionary
+    # returns nothing
+    def __call__(self, event):
+        files, total = (event['files'], event['total'])
+        if total:
+            done = min(self.width, self.width * files // total)
+            bar  = f'[{"#" * done}{"." * (self.width - done)}] {files}/{total}'
+        else:
+            bar  = f'[{files} files]'
+        eta  = f' ETA {int(event["eta"]) // 60}:{int(event["eta"]) % 60:02}' if event['eta'] != None else ''
+        line = f'{event["phase"]:4} {bar} {event["filesPerSecond"]:.0f} files/s{eta}'
+        if event['event'] == 'phase-end':
+            line = f'{event["phase"]:4} {files} files, {event["lines"]} lines in {event["elapsed"]:.1f}s'
+        self.stream.write('\r' + line.ljust(self.shown) + ('\n' if event['event'] == 'phase-end' else ''))
+        self.stream.flush()
+        self.shown = 0 if event['event'] == 'phase-end' else len(line)
+
+# Class for saving progress events as JSON lines (e.g. for CI logs)
+class JsonLines:
+
+    # Class constructor
+    # fileName: File to be written ("-" for stdout)
+    # returns nothing
+    def __init__(self, fileName):
+        self.out = sys.stdout if fileName == '-' else open(fileName, 'w')
+
+    # Save an event
+    # event: Event dictionary
+    # returns nothing
+    def __call__(self, event):
+        self.out.write(json.dumps(dict(event, time = time.time())) + '\n')
+        self.out.flush()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import os
+import re
+
+# Local modules
+import globals as gbl
+
+# Regular expressions for tools_def.txt and target.txt lines
+reDefine   = re.compile(r'^DEFINE\s+(\w+)\s*=\s*(.*)$')                             # DEFINE name = value
+reToolKey  = re.compile(r'^([^_\s=]+)_([^_\s=]+)_([^_\s=]+)_([^_\s=]+)_(\w+)\s*=\s*(.*)$')  # TARGET_TOOLCHAIN_ARCH_COMMAND_ATTRIBUTE = value
+reSetting  = re.compile(r'^(\w+)\s*=\s*(.*)$')                                     # name = value
+reDef      = re.compile(r'DEF\((\w+)\)')                                           # DEF(name)
+reEnv      = re.compile(r'ENV\((\w+)\)')                                           # ENV(name)
+
+# Parsed tools_def.txt files (key is file name) so a worktree's file is only parsed once
+_parsed    = {}
+
+# Resolved flags (key is (ToolsDef, target, toolchain, arch, option layers)) so modules with the same options share them
+_flags     = {}
+
+# Class for the tool definitions of a tools_def.txt file
+class ToolsDef:
+
+    # Class constructor
+    # fileName: tools_def.txt file
+    # returns nothing
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.defines  = {}
+        self.index    = {}      # (command, attribute) -> {(target, toolchain, arch): value}
+        self.lookups  = {}      # (target, toolchain, arch, command, attribute) -> value (None if not defined)
+        self.lines    = 0
+        with open(fileName, 'r', errors = 'replace') as file:
+            for line in file:
+                self.lines += 1
+                line        = line.split('#', 1)[0].strip()
+                if line:
+                    self.__parseLine__(line)
+
+    # Parse a line of the file
+    # line: Line without comments and surrounding white space
+    # returns nothing
+    def __parseLine__(self, line):
+        line  = reEnv.sub(lambda match: os.environ.get(match.group(1), match.group(0)), line)
+        match = reDefine.match(line)
+        if match:
+            self.defines[match.group(1)] = reDef.sub(lambda item: self.defines.get(item.group(1), item.group(0)), match.group(2).strip())
+            return
+        match = reToolKey.match(line)
+        if match:
+            target, toolchain, arch, command, attribute, value = match.groups()
+            value = reDef.sub(lambda item: self.defines.get(item.group(1), item.group(0)), value.strip())
+            key   = (command.upper(), attribute.upper())
+            if not key in self.index:
+                self.index[key] = {}
+            self.index[key][(target.upper(), toolchain.upper(), arch.upper())] = value
+
+    # Look up a tool setting (the most specific definition is used, see Priority)
+    # target:    Build target (e.g. DEBUG)
+    # toolchain: Tool chain tag (e.g. GCC5)
+    # arch:      Architecture (e.g. X64)
+    # command:   Command type (e.g. CC)
+    # attribute: Attribute (e.g. FLAGS)
+    # returns value or None if not defined
+    def Lookup(self, target, toolchain, arch, command, attribute):
+        key = (target, toolchain, arch, command, attribute)
+        if not key in self.lookups:
+            values = [self.index[(name, attribute)][names] for name in (command, '*') if (name, attribute) in self.index
+                      for names in Candidates(target, toolchain, arch) if names in self.index[(name, attribute)]]
+            self.lookups[key] = values[0] if values else None
+        return self.lookups[key]
+
+    # Get the command types that have an attribute
+    # attribute: Attribute (e.g. FLAGS)
+    # returns sorted list of command types (without *)
+    def Commands(self, attribute):
+        return sorted(set([command for command, name in self.index if name == attribute and command != '*']))
+
+# Get the ways a target, tool chain, and architecture can be given (in priority order, for each command type)
+# target:    Build target
+# toolchain: Tool chain tag
+# arch:      Architecture
+# returns list of (target, toolchain, arch) with * for each wildcard
+def Candidates(target, toolchain, arch):
+    return [(t, c, a) for a in (arch, '*') for c in (toolchain, '*') for t in (target, '*')]
+
+# Get the priority of an option (EDK2 order: command type, architecture, tool chain, and then target given is more specific)
+# fields: List of target, tool chain, architecture, command type, and attribute (with * for each wildcard)
+# returns priority (0 is the most specific, 15 the least)
+def Priority(fields):
+    return (8 if fields[3] == '*' else 0) + (4 if fields[2] == '*' else 0) + (2 if fields[1] == '*' else 0) + (1 if fields[0] == '*' else 0)
+
+# Find and parse the tools_def.txt of the worktree
+# Conf is $(CONF_PATH) if defined, $(WORKSPACE)/Conf otherwise; BaseTools/Conf/tools_def.template is used if Conf has no tools_def.txt
+# returns tuple of ToolsDef object (None if not found) and dictionary of the target.txt settings (empty if there is none)
+def Load():
+    conf     = gbl.Macros['CONF_PATH'] if 'CONF_PATH' in gbl.Macros else os.environ.get('CONF_PATH', gbl.JoinPath(gbl.Worktree, 'Conf'))
+    settings = {}
+    target   = gbl.JoinPath(conf, 'target.txt')
+    if os.path.isfile(target):
+        with open(target, 'r', errors = 'replace') as file:
+            for line in file:
+                match = reSetting.match(line.split('#', 1)[0].strip())
+                if match:
+                    settings[match.group(1).upper()] = match.group(2).strip()
+    names    = [settings['TOOL_CHAIN_CONF']] if 'TOOL_CHAIN_CONF' in settings and settings['TOOL_CHAIN_CONF'] else []
+    names   += [gbl.JoinPath(conf, 'tools_def.txt')] + [gbl.JoinPath(gbl.JoinPath(path, 'BaseTools/Conf'), 'tools_def.template') for path in [gbl.Worktree] + gbl.Paths]
+    for name in names:
+        name = name if os.path.isabs(name) else gbl.JoinPath(gbl.Worktree, name)
+        if os.path.isfile(name):
+            if not name in _parsed:
+                _parsed[name] = ToolsDef(name)
+            return (_parsed[name], settings)
+    return (None, settings)
+
+# Get the effective flags of a module
+# The tools_def.txt flags are layered with each set of build options (from the lowest priority to the highest, e.g. INF, DSC,
+# DSC component sub-element). Options in a layer apply when their key matches and their family (if given) is the tool chain's
+# FAMILY or BUILDRULEFAMILY. They are applied least specific first, adding to the flags or replacing them when given with ==.
+# tools:     ToolsDef object
+# target:    Build target
+# toolchain: Tool chain tag
+# arch:      Architecture
+# layers:    Tuple of option layers, each a tuple of (family, option, value)
+# returns dictionary of command type -> flags
+def Flags(tools, target, toolchain, arch, layers):
+    key = (tools, target, toolchain, arch, layers)
+    if not key in _flags:
+        families = set([tools.Lookup(target, toolchain, arch, '*', name) for name in ('FAMILY', 'BUILDRULEFAMILY')]) - set([None])
+        flags    = {}
+        for command in tools.Commands('FLAGS'):
+            value = tools.Lookup(target, toolchain, arch, command, 'FLAGS')
+            if value != None:
+                flags[command] = value
+        for layer in layers:
+            options = []
+            for family, option, value in layer:
+                fields = option.upper().split('_', 4)
+                if len(fields) != 5 or fields[4] != 'FLAGS' or (family and not family.upper() in families):
+                    continue
+                if all([fields[i] in ('*', name) for i, name in enumerate((target, toolchain, arch))]):
+                    options.append((Priority(fields), fields[3], value))
+            for priority, command, value in sorted(options, key = lambda item: -item[0]):
+                for command in (tools.Commands('FLAGS') if command == '*' else [command]):
+                    if value.startswith('=') or not command in flags:
+                        flags[command] = value.lstrip('=').strip()
+                    else:
+                        flags[command] = f'{flags[command]} {value}'.strip()
+        _flags[key] = flags
+    return _flags[key]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import json
+import os
+import time
+
+# Local modules
+# None
+
+# Indicates if a timeline is to be collected
+Enabled = False
+
+# Timeline events (Chrome trace event format, viewable in Perfetto or chrome://tracing)
+Events  = []
+_spans  = []            # Stack of events for spans that have not ended
+_burst  = None          # Event for the current burst of FindPath calls (None if the last thing traced was not a FindPath)
+_start  = time.perf_counter()
+
+# Get the current timestamp
+# returns microseconds since tracing started
+def _now():
+    return (time.perf_counter() - _start) * 1000000
+
+# Begin a span (spans nest, so every Begin must have a matching End)
+# name:     Name of the span
+# category: Category of the span (e.g. "parse", "include", "phase")
+# args:     Dictionary of information to show for the span (default is None for none)
+# returns nothing
+def Begin(name, category, args = None):
+    global _burst
+    _burst = None
+    event  = {'name': name, 'cat': category, 'ph': 'X', 'ts': _now(), 'dur': 0, 'pid': os.getpid(), 'tid': 1, 'args': dict(args) if args else {}}
+    Events.append(event)
+    _spans.append(event)
+
+# End the most recent span
+# args: Dictionary of information to add to the span (default is None for none)
+# returns nothing
+def End(args = None):
+    global _burst
+    _burst = None
+    event  = _spans.pop()
+    event['dur'] = _now() - event['ts']
+    if args:
+        event['args'].update(args)
+
+# Note a call to FindPath (consecutive calls are combined into one span)
+# start:   Timestamp (from time.perf_counter()) when the call started
+# partial: Partial path that was searched for
+# found:   True if the path was found
+# returns nothing
+def FindPath(start, partial, found):
+    global _burst
+    ts = (start - _start) * 1000000
+    if _burst == None:
+        _burst = {'name': 'FindPath', 'cat': 'findpath', 'ph': 'X', 'ts': ts, 'dur': 0, 'pid': os.getpid(), 'tid': 1, 'args': {'calls': 0, 'missing': 0, 'first': partial}}
+        Events.append(_burst)
+    _burst['dur'] = _now() - _burst['ts']
+    _burst['args']['calls']   += 1
+    _burst['args']['missing'] += 0 if found else 1
+    _burst['name'] = f"FindPath x{_burst['args']['calls']}"
+
+# Write the timeline to a file (any spans that have not ended are ended)
+# fileName: File to be written
+# returns nothing
+def Write(fileName):
+    while _spans:
+        End({'incomplete': True})
+    with open(fileName, 'w') as out:
+        json.dump({'traceEvents': Events, 'displayTimeUnit': 'ms'}, out)
@@ -2,10 +2,30 @@
 
 # Standard python modules
 import re
+import time
 
 # Local modules
 from   debug   import *
+import demand
+import fileir
 import globals as     gbl
+import memprofile
+import pcdtokens
+import presence
+import profiler
+import progress
+import tracer
+import visitor
+
+# Regular expression for section headers (format "[<sections>]")
+# Groups 1=>sections
+reSectionHeader = re.compile(r'\[([^\[\]]+)\]')
+
+# Regular expression for DEFINE lines (see globals)
+reDefineLine    = re.compile(gbl.reDefine, re.IGNORECASE)
+
+# Dispatch entries for each section of each parser class (see __dispatchEntry__)
+DispatchEntries = {}
 
 # Base class for all UEFI file types
 class UEFIParser:
@@ -70,6 +90,20 @@ class UEFIParser:
         self.conditionHandled     = False                      # Indicates if current conditional has been handled
         self.conditionalStack     = []                         # For nesting of conditionals
         self.allowedConditionals  = []                         # Note If, Ifdef, and Ifndef are always allowed
+        self.conditionPresence    = presence.FALSE             # Presence condition covered by the branches of current conditional so far (symbolic only)
+        self.skipDepth            = 0                          # Nesting of conditionals inside a conditionally excluded block
+        self.rawLine              = ''                         # Current directive line before macro expansion (symbolic only)
+        self.lineKind             = fileir.BODY                # Kind of the current line (see fileir)
+        # Setup match statistics (only kept when profiling or tracing)
+        self.regExAttempts        = 0                          # Number of regular expression match attempts
+        self.regExHits            = 0                          # Number of regular expression matches
+        # Setup macro tracking
+        self.macroInputs          = {}                         # Macros read before this file defined them (macro -> value read)
+        self.macroOutputs         = set()                      # Macros defined by this file
+        # Setup demand driven parsing
+        self.skipped              = demand.SkippedSections(type(self).__name__, sectionsInfo) # Sections no requested output needs
+        # Setup section activation (worked out once for each list of current sections)
+        self.activeSections       = {}                         # id(sections) -> (sections, architecture generation, active, unsupported, skippable)
         self.__parse__()
 
     ###################
@@ -80,40 +114,10 @@ class UEFIParser:
     # line: line on which to look for potential comments
     # returns Line with comments removed or None if entire line was a comment
     def __removeComments__(self, line):
-        placeholders = []
-        def replaceString(match):
-            # Replace string literal with a placeholder
-            placeholders.append(match.group(0))
-            return f'__STRING_LITERAL_{len(placeholders)-1}__'
-        line = line.strip()
-        # Handle case where currently in a comment block
-        if self.commentBlock:
-            # Look for exit from comment block
-            if line.endswith("*/"):
-                self.commentBlock = False
-            if Debug(SHOW_COMMENT_SKIPS):
-                print(f"{self.lineNumber}:SKIPPED - Blank or Comment")
-            return None
-        else:
-            # Look for comment lines 
-            if not line or (line.startswith('#') or line.startswith(';') or line.startswith("/*")):
-                if Debug(SHOW_COMMENT_SKIPS):
-                    print(f"{self.lineNumber}:SKIPPED - Blank or Comment")
-                # Look for entry into comment block
-                if line.startswith("/*"):
-                    self.commentBlock = True
-                return None
-        # Replace strings with placeholders
-        line    = re.sub(r'".*?"', replaceString, line)
-        line    = re.sub(r"'.*?'", replaceString, line)
-        # Remove any trailing comments
-        line    = line.split('#')[0]
-        line    = re.sub(r'[ \t]+;.+$', '', line)
-        line    = re.sub(r'//[a-zA-Z0-9_\*: \t]+$', '', line)
-        # Restore strings from placeholders
-        for i, placeholder in enumerate(placeholders):
-            line = line.replace(f'__STRING_LITERAL_{i}__', placeholder)
-        return line.strip()
+        line, self.commentBlock = fileir.RemoveComments(line, self.commentBlock)
+        if line == None and Debug(SHOW_COMMENT_SKIPS):
+            print(f"{self.lineNumber}:SKIPPED - Blank or Comment")
+        return line
 
     # Looks for and handles directives
     # line: line on which to look for potential directive
@@ -138,15 +142,16 @@ class UEFIParser:
             if handler and callable(handler):
                 handler(items[1].strip() if len(items) > 1 else None)
             else:
-                self.ReportError(f"Handler for directive not found: {directive}")
+                self.ReportError(f"Handler for directive not found: {directive}", 'unknown-directive')
         else:
-            self.ReportError(f"Unknown directive: {directive}")
+            self.ReportError(f"Unknown directive: {directive}", 'unknown-directive')
         return True
 
     # Indicates if a particular section is a supported architecture and tooling
     # section: section to check
+    # show:    True to show unsupported sections when debugging (default)
     # returns True if supported, False otherwise
-    def __sectionSupported__(self, section):
+    def __sectionSupported__(self, section, show = True):
         # Sections that do not stipulate architecture are always supported
         if len(section) < 2:
             return True
@@ -171,7 +176,7 @@ class UEFIParser:
                 return True
             if third == 'EDKII':
                 return True
-        if Debug(SHOW_SKIPPED_SECTIONS):
+        if show and Debug(SHOW_SKIPPED_SECTIONS):
             print(f"{self.lineNumber}:SKIPPED - unsupported section {gbl.GetSection(section)}")
         return False
 
@@ -181,14 +186,14 @@ class UEFIParser:
     # returns True if line was a section header and processed, False otherwise
     def __handleNewSection__(self, line, ignoreCurrent = False):
         # Look for section header (format "[<sections>]")
-        match = re.match(r'\[([^\[\]]+)\]', line)
+        match = reSectionHeader.match(line)
         if not match:
             return False
         if not ignoreCurrent:
             if not self.subElementState == -1:
                 # Check for unended sub-elements
                 for handler, sections in reversed(self.subElements):
-                    self.ReportError(f"Missing closing brace for {handler()}")
+                    self.ReportError(f"Missing closing brace for {handler()}", 'missing-brace')
                 self.subElementState = -1
                 self.subElements  = []
             # Exit current sections (if any)
@@ -214,7 +219,9 @@ class UEFIParser:
                 # Else taken care of in __sectionSupported method!
                 # No need to look for handler here because some section may use the default handler
             else:
-                self.ReportError(f"Unknown section: {section}")
+                self.ReportError(f"Unknown section: {section}", 'unknown-section')
+        # The current sections changed so their activation has to be worked out again
+        self.activeSections.pop(id(self.sections), None)
         return True
 
     # Check results of regular expression match
@@ -232,7 +239,7 @@ class UEFIParser:
         values  = []
         # Handle case where match is no good
         if not match:
-            self.ReportError(f'Invalid {self.section[0]} format: {line}')
+            self.ReportError(f'Invalid {self.section[0]} format: {line}', 'invalid-format')
         else:
             # Loop through groups to check
             for g, u in enumerate(usage):
@@ -243,7 +250,7 @@ class UEFIParser:
                 value = "" if match.group(g) == None else match.group(g)
                 # Make sure require groups are present and forbidden groups are not
                 if (u == 'R' and not value) or (u == 'X' and value):
-                    self.ReportError(f'Invalid {self.section[0]} format: {line}')
+                    self.ReportError(f'Invalid {self.section[0]} format: {line}', 'invalid-format')
                     break
                 # Append the value
                 values.append(value)
@@ -279,34 +286,68 @@ class UEFIParser:
                 if value == None or type(value) is str and value == '':
                     continue
                 msg = msg + f"{name}={value} "
+        # Note configurations in which the entry is present (symbolic only)
+        if gbl.Presence != None:
+            entry['presence'] = gbl.Presence
         # Add entry to the attribute
         attribute.append(entry)
         # Show info if debug is enabled
         if Debug(debug):
             print(msg.rstrip())
 
+    # Match a line to one of the regular expressions in globals
+    # regEx:   Name of the regular expression (e.g. "rePcdReDef")
+    # pattern: Compiled regular expression
+    # line:    Line to be matched
+    # returns results of the match
+    def __matchRegEx__(self, regEx, pattern, line):
+        if not profiler.Enabled and not tracer.Enabled:
+            return pattern.match(line)
+        start = time.perf_counter()
+        match = pattern.match(line)
+        self.regExAttempts += 1
+        self.regExHits     += 0 if match == None else 1
+        if profiler.Enabled:
+            profiler.Regex(regEx, match != None, time.perf_counter() - start)
+        return match
+
+    # Get the dispatch entry for a section (worked out once for each parser class)
+    # section: Section name
+    # returns tuple of debug setting, list of (regEx name, compiled regEx, handler arguments, match handler), indication if the
+    #         section has a list of regular expressions, and section handler (handlers are functions of the class or None)
+    def __dispatchEntry__(self, section):
+        key = (type(self), section)
+        if not key in DispatchEntries:
+            info    = self.sectionsInfo[section]
+            indexed = type(info[1]) is list
+            regExes = info[1] if indexed else [info[1]]
+            args    = info[2] if indexed else [info[2]]
+            entries = []
+            for regEx, arg in zip(regExes, args):
+                handler = getattr(type(self), f'match_{regEx}', None)
+                # PCD lines are tokenized instead of matched (see pcdtokens)
+                pattern = pcdtokens.Patterns[regEx] if regEx in pcdtokens.Patterns else re.compile(getattr(gbl, regEx), re.IGNORECASE)
+                entries.append((regEx, pattern, arg, handler if callable(handler) else None))
+            handler = getattr(type(self), f"section_{section}", None)
+            DispatchEntries[key] = (info[0], entries, indexed, handler if callable(handler) else None)
+        return DispatchEntries[key]
+
     # Call the section handler or the default section handler for the indicated section and line
     # section: Section which is to be handled
     # line:    Line    which is to be handled
+    # entry:   Dispatch entry for the section (default is None to look it up)
     # returns nothing
-    def __dispatchSectionHandler__(self, section, line):
+    def __dispatchSectionHandler__(self, section, line, entry = None):
+        start = time.perf_counter() if profiler.Enabled else None
         # Get section info
-        info = self.sectionsInfo[section]
+        debug, regExes, indexed, sectionHandler = entry if entry else self.__dispatchEntry__(section)
         # Match to appropriate regular expressions
-        regExes = info[1]
-        if type(regExes) is list:
-            for idx, regEx in enumerate(regExes):
-                regex = eval('gbl.'+regEx)
-                match = re.match(regex, line, re.IGNORECASE)
-                if match:
-                    break
-        else:
-            idx   = None
-            regEx = regExes
-            regex = eval('gbl.'+regEx)
-            match = re.match(regex, line, re.IGNORECASE)
-        # Get appropriate handler arguments
-        args = info[2] if idx == None else info[2][idx]
+        for idx, (regEx, pattern, args, matchHandler) in enumerate(regExes):
+            match = self.__matchRegEx__(regEx, pattern, line)
+            if match:
+                break
+        if not indexed:
+            idx = None
         # Call the handler
         good, items = self.__handleMatch__(match, args[0], line)
         if good:
@@ -317,16 +358,16 @@ class UEFIParser:
                 names = args[2]
                 if callable(names):
                     names = names(self, match, line)
-                self.__updateAttribute__(names, items, attribute, info[0])
-            # Call the match handler if present and callable
-            handler = getattr(self, f'match_{regEx}', None)
-            if handler and callable:
-                handler(match)
-            # Call the section handler if present and callable
-            handler = getattr(self, f"section_{section}", None)
-            if handler and callable(handler):
-                handler(idx, match)
+                self.__updateAttribute__(names, items, attribute, debug)
+            # Call the match handler if present
+            if matchHandler:
+                matchHandler(self, match)
+            # Call the section handler if present
+            if sectionHandler:
+                sectionHandler(self, idx, match)
         # else taken care of in __handleMatch__
+        if start != None:
+            profiler.Count(f'dispatch [{section}]', time.perf_counter() - start)
 
     # Handle sub-element processing
     # (not called unless section supports sub-elements)
@@ -379,11 +420,71 @@ class UEFIParser:
             return
         self.__dispatchSectionHandler__(self.section[0], line)
 
+    # Indicates if a directive in a conditionally excluded block can be skipped
+    # Nested conditionals are followed by name alone (no macro expansion or evaluation) as they are excluded as well
+    # line: Directive line (before macro expansion)
+    # returns True if the directive can be skipped, False if it may end the excluded block
+    def __skipDirective__(self, line):
+        items     = line[1:].split(None, 1)
+        directive = items[0].lower() if items else ''
+        if directive == 'if' or directive == 'ifdef' or directive == 'ifndef':
+            self.skipDepth += 1
+            return True
+        if self.skipDepth:
+            if directive == 'endif':
+                self.skipDepth -= 1
+            return True
+        return not directive in ('else', 'elseif', 'elif', 'endif')
+
+    # Get the current sections that lines are dispatched to
+    # Worked out once for each list of current sections (and again when the supported architectures change)
+    # returns tuple of the sections list, architecture generation, list of (section, dispatch entry, section string) for the
+    #         active sections, list of unsupported sections, and indication if all of the sections are not needed
+    def __activeSections__(self):
+        key = id(self.sections)
+        if key in self.activeSections:
+            activation = self.activeSections[key]
+            if activation[0] is self.sections and activation[1] == gbl.ArchitectureGeneration:
+                return activation
+        active      = []
+        unsupported = []
+        for section in self.sections:
+            # Skip sections no requested output needs
+            if section[0] in self.skipped:
+                continue
+            # Make sure architecture is supported (unsupported sections are shown on each line when debugging)
+            if self.__sectionSupported__(section, False):
+                active.append((section, self.__dispatchEntry__(section[0]), gbl.GetSection(section)))
+            else:
+                unsupported.append(section)
+        skippable  = bool(self.sections) and all([section[0] in self.skipped for section in self.sections])
+        activation = (self.sections, gbl.ArchitectureGeneration, active, unsupported, skippable)
+        self.activeSections[key] = activation
+        return activation
+
+    # Indicates if a line can be skipped because none of the current sections are needed
+    # (sub-element and line continuation lines are left to the normal handling)
+    # returns True if the line can be skipped, False otherwise
+    def __skipLine__(self):
+        if not self.sections or self.lineContinuation or self.subElementState != -1:
+            return False
+        if not self.__activeSections__()[4]:
+            return False
+        if Debug(SHOW_SKIPPED_SECTIONS):
+            print(f"{self.lineNumber}:SKIPPED - section not needed {gbl.GetSection(self.sections[0])}")
+        return True
+
     # Handles line continuations
     # line: Line to handle
     # returns nothing
     def __handleLineContinuation__(self, line):
-        print(f'{self.lineNumber}:Line continuation handling is TBD')
+        # The continuation goes on for as long as the lines end with the line continuation character
+        self.lineContinuation = line.endswith('\\')
+        if self.lineContinuation:
+            line = line[:-1]
+        if Debug(SHOW_BUILDOPTIONS):
+            print(f'{self.lineNumber}:continued {line.strip()}')
+        self.ContinueLine(line.strip())
 
     # Handles an individual line that is not a directive or section header
     # line:             Line to be handled
@@ -398,28 +499,39 @@ class UEFIParser:
             self.__handleSubElement__(line)
         # Must be in a section
         elif bool(self.sections):
-            # Process line inside of each of the current sections
-            for self.section in self.sections:
-                # Make sure architecture is supported
-                if self.__sectionSupported__(self.section):
-                    self.sectionStr = gbl.GetSection(self.section)
-                    self.__dispatchSectionHandler__(self.section[0], line)
-                # Else taken care of in __sectionSupported__ method!
+            # Process line inside of each of the active sections
+            activation = self.__activeSections__()
+            for self.section, entry, self.sectionStr in activation[2]:
+                self.__dispatchSectionHandler__(self.section[0], line, entry)
+            if activation[3] and Debug(SHOW_SKIPPED_SECTIONS):
+                for section in activation[3]:
+                    print(f"{self.lineNumber}:SKIPPED - unsupported section {gbl.GetSection(section)}")
+            self.section = self.sections[-1]
         # Lines outside of a section are usually not allowed
         else:
             # See if outside line handler is installed
             if self.outside:
                 self.outside(self, line)
             else:
-                self.ReportError(f"Unsupported line discovered outside of a section")
+                self.ReportError(f"Unsupported line discovered outside of a section", 'outside-section')
+
+    # Get the value of a macro (noting it as an input to this file if appropriate)
+    # macro: Name of the macro
+    # returns value of the macro or None if the macro is not defined
+    def __readMacro__(self, macro):
+        value = gbl.Macros[macro] if macro in gbl.Macros else None
+        if not macro in self.macroOutputs and not macro in self.macroInputs:
+            self.macroInputs[macro] = value
+        return value
 
     # Expandes all macros within a line
-    # line: line in which macros are to be expanded
+    # line:   line in which macros are to be expanded
+    # macros: macros referenced in the line (default is None to have them located here)
     # returns line with macros expanded
     # Note: Undefined macros will appear as __<marco>__UNDEFINED__
-    def __expandMacros__(self, line):
+    def __expandMacros__(self, line, macros = None):
         # Look for all macros in the line (format "$(<macroName>)")
-        matches = re.findall(r'\$\(([^\)]+)\)', line)
+        matches = fileir.reMacro.findall(line) if macros == None else macros
         # Loop through all ocurrances
         for match in matches:
             #if not match in gbl.Macros:
@@ -428,7 +540,9 @@ class UEFIParser:
             #    if not allow:
             #        self.ReportError(f'Undefined macro encountered: {match}')
             # Replace the macro with its value (or __<macroName>__UNDEFINED__ if it is not defined)
-            value = str(gbl.Macros[match]).replace('"', '') if match in gbl.Macros else F"__{match}__UNDEFINED__"
+            value = self.__readMacro__(match)
+            gbl.ReadMacro(match, self.fileName, self.lineNumber, fileir.KindNames[self.lineKind])
+            value = str(value).replace('"', '') if value != None else F"__{match}__UNDEFINED__"
             line = line.replace(f"$({match})", '""' if not value else value)
         # Return expanded line
         return line
@@ -438,52 +552,115 @@ class UEFIParser:
     def __parse__(self):
         if Debug(SHOW_FILENAMES):
             print(f"Processing {self.fileName}")
-        # Read in the file
+        if profiler.Enabled:
+            profiler.EnterFile(self.fileName)
+        if tracer.Enabled:
+            tracer.Begin(self.fileName, 'parse', {'parser': type(self).__name__})
+        # Get the configuration independent representation of the file
+        lines = 0
         try:
-            with open(self.fileName, 'r') as file:
-                content = file.readlines()
-            # Go through the content one at a time
+            ir = fileir.Load(self.fileName)
+            lines = ir.count
+            gbl.Lines += ir.count
+            # Go through the non-comment lines one at a time
             self.lineNumber = 0
-            for line in content:
-                gbl.Lines       += 1
-                self.lineNumber += 1
-                line = self.__removeComments__(line)
-                if not line:
+            skipped         = bool(self.skipped)
+            for lineNumber, kind, line, macros in ir.lines:
+                # Account for skipped comment lines
+                if Debug(SHOW_COMMENT_SKIPS):
+                    for self.lineNumber in range(self.lineNumber + 1, lineNumber):
+                        print(f"{self.lineNumber}:SKIPPED - Blank or Comment")
+                self.lineNumber = lineNumber
+                self.rawLine    = line
+                self.lineKind   = kind
+                # Skip-scan conditionally excluded blocks (only directives that end the block are processed)
+                if not self.process and (kind != fileir.DIRECTIVE or self.__skipDirective__(line)):
+                    if Debug(SHOW_CONDITIONAL_SKIPS):
+                        print(f"{self.lineNumber}:SKIPPED - Conditionally")
+                    continue
+                # Skip (without expanding macros) lines of sections no requested output needs
+                if kind >= fileir.BODY and skipped and self.__skipLine__():
                     continue
                 # Expand macros before parsing
-                line = self.__expandMacros__(line)
+                if macros:
+                    line = self.__expandMacros__(line, macros)
                 # Handle directives (if any)
-                if self.__handleDirective__(line):
+                if kind == fileir.DIRECTIVE and self.__handleDirective__(line):
                     continue
                 # Conditional processing may indicate to ignore
                 if not self.process:
                     if Debug(SHOW_CONDITIONAL_SKIPS):
                         print(f"{self.lineNumber}:SKIPPED - Conditionally")
                     continue
-                # Handle DEFINE lines anywhere
-                match = re.match(gbl.reDefine, line, re.IGNORECASE)
-                if match:
-                    macro, value = (match.group(2), match.group(3))
-                    self.DefineMacro(macro, value if value != None else '')
-                    continue
-                # Handle EQUATE lines anywhere
-                # Look for section change
-                if self.__handleNewSection__(line):
+                # The kind of line decides how it is handled (only lines that do not turn out to be what their kind indicates
+                # are handled as regular lines)
+                if kind == fileir.DEFINE:
+                    # Handle DEFINE lines anywhere
+                    match = reDefineLine.match(line)
+                    if match:
+                        macro, value = (match.group(2), match.group(3))
+                        self.DefineMacro(macro, value if value != None else '')
+                        continue
+                elif kind == fileir.SECTION:
+                    # Look for section change
+                    if self.__handleNewSection__(line):
+                        continue
+                elif kind == fileir.CLOSE and self.subElementState != -1 and not self.lineContinuation:
+                    # End of sub-element
+                    self.__handleSubElement__(line)
                     continue
                 # Must by a regular line
                 self.__handleIndividualLine__(line)
+            # Account for trailing comment lines
+            if Debug(SHOW_COMMENT_SKIPS):
+                for self.lineNumber in range(self.lineNumber + 1, ir.count + 1):
+                    print(f"{self.lineNumber}:SKIPPED - Blank or Comment")
         except PermissionError:
-            self.ReportError(f"Unexpected error occured attempting to open file: {self.fileName}")
+            self.ReportError(f"Unexpected error occured attempting to open file: {self.fileName}", 'open-failed')
+        if profiler.Enabled:
+            profiler.ExitFile()
+        if tracer.Enabled:
+            tracer.End({'lines': lines, 'attempts': self.regExAttempts, 'hits': self.regExHits})
+        if progress.Enabled:
+            progress.FileDone(self.fileName, lines)
+        if visitor.Enabled:
+            visitor.Emit('on_parsed', self)
 
     # Handle a new conditional
     # returns nothing
     def __newConditional__(self):
         # Save current conditional settings
-        self.conditionalStack.append((self.process, self.conditionHandled, self.allowedConditionals))
+        self.conditionalStack.append((self.process, self.conditionHandled, self.allowedConditionals, gbl.Presence, self.conditionPresence))
         # Allowed conditionals are all of the ifs, elses and endif
         # Inherits self.process!
         self.conditionHandled    = False
         self.allowedConditionals = ['Elseif', 'Else', 'Endif']
+        self.conditionPresence   = presence.FALSE
+
+    # Get the condition of the current conditional directive as written in the file (symbolic only)
+    # returns condition with no macros expanded
+    def __rawCondition__(self):
+        items     = self.rawLine.split(maxsplit=1)
+        condition = items[1].strip() if len(items) > 1 else ''
+        if items[0][1:].lower() == 'else' and condition.startswith('if '):
+            condition = condition[3:].strip()
+        return condition
+
+    # Enter the next branch of the current conditional (symbolic only)
+    # All branches are processed, each with the presence condition under which it would be taken
+    # condition: Presence condition of the branch itself (None for else)
+    # returns nothing
+    def __symbolicBranch__(self, condition):
+        parent    = self.conditionalStack[-1][3] if bool(self.conditionalStack) else presence.TRUE
+        # A branch is only taken when none of the previous branches were
+        condition = presence.Not(self.conditionPresence) if condition == None else presence.And(presence.Not(self.conditionPresence), condition)
+        self.conditionPresence = presence.Or(self.conditionPresence, condition)
+        self.conditionHandled  = self.conditionPresence == presence.TRUE
+        gbl.Presence           = presence.And(parent, condition)
+        # Branches that can never be taken are skipped
+        self.process           = gbl.Presence != presence.FALSE
+        if Debug(SHOW_CONVERTED_CONDITIONAL):
+            print(f"{self.lineNumber}:Presence: {presence.ToString(gbl.Presence)}")
 
     # Convert a DSC style expression to one that Python can interpret
     # expression: Expression to be converted
@@ -513,8 +690,11 @@ class UEFIParser:
             if token in self.ConversionMap:
                 token = self.ConversionMap[token]
             # Substitute items with the macro values (if appropriate)
-            elif token in gbl.Macros:
-                token = gbl.Macros[token]
+            else:
+                value = self.__readMacro__(token)
+                if value != None:
+                    gbl.ReadMacro(token, self.fileName, self.lineNumber, fileir.KindNames[self.lineKind])
+                    token = value
             expression.append(token)
         # Rebuild the expression
         expression = " ".join(expression)
@@ -590,6 +770,12 @@ class UEFIParser:
     # Public methods #
     ##################
 
+    # Handles a line that continues the previous one (classes with line continuations override this)
+    # value: Line without the line continuation character and surrounding white space
+    # returns nothing
+    def ContinueLine(self, value):
+        pass
+
     # Defines a new macro
     # line: line containing the macro
     # returns nothing
@@ -602,6 +788,8 @@ class UEFIParser:
         # Save result
         if not value:
             macrovalue = '""'
+        self.macroOutputs.add(macro)
+        gbl.WriteMacro(macro, self.fileName, self.lineNumber)
         result = gbl.SetMacro(macro, value)
         if Debug(SHOW_MACRO_DEFINITIONS):
             print(f'{self.lineNumber}:{result}')
@@ -610,16 +798,26 @@ class UEFIParser:
         if handler and callable(handler):
             handler(value)
 
+    # Note the macros read and defined by an included file as read and defined by this file
+    # parser: Parser object of the included file
+    # returns nothing
+    def IncludeMacros(self, parser):
+        for macro in parser.macroInputs:
+            if not macro in self.macroOutputs and not macro in self.macroInputs:
+                self.macroInputs[macro] = parser.macroInputs[macro]
+        self.macroOutputs.update(parser.macroOutputs)
+
     # Handling for generic sub-element exits
     def ExitSubElement(self):
         return 'sub-element'
 
     # Handles error repoting
     # message: error message
+    # code:    Short code identifying the kind of error (default is "parse")
     # returns nothing
-    def ReportError(self, message):
-        # Display error message with file name and line number where error is encountered to stderr
-        gbl.Error(f"{self.fileName}, line: {self.lineNumber}\n              {message}\n")
+    def ReportError(self, message, code = 'parse'):
+        # Report error message with file name and line number where error is encountered
+        gbl.Error(message, self.fileName, self.lineNumber, code)
 
     # Determine full path to a file
     # path: partial path of file being searched for
@@ -628,13 +826,13 @@ class UEFIParser:
         # Make sure there are no undefined macros in the file path'
         if '_UNDEFINED__' in path:
             items = path.split("__")
-            self.ReportError(f"Unable to locate file due to undefined macro: {path}")
+            self.ReportError(f"Unable to locate file due to undefined macro: {path}", 'undefined-macro')
             return None
         # Remove quotes that were added by macro expansion
         path = path.replace('"', '')
         file = gbl.FindPath(path)
         if not file:
-            self.ReportError(f"Unable to locate file {path}")
+            self.ReportError(f"Unable to locate file {path}", 'missing-file')
         return file
 
     # Include a file
@@ -651,8 +849,14 @@ class UEFIParser:
                 if Debug(SHOW_INCLUDE_DIRECTIVE):
                     print(f"{self.lineNumber}:Including {file}")
                 saved         = self.sections.copy()
+                condition     = gbl.Presence
+                if tracer.Enabled:
+                    tracer.Begin(f'!include {partial}', 'include', {'file': self.fileName, 'line': self.lineNumber})
                 handler(file)
+                if tracer.Enabled:
+                    tracer.End()
                 self.sections = saved
+                gbl.Presence  = condition
                 if Debug(SHOW_INCLUDE_RETURN):
                     print(f"{self.lineNumber}:Returning to {self.fileName}")
             # Note else error handled in self.FindFile!
@@ -685,7 +889,9 @@ class UEFIParser:
         if Debug(SHOW_CONDITIONAL_DIRECTIVES):
             print(f"{self.lineNumber}:if {condition}")
         self.__newConditional__()
-        if self.process:
+        if gbl.Presence != None:
+            self.__symbolicBranch__(presence.Condition('If', self.__rawCondition__()))
+        elif self.process:
             # Set processing flag appropriately
             self.process = self.conditionHandled = self.__evaluateCondition__('If', condition)
         if Debug(SHOW_CONDITIONAL_LEVEL):
@@ -699,7 +905,9 @@ class UEFIParser:
         if Debug(SHOW_CONDITIONAL_DIRECTIVES):
             print(f"{self.lineNumber}:ifdef {condition}")
         self.__newConditional__()
-        if self.process:
+        if gbl.Presence != None:
+            self.__symbolicBranch__(presence.Condition('Ifdef', self.__rawCondition__()))
+        elif self.process:
             # Set processing flag appropriately
             self.process = self.conditionHandled = self.__evaluateCondition__('Ifdef', condition)
         if Debug(SHOW_CONDITIONAL_LEVEL):
@@ -713,7 +921,9 @@ class UEFIParser:
         if Debug(SHOW_CONDITIONAL_DIRECTIVES):
             print(f"{self.lineNumber}:ifndef {condition}")
         self.__newConditional__()
-        if self.process:
+        if gbl.Presence != None:
+            self.__symbolicBranch__(presence.Condition('Ifndef', self.__rawCondition__()))
+        elif self.process:
             # Set processing flag appropriately
             self.process = self.conditionHandled = self.__evaluateCondition__('Ifndef', condition)
         if Debug(SHOW_CONDITIONAL_LEVEL):
@@ -731,12 +941,14 @@ class UEFIParser:
             if Debug(SHOW_CONDITIONAL_DIRECTIVES):
                 print(f"{self.lineNumber}:else")
             if not "Else" in self.allowedConditionals:
-                self.ReportError("Unexpected else directive encountered.")
+                self.ReportError("Unexpected else directive encountered.", 'unexpected-conditional')
             # Set allowedConditonals
             self.allowedConditionals = ['Endif']
             # Set processing flag apprpriately
             self.process = False    # Assume no processing
-            if bool(self.conditionalStack):
+            if gbl.Presence != None:
+                self.__symbolicBranch__(None)
+            elif bool(self.conditionalStack):
                 if self.conditionalStack[-1][0]:
                     self.process = not self.conditionHandled
                 # else already taken care of by setting it to False above
@@ -756,11 +968,13 @@ class UEFIParser:
         if Debug(SHOW_CONDITIONAL_DIRECTIVES):
             print(f"{self.lineNumber}:elseif {condition}")
         if not "Elseif" in self.allowedConditionals:
-            self.ReportError("Unexpected elseif directive encountered.")
+            self.ReportError("Unexpected elseif directive encountered.", 'unexpected-conditional')
         # There is no change in allowed conditionals!
         # Set processing flag apprpriately
         self.process = False    # Assume no processing
-        if bool(self.conditionalStack):
+        if gbl.Presence != None:
+            self.__symbolicBranch__(presence.Condition('If', self.__rawCondition__()))
+        elif bool(self.conditionalStack):
             if self.conditionalStack[-1][0]:
                 if not self.conditionHandled:
                     self.process = self.conditionHandled = self.__evaluateCondition__('If', condition)
@@ -778,9 +992,9 @@ class UEFIParser:
         # Make sure elseif is allowed at this time
         if Debug(SHOW_CONDITIONAL_DIRECTIVES): print(f"{self.lineNumber}:endif")
         if not "Endif" in self.allowedConditionals:
-            self.ReportError("Unexpected endif directive encountered.")
+            self.ReportError("Unexpected endif directive encountered.", 'unexpected-conditional')
         # Set processing flag and allows Conditional to what they were for previous if level
-        self.process, self.conditionHandled, self.allowedConditionals = self.conditionalStack.pop()
+        self.process, self.conditionHandled, self.allowedConditionals, gbl.Presence, self.conditionPresence = self.conditionalStack.pop()
         if Debug(SHOW_CONDITIONAL_LEVEL):
             print(f"{self.lineNumber}:ConditionalLevel:{len(self.conditionalStack)}, Process: {self.process}, allowedConditionals: if, idef, indef, {', '.join(self.allowedConditionals)}")
 
@@ -816,3 +1030,6 @@ class UEFIParser:
             # Get and call dump method for this attribute
             handler = getattr(self, f'Dump{item}')
             handler()
+
+# Per-line entries are the bulk of what parsers hold so give them their own memory category
+memprofile.Attribute(UEFIParser.__updateAttribute__, 'entry dicts (__updateAttribute__)')
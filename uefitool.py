@@ -1,26 +1,108 @@
 #!/usr/bin/env python3
 
 # Standard python modules
+import atexit
 import os
+import time
 
 # Local modules
 import globals      as gbl
+import demand
+import diagnostics
+import fileir
+import impact
+import jsonl
+import parsecache
+import progress
+import tracer
+import whatif
 from   commandline  import ProcessCommandLine
-from   platforminfo import PlatformInfo
+from   platforminfo import FindPlatforms, MatrixConfigurations, PlatformInfo
 
 ################
 # Main Program #
 ################
 ProcessCommandLine()
-platform = os.getcwd() if not gbl.CommandLineResults.path else gbl.CommandLineResults.path
-print(f'HPE Platform Directory: {platform}')
-PlatformInfo(platform.replace('\\', '/'))
+# Changed files are relative to the current directory (or read from stdin) so get them before any processing
+if gbl.CommandLineResults.impact:
+    gbl.CommandLineResults.impact = impact.Files(gbl.CommandLineResults.impact)
+# Errors and warnings are collected and shown once (repeats counted) however the program exits
+diagnostics.Enabled   = True
+diagnostics.MaxErrors = gbl.CommandLineResults.maxerrors
+atexit.register(diagnostics.Show)
+if gbl.CommandLineResults.diagnostics:
+    fileName = os.path.abspath(gbl.CommandLineResults.diagnostics)
+    atexit.register(lambda: diagnostics.Write(fileName, gbl.ProgramVersion, gbl.Worktree))
+# Only the sections needed for the requested outputs are processed
+demand.Configure(demand.Requested(gbl.CommandLineResults))
+if gbl.CommandLineResults.trace:
+    # Timeline is saved however the program exits
+    tracer.Enabled = True
+    atexit.register(tracer.Write, os.path.abspath(gbl.CommandLineResults.trace))
+if gbl.CommandLineResults.jsonl:
+    # Records are written as they are generated, the file is completed however the program exits
+    jsonl.Open(gbl.CommandLineResults.jsonl)
+    atexit.register(jsonl.Close)
+if gbl.CommandLineResults.progress:
+    progress.AddSink(progress.Bar())
+if gbl.CommandLineResults.progressjson:
+    progress.AddSink(progress.JsonLines(gbl.CommandLineResults.progressjson))
+if not gbl.CommandLineResults.batch:
+    platform  = os.getcwd() if not gbl.CommandLineResults.path else gbl.CommandLineResults.path
+    platforms = [platform.replace('\\', '/')]
+else:
+    # Process every platform in the worktree sharing DEC/INF parse results
+    worktree  = os.path.abspath(gbl.CommandLineResults.batch)
+    platforms = FindPlatforms(worktree)
+    if not platforms:
+        gbl.Error(f'No platforms found in {worktree}')
+        exit(1)
+configs = MatrixConfigurations(gbl.CommandLineResults.matrix)
+runs    = [(platform, config) for platform in platforms for config in configs]
+if not gbl.CommandLineResults.batch and len(runs) == 1:
+    print(f'HPE Platform Directory: {platforms[0]}')
+    if gbl.CommandLineResults.whatif:
+        whatif.Run(platforms[0], configs[0], whatif.Changes(gbl.CommandLineResults.whatif))
+    else:
+        PlatformInfo(platforms[0], configs[0])
+else:
+    # Files are evaluated more than once so keep their IR and parse results
+    parsecache.Enabled = True
+    fileir.Enabled     = True
+    environment = dict(os.environ)
+    failed      = []
+    start       = time.time()
+    for platform, config in runs:
+        # Each run starts with the original environment and no platform information
+        os.environ.clear()
+        os.environ.update(environment)
+        gbl.Reset()
+        print(f'\nHPE Platform Directory: {platform}')
+        try:
+            if gbl.CommandLineResults.whatif:
+                whatif.Run(platform, config, whatif.Changes(gbl.CommandLineResults.whatif))
+            else:
+                PlatformInfo(platform, config)
+        except SystemExit:
+            # Stop all runs when the error limit is reached
+            if diagnostics.Stopped:
+                raise
+            failed.append((platform, config))
+    print(f'\nBATCH RESULTS:')
+    print(f'--------------')
+    print(f'Runs processed:          {len(runs) - len(failed)} of {len(runs)} ({len(platforms)} platforms x {len(configs)} configurations)')
+    for platform, config in failed:
+        print(f'Run failed:              {platform} {" ".join([f"{macro}={config[macro]}" for macro in config])}')
+    print(f'Shared parse results:    {parsecache.Hits} reused, {parsecache.Misses} parsed')
+    print(f'Shared file IRs:         {len(fileir.Cache)}')
+    print(f'Total time:              {time.time() - start:.1f}s')
+    if failed:
+        exit(1)
 
 ###########
 ### TBD ###
 ###########
 # - Cross-reference items to make sure things are consistent
-# - Right now assumes build with DEBUG ... need non-DEBUG option as well.
 # - Generate list of addresses.
 # - Fully check syntax of files ... right now syntax is assumed to be OK.
 # - Generate dependency list/chains for each inf.
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+# None
+
+# Local modules
+# None
+
+# Indicates if any visitors are registered (checked before an event is sent so there is no cost without visitors)
+Enabled  = False
+
+# Indicates if parser objects are kept once their results are recorded
+# When False INF and DEC parser objects (and their attribute lists) are released as soon as each file is done, so memory is
+# bounded by the gbl databases and what the visitors keep (the dump output and libraries.lst dependencies need them otherwise)
+Retain   = True
+
+# Registered visitors
+Visitors = []
+
+# Base class for visitors (a visitor only needs the methods for the events it is interested in)
+# Events are sent from the match handlers (through gbl.Emit or the gbl database functions they call), so they are also sent
+# when the results of a previous parse are reused (batch and what-if processing), on_parsed with the parser that was reused
+class Visitor:
+
+    # A PCD was defined (DEC), overridden (DSC/FDF), or referenced (INF/DSC)
+    # kind:       "define", "override", or "reference"
+    # pcd:        PCD name (format <tokenSpaceGuid>.<pcdName>)
+    # value:      Default (define) or new (override) value, None for references
+    # fileName:   File containing the PCD
+    # lineNumber: Line containing the PCD
+    # returns nothing
+    def on_pcd(self, kind, pcd, value, fileName, lineNumber):
+        pass
+
+    # A GUID, PPI, or protocol was defined (DEC) or referenced (INF)
+    # kind:       "define" or "reference"
+    # db:         "guid", "ppi", or "protocol"
+    # guid:       GUID name
+    # value:      GUID value for definitions, None for references
+    # fileName:   File containing the GUID
+    # lineNumber: Line containing the GUID
+    # returns nothing
+    def on_guid_ref(self, kind, db, guid, value, fileName, lineNumber):
+        pass
+
+    # A component was found in a DSC [Components] section
+    # inf:        INF file of the component
+    # fileName:   DSC file containing the component
+    # lineNumber: Line containing the component
+    # returns nothing
+    def on_component(self, inf, fileName, lineNumber):
+        pass
+
+    # A library class instance was found in a DSC [LibraryClasses] section
+    # name:       Library class name
+    # inf:        INF file of the library instance
+    # fileName:   DSC file containing the library class
+    # lineNumber: Line containing the library class
+    # returns nothing
+    def on_library(self, name, inf, fileName, lineNumber):
+        pass
+
+    # A source file (or any other referenced file) was referenced
+    # source:     File being referenced
+    # referer:    File (or platform) making the reference
+    # lineNumber: Line number of the reference (None for references from the platform directory)
+    # returns nothing
+    def on_source(self, source, referer, lineNumber):
+        pass
+
+    # An INF was found in an FDF [FV] section
+    # inf:        INF file
+    # options:    List of options (dictionaries with option and value)
+    # apriori:    Apriori list ("PEI" or "DXE") the INF is in, None if not in an apriori list
+    # fileName:   FDF file containing the INF
+    # lineNumber: Line containing the INF
+    # returns nothing
+    def on_fv_inf(self, inf, options, apriori, fileName, lineNumber):
+        pass
+
+    # A module has been recorded (after its INF file was parsed)
+    # name: BASE_NAME of the module
+    # inf:  gbl.INF object for the module
+    # returns nothing
+    def on_module(self, name, inf):
+        pass
+
+    # A parser has finished with a file (its attribute lists are complete)
+    # When the results of a previous parse are reused this is sent again with the parser of that parse (or when parser
+    # objects are not retained with a parsecache.StandIn only having the fileName, macroInputs, and parsecache.Kept attributes)
+    # When parser objects are not retained this is the last chance to look at them
+    # parser: Parser object (DSCParser, INFParser, DECParser, or FDFParser)
+    # returns nothing
+    def on_parsed(self, parser):
+        pass
+
+# Register a visitor
+# visitor: Object with any of the Visitor methods
+# returns nothing
+def Add(visitor):
+    global Enabled
+    Visitors.append(visitor)
+    Enabled = True
+
+# Remove a registered visitor
+# visitor: Visitor to be removed
+# returns nothing
+def Remove(visitor):
+    global Enabled
+    Visitors.remove(visitor)
+    Enabled = bool(Visitors)
+
+# Send an event to all of the visitors with a method for it
+# event: Name of the event method (e.g. "on_pcd")
+# args:  Arguments for the event method
+# returns nothing
+def Emit(event, *args):
+    for visitor in Visitors:
+        handler = getattr(visitor, event, None)
+        if handler:
+            handler(*args)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# Standard python modules
+import os
+import time
+
+# Local modules
+import fileir
+import globals      as gbl
+import parsecache
+from   platforminfo import PlatformInfo
+
+# Get the changes indicated by a list of what-if specifications
+# specs: List of strings with format "macro=value"
+# returns dictionary of macro -> value
+def Changes(specs):
+    changes = {}
+    for spec in specs:
+        macro, value = spec.split('=', 1) if '=' in spec else (spec, '')
+        changes[macro.strip()] = value.strip()
+    return changes
+
+# Get everything that depends on a set of macros
+# macros: Macros that are to be changed
+# returns tuple of (set of affected macros, set of (fileName, lineNumber, usage) reading any of them)
+# Note: A macro defined on a line that reads an affected macro is also affected
+def Dependents(macros):
+    affected = set(macros)
+    readers  = set()
+    pending  = list(macros)
+    while pending:
+        macro = pending.pop()
+        if not macro in gbl.MacroReaders:
+            continue
+        lines = gbl.MacroReaders[macro]
+        readers.update(lines)
+        lines = set([(fileName, lineNumber) for fileName, lineNumber, usage in lines])
+        for other in gbl.MacroDefiners:
+            if not other in affected and not lines.isdisjoint(gbl.MacroDefiners[other]):
+                affected.add(other)
+                pending.append(other)
+    return (affected, readers)
+
+# Take a snapshot of the parts of the platform information that are compared
+# returns dictionary of category -> dictionary of item -> value
+def Snapshot():
+    snapshot = {'components': {}, 'fv contents': {}, 'pcds': {}, 'sources': {}}
+    for dsc in gbl.DSCs.values():
+        for entry in dsc.COMPONENTS:
+            snapshot['components'][gbl.FixUndefined(entry['inf'])] = ''
+    for fdf in gbl.FDFs.values():
+        # Items are keyed by the FV they are in so moving one to another FV is a change (those outside of [FV] sections have no FV)
+        for item in fdf.INFS:
+            snapshot['fv contents'][f'{__fv__(item[3])}INF {gbl.FixUndefined(item[0])}'] = ''
+        for file in fdf.FILES:
+            snapshot['fv contents'][f"{__fv__(file['fv'])}FILE {file['type']} {file['guid']}"] = ''
+    for name in gbl.Pcds:
+        pcd = gbl.Pcds[name]
+        snapshot['pcds'][name] = str(pcd.value if pcd.overrider else pcd.default)
+    for source in gbl.Sources:
+        snapshot['sources'][source] = ''
+    return snapshot
+
+# Get the prefix of an FV contents item
+# fv: Name of the FV the item is in ('' if not in an FV)
+# returns "FV.<name> " or '' if not in an FV
+def __fv__(fv):
+    return f'FV.{fv} ' if fv else ''
+
+# Compare two snapshots
+# before: Snapshot before the change
+# after:  Snapshot after  the change
+# returns list of (category, list of difference strings) for categories with differences
+def Diff(before, after):
+    results = []
+    for category in before:
+        old, new    = (before[category], after[category])
+        differences = []
+        for item in sorted(set(old) | set(new)):
+            if not item in new:
+                differences.append(f'- {item}')
+            elif not item in old:
+                differences.append(f'+ {item}')
+            elif old[item] != new[item]:
+                differences.append(f'~ {item}: {old[item]} -> {new[item]}')
+        if differences:
+            results.append((category, differences))
+    return results
+
+# Process a platform and show what changes if macros are given different values
+# platform: Platform directory
+# config:   Macro values for the base processing (None for no overrides)
+# changes:  Dictionary of macro -> new value
+# returns nothing
+def Run(platform, config, changes):
+    # Files are evaluated twice so keep their IR and parse results (those of the DSC and FDF files only for this platform)
+    parsecache.Enabled  = True
+    parsecache.Platform = True
+    parsecache.Changed  = None
+    parsecache.ForgetPlatform()
+    fileir.Enabled      = True
+    environment = dict(os.environ)
+    config      = config if config else {}
+    PlatformInfo(platform, config, False)
+    before      = Snapshot()
+    # Find everything that depends on the changed macros
+    start             = time.time()
+    affected, readers = Dependents(changes)
+    files             = sorted(set([fileName for fileName, lineNumber, usage in readers]))
+    spec              = ' '.join([f'{macro}={changes[macro]}' for macro in changes])
+    print(f'\nWHAT-IF {spec}:')
+    print(f'{"-" * (len(spec) + 9)}')
+    counts = {}
+    for fileName, lineNumber, usage in readers:
+        counts[usage] = counts[usage] + 1 if usage in counts else 1
+    print(f'Read by:                 {", ".join([f"{counts[usage]} {usage} line(s)" for usage in sorted(counts)]) if counts else "nothing"}')
+    print(f'Affected macros:         {", ".join(sorted(affected))}')
+    for fileName in files:
+        print(f'Dependent file:          {fileName}')
+    if not readers:
+        print(f'No changes (nothing reads {", ".join(sorted(changes))})')
+        return
+    # Evaluate again with the changes (only the files reading the affected macros, or whose other macro inputs change, are
+    # parsed again, the others replay their previous results)
+    hits, misses = (parsecache.Hits, parsecache.Misses)
+    parsecache.Changed = set(files)
+    os.environ.clear()
+    os.environ.update(environment)
+    gbl.Reset()
+    PlatformInfo(platform, dict(config, **changes), False)
+    after = Snapshot()
+    parsecache.Changed = None
+    # Show the differences
+    print(f'Files:                   {parsecache.Misses - misses} parsed again, {parsecache.Hits - hits} reused')
+    differences = Diff(before, after)
+    for category, items in differences:
+        print(f'{category}:')
+        for item in items:
+            print(f'    {item}')
+    if not differences:
+        print('No changes')
+    print(f'Re-evaluation time:      {time.time() - start:.3f}s')